@@ -0,0 +1,268 @@
+"""
+Carga de todas las rutas de /api/caso/ con datos sintéticos.
+
+Por defecto corre sin red ni Oracle: crea una base SQLite temporal
+(benchmarks/settings_local.py), la llena con benchmarks.datos y levanta
+en el mismo proceso un servidor WSGI con hilos en un puerto libre:
+
+    python -m benchmarks.bench_api --clientes 5000 --concurrencia 8 \\
+        --salida resultados-$(git rev-parse --short HEAD).json
+
+Para medir un servidor ya levantado (con datos sembrados en su base con
+--solo-sembrar y la misma --semilla) use --url. Para comparar con una
+corrida anterior añada --comparar resultados-<commit>.json.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from urllib.parse import urlencode
+
+from .comun import peticion, resumen
+
+# Peticiones por ruta relativas a --peticiones; las rutas pesadas o que
+# escriben mucho se miden con menos.
+PESO = {"importar_casos": 0.1, "exportar_casos": 0.1}
+
+
+def _caso(rng, datos):
+    return rng.choice(datos.casos)
+
+
+def _cliente(rng, datos):
+    return rng.choice(datos.clientes)
+
+
+def _escenarios(base):
+    """
+    nombre de la ruta en casos/api_urls.py -> función (rng, datos) que
+    devuelve (método, ruta, cuerpo JSON). Lo que la función haga antes de
+    devolver (p. ej. pedir un número con crear_caso) no se mide.
+    """
+    def guardar_caso(rng, datos):
+        cod = _cliente(rng, datos)[0]
+        _, _, cuerpo = peticion(f"{base}crear_caso/", "POST", json_body={"codcliente": cod})
+        return "POST", "guardar_caso/", {
+            "nocaso": json.loads(cuerpo)["nocaso"], "codcliente": cod,
+            "especializacion": rng.choice(datos.especializaciones),
+            "fechaInicio": date.today().isoformat(), "valor": rng.randint(100, 50000) * 100,
+        }
+
+    def importar(rng, datos):
+        return "POST", "importar/", [
+            {"codcliente": _cliente(rng, datos)[0],
+             "especializacion": rng.choice(datos.especializaciones),
+             "fechaInicio": "2024-06-01", "valor": 1000}
+            for _ in range(50)
+        ]
+
+    def exportar(rng, datos):
+        mes = rng.randint(1, 12)
+        return "GET", f"exportar/?formato=ndjson&desde=2024-{mes:02}-01&hasta=2024-{mes:02}-28", None
+
+    def buscar_cliente(rng, datos):
+        _, nom, ape, _ = _cliente(rng, datos)
+        return "GET", "buscar_cliente/?" + urlencode({"nombre": nom, "apellido": ape}), None
+
+    def buscar_clientes(rng, datos):
+        _, nom, ape, _ = _cliente(rng, datos)
+        return "GET", "clientes/?" + urlencode({"apellido": ape[:3], "nombre": nom[:2]}), None
+
+    def guardar_expediente(rng, datos):
+        nocaso, _ = _caso(rng, datos)
+        return "POST", "guardar_expediente/", {
+            "nocaso": nocaso, "idetapa": 1,
+            "codlugar": rng.choice(datos.lugares), "cedula": rng.choice(datos.abogados),
+        }
+
+    def fijo(metodo, ruta, cuerpo=None):
+        return lambda rng, datos: (metodo, ruta, cuerpo)
+
+    def por_caso(plantilla):
+        return lambda rng, datos: ("GET", plantilla.format(_caso(rng, datos)[0]), None)
+
+    return {
+        "get_especializaciones": fijo("GET", "especializaciones/"),
+        "buscar_cliente": buscar_cliente,
+        "buscar_clientes": buscar_clientes,
+        "crear_caso": lambda rng, datos: ("POST", "crear_caso/", {"codcliente": _cliente(rng, datos)[0]}),
+        "guardar_caso": guardar_caso,
+        "abrir_caso": lambda rng, datos: ("POST", "abrir_caso/", {
+            "codcliente": _cliente(rng, datos)[0],
+            "especializacion": rng.choice(datos.especializaciones),
+            "fechaInicio": date.today().isoformat(), "valor": rng.randint(100, 50000) * 100,
+        }),
+        "importar_casos": importar,
+        "exportar_casos": exportar,
+        "buscar_caso_expediente": por_caso("buscar_caso/{}/"),
+        "buscar_caso_numero": por_caso("caso/{}/"),
+        "casos_por_numero": lambda rng, datos: (
+            "POST", "casos/", {"nocasos": [_caso(rng, datos)[0] for _ in range(200)]}
+        ),
+        "estadisticas_casos": fijo("GET", "estadisticas/"),
+        "get_abogados": fijo("GET", "abogados/"),
+        "get_ciudades": fijo("GET", "ciudades/"),
+        "get_entidades": fijo("GET", "entidades/"),
+        "crear_expediente": lambda rng, datos: (
+            "POST", "crear_expediente/", dict(zip(("nocaso", "esp"), _caso(rng, datos)))
+        ),
+        "guardar_expediente": guardar_expediente,
+        "async_especializaciones": fijo("GET", "async/especializaciones/"),
+        "async_buscar_cliente": lambda rng, datos: (
+            "GET", "async/" + buscar_cliente(rng, datos)[1], None
+        ),
+        "async_buscar_caso": por_caso("async/buscar_caso/{}/"),
+        "async_caso_numero": por_caso("async/caso/{}/"),
+        "async_abogados": fijo("GET", "async/abogados/"),
+        "async_ciudades": fijo("GET", "async/ciudades/"),
+        "async_entidades": fijo("GET", "async/entidades/"),
+        "estado_pool": fijo("GET", "interno/pool/"),
+        "estado_consultas": fijo("GET", "interno/consultas/"),
+    }
+
+
+def _rutas_api():
+    from django.urls import URLPattern
+    from casos import api_urls
+    return [p.name for p in api_urls.urlpatterns if isinstance(p, URLPattern)]
+
+
+def medir_ruta(base, escenario, datos, concurrencia, total, semilla):
+    def una(i):
+        rng = random.Random(semilla * 1_000_003 + i)
+        metodo, ruta, cuerpo = escenario(rng, datos)
+        status, segundos, _ = peticion(base + ruta, metodo, json_body=cuerpo)
+        return status, segundos
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+        resultados = list(ejecutor.map(una, range(total)))
+    duracion = time.perf_counter() - inicio
+
+    return {
+        **resumen([s for _, s in resultados]),
+        "rps": round(total / duracion, 1),
+        "errores": sum(1 for status, _ in resultados if status >= 400),
+    }
+
+
+def servidor_local():
+    """
+    Servidor WSGI con hilos en 127.0.0.1 y un puerto libre; devuelve la URL.
+    """
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+    from django.core.wsgi import get_wsgi_application
+
+    class Silencioso(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadedWSGIServer(("127.0.0.1", 0), Silencioso, allow_reuse_address=False)
+    servidor.set_app(get_wsgi_application())
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(anterior, actual):
+    print(f"\n{'ruta':26} {'p50 ms':>18} {'p95 ms':>18} {'rps':>18}")
+    for ruta, r in actual["rutas"].items():
+        a = anterior["rutas"].get(ruta)
+        if not a:
+            continue
+        print(f"{ruta:26} {a['p50']:8.2f} -> {r['p50']:7.2f} {a['p95']:8.2f} -> {r['p95']:7.2f} "
+              f"{a['rps']:8.1f} -> {r['rps']:7.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clientes", type=int, default=1000)
+    parser.add_argument("--casos-por-cliente", type=int, default=3)
+    parser.add_argument("--expedientes-por-caso", type=int, default=3)
+    parser.add_argument("--abogados", type=int, default=50)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--peticiones", type=int, default=200, help="peticiones por ruta")
+    parser.add_argument("--rutas", nargs="*", help="solo estas rutas (nombres de api_urls)")
+    parser.add_argument("--url", help="servidor ya levantado, p. ej. http://localhost:8000")
+    parser.add_argument("--solo-sembrar", action="store_true",
+                        help="crear y llenar la base de datos y salir")
+    parser.add_argument("--salida", help="archivo JSON con los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings_local")
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.db import connection
+
+    from .datos import Volumen, generar, sembrar
+
+    volumen = Volumen(args.clientes, args.casos_por_cliente, args.expedientes_por_caso,
+                      args.abogados, args.semilla)
+    nombre_bd = settings.DATABASES["default"]["NAME"]
+    if not args.url:
+        if connection.vendor == "sqlite" and os.path.exists(nombre_bd):
+            os.remove(nombre_bd)
+        inicio = time.perf_counter()
+        datos = sembrar(volumen)
+        print(f"datos sembrados en {time.perf_counter() - inicio:.1f} s ({nombre_bd})")
+        connection.close()
+        if args.solo_sembrar:
+            return
+    else:
+        # Misma semilla, mismas claves que las sembradas con --solo-sembrar
+        datos, _ = generar(volumen)
+
+    base = (args.url or servidor_local()).rstrip("/") + "/api/caso/"
+    escenarios = _escenarios(base)
+    rutas = args.rutas or _rutas_api()
+    sin_escenario = [r for r in rutas if r not in escenarios]
+    if sin_escenario:
+        print("rutas sin escenario (no se miden):", ", ".join(sin_escenario))
+
+    resultado = {
+        "meta": {
+            "commit": _commit(),
+            "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "motor": connection.vendor,
+            "python": platform.python_version(),
+            "volumen": vars(volumen),
+            "concurrencia": args.concurrencia,
+            "peticiones": args.peticiones,
+        },
+        "rutas": {},
+    }
+    for ruta in rutas:
+        if ruta not in escenarios:
+            continue
+        total = max(args.concurrencia, int(args.peticiones * PESO.get(ruta, 1)))
+        r = medir_ruta(base, escenarios[ruta], datos, args.concurrencia, total, args.semilla)
+        resultado["rutas"][ruta] = r
+        print(f"{ruta:26} p50 {r['p50']:8.2f}  p95 {r['p95']:8.2f}  p99 {r['p99']:8.2f} ms  "
+              f"{r['rps']:8.1f} rps  errores {r['errores']}")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(json.load(f), resultado)
+
+
+if __name__ == "__main__":
+    main()
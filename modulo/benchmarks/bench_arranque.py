@@ -0,0 +1,82 @@
+"""
+Tiempo de arranque: `manage.py check` y carga de un worker (modulo.wsgi y
+modulo.asgi), cada medición en un proceso nuevo.
+
+    python -m benchmarks.bench_arranque --repeticiones 10 --modos thin thick
+
+CASOS_BD, ORACLE_CLIENT_LIB y demás variables de entorno pasan a los
+procesos hijos; --modos fija ORACLE_MODO en cada corrida. Con --conectar
+el worker abre además la primera conexión, que en modo thick es donde se
+carga el cliente de Oracle (casos/backends/oracle/base.py).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .comun import resumen
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+_WORKER = "import {modulo}"
+_CONECTAR = "; from django.db import connection; connection.ensure_connection()"
+
+COMANDOS = {
+    "check": [sys.executable, "manage.py", "check"],
+    "worker_wsgi": [sys.executable, "-c", _WORKER.format(modulo="modulo.wsgi")],
+    "worker_asgi": [sys.executable, "-c", _WORKER.format(modulo="modulo.asgi")],
+}
+
+
+def medir(comando, entorno, repeticiones):
+    """
+    Segundos de reloj de cada ejecución; lanza CalledProcessError si falla.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run(comando, cwd=RAIZ, env=entorno, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--modos", nargs="*", choices=["thin", "thick"],
+                        help="valores de ORACLE_MODO (por defecto el del entorno)")
+    parser.add_argument("--conectar", action="store_true",
+                        help="los workers abren también la primera conexión")
+    parser.add_argument("--salida", help="archivo JSON con los resultados")
+    args = parser.parse_args()
+
+    comandos = dict(COMANDOS)
+    if args.conectar:
+        for nombre in ("worker_wsgi", "worker_asgi"):
+            comandos[nombre] = comandos[nombre][:-1] + [comandos[nombre][-1] + _CONECTAR]
+
+    resultado = {}
+    for modo in args.modos or [os.environ.get("ORACLE_MODO", "thick")]:
+        entorno = {"DJANGO_SETTINGS_MODULE": "modulo.settings", **os.environ, "ORACLE_MODO": modo}
+        for nombre, comando in comandos.items():
+            try:
+                r = resumen(medir(comando, entorno, args.repeticiones))
+            except subprocess.CalledProcessError as e:
+                error = e.stderr.decode(errors="replace").strip().splitlines()
+                print(f"{modo:6} {nombre:12} falló: {error[-1] if error else e}")
+                continue
+            resultado[f"{modo}/{nombre}"] = r
+            print(f"{modo:6} {nombre:12} p50 {r['p50']:8.1f}  p95 {r['p95']:8.1f}  max {r['max']:8.1f} ms")
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump({"bd": os.environ.get("CASOS_BD", "oracle"), "conectar": args.conectar,
+                       "resultados": resultado}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Rendimiento de las lecturas bajo concurrencia: WSGI con las vistas DRF
+frente a ASGI con las vistas async (/api/caso/async/...).
+
+Levante los dos servidores sobre la misma base de datos con un único
+worker cada uno, para que la diferencia venga del modelo de concurrencia:
+
+    gunicorn modulo.wsgi -w 1 --threads 1 -b :8000
+    uvicorn modulo.asgi:application --workers 1 --port 8001
+
+y ejecute:
+
+    python -m benchmarks.bench_concurrencia --wsgi http://localhost:8000 \\
+        --asgi http://localhost:8001 --nocaso 5 --concurrencia 1 10 50
+
+Las vistas async solo liberan el worker mientras esperan a la base de
+datos con python-oracledb en modo thin; en modo thick van a un hilo.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .comun import peticion, resumen
+
+RUTAS = {
+    "buscar_caso": "buscar_caso/{nocaso}/",
+    "caso": "caso/{nocaso}/",
+    "especializaciones": "especializaciones/",
+}
+
+
+def medir(url, concurrencia, total):
+    """
+    Lanza `total` peticiones GET con `concurrencia` clientes a la vez.
+    """
+    def una(_):
+        status, segundos, _ = peticion(url)
+        return status, segundos
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia) as ejecutor:
+        resultados = list(ejecutor.map(una, range(total)))
+    duracion = time.perf_counter() - inicio
+
+    errores = sum(1 for status, _ in resultados if status >= 400)
+    return {
+        **resumen([s for _, s in resultados]),
+        "errores": errores,
+        "rps": round(total / duracion, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--wsgi", required=True, help="URL del servidor WSGI")
+    parser.add_argument("--asgi", required=True, help="URL del servidor ASGI")
+    parser.add_argument("--nocaso", type=int, required=True)
+    parser.add_argument("--ruta", choices=RUTAS, default="buscar_caso")
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--peticiones", type=int, default=500)
+    args = parser.parse_args()
+
+    ruta = RUTAS[args.ruta].format(nocaso=args.nocaso)
+    urls = {
+        "wsgi": f"{args.wsgi.rstrip('/')}/api/caso/{ruta}",
+        "asgi": f"{args.asgi.rstrip('/')}/api/caso/async/{ruta}",
+    }
+
+    resultado = {}
+    for concurrencia in args.concurrencia:
+        fila = {modo: medir(url, concurrencia, args.peticiones) for modo, url in urls.items()}
+        resultado[concurrencia] = fila
+        print(f"c={concurrencia:<4} "
+              f"wsgi {fila['wsgi']['rps']:8.1f} rps p95 {fila['wsgi']['p95']:8.2f} ms   "
+              f"asgi {fila['asgi']['rps']:8.1f} rps p95 {fila['asgi']['p95']:8.2f} ms")
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Micro-benchmark del armado de respuestas: filas de EXPEDIENTE/CASO ->
+diccionarios -> JSON, con 100k filas por defecto.
+
+Compara la comprensión de listas por índice con strftime/float y
+json.dumps (lo que hacían los servicios con el JSONRenderer de DRF)
+contra casos.filas.Mapeador, y orjson si está instalado:
+
+    python -m benchmarks.bench_filas --filas 100000 --repeticiones 5
+
+No necesita Django ni base de datos.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from casos.filas import Mapeador, fecha, monto
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def generar(n):
+    """
+    Filas como las devuelve el driver: (NOCASO, CODESPECIALIZACION,
+    FCHINICIO, VALOR, FCHFIN) con DATE como datetime y NUMBER como Decimal.
+    """
+    base = datetime(2024, 1, 1)
+    return [
+        (i, f"E{i % 6:03}", base + timedelta(days=i % 900), Decimal(f"{(i % 5000) * 100}.50"),
+         None if i % 3 else base + timedelta(days=i % 900 + 60))
+        for i in range(1, n + 1)
+    ]
+
+
+def antes(filas):
+    casos = [
+        {
+            "nocaso": c[0],
+            "especializacion": c[1],
+            "inicio": c[2].strftime("%Y-%m-%d") if c[2] else None,
+            "valor": float(c[3]) if c[3] else 0,
+            "fin": c[4].strftime("%Y-%m-%d") if c[4] else None,
+        }
+        for c in filas
+    ]
+    return json.dumps(casos, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+_CASO = Mapeador("nocaso", "especializacion", ("inicio", fecha), ("valor", monto), ("fin", fecha))
+
+
+def mapeador(filas):
+    return json.dumps(_CASO.filas(filas), ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def mapeador_orjson(filas):
+    return orjson.dumps(_CASO.filas(filas))
+
+
+def medir(funcion, filas, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(filas)
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    filas = generar(args.filas)
+    variantes = {"antes": antes, "mapeador": mapeador}
+    if orjson is not None:
+        variantes["mapeador+orjson"] = mapeador_orjson
+    else:
+        print("orjson no está instalado: se omite mapeador+orjson")
+
+    # Mismo JSON en todas las variantes
+    esperado = json.loads(antes(filas[:100]))
+    for nombre, funcion in variantes.items():
+        assert json.loads(funcion(filas[:100])) == esperado, nombre
+
+    base = None
+    for nombre, funcion in variantes.items():
+        ms = medir(funcion, filas, args.repeticiones)
+        base = base or ms
+        print(f"{nombre:18} {ms:9.1f} ms   x{base / ms:4.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Latencia de la vista de plantilla /caso/ antes y después de la capa de
+servicios.
+
+Levante dos servidores sobre la misma base de datos, uno con el código
+anterior (que llamaba a su propia API por HTTP) y otro con el actual:
+
+    git worktree add ../antes <commit-anterior>
+    (cd ../antes/modulo && python manage.py runserver 8001 --noreload)
+    python manage.py runserver 8000 --noreload
+
+y ejecute:
+
+    python -m benchmarks.bench_plantilla --antes http://localhost:8001 \\
+        --despues http://localhost:8000 --nombre Luis --apellido Martínez
+
+Con un único worker (--nothreading) el código anterior se bloquea
+esperando su propia respuesta; use --timeout para detectarlo.
+"""
+import argparse
+import json
+import socket
+
+from .comun import peticion, resumen
+
+
+def acciones(nombre, apellido, codcliente):
+    """
+    Secuencia de formularios que envía un usuario al abrir un caso.
+    """
+    yield "cargar", "GET", None
+    yield "buscar_cliente", "POST", {
+        "accion": "buscar_cliente", "nombre": nombre, "apellido": apellido,
+    }
+    if codcliente:
+        yield "crear_caso", "POST", {
+            "accion": "crear_caso", "codcliente": codcliente,
+            "nomcliente": nombre, "apellcliente": apellido,
+        }
+
+
+def medir(base, args):
+    url = f"{base.rstrip('/')}/caso/"
+    latencias = {}
+    for _ in range(args.repeticiones):
+        for accion, metodo, datos in acciones(args.nombre, args.apellido, args.codcliente):
+            status, segundos, _ = peticion(url, metodo, datos=datos)
+            if status >= 500:
+                raise SystemExit(f"{base}: {accion} devolvió {status}")
+            latencias.setdefault(accion, []).append(segundos)
+    return {accion: resumen(valores) for accion, valores in latencias.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--antes", required=True, help="URL del servidor con el código anterior")
+    parser.add_argument("--despues", required=True, help="URL del servidor con el código actual")
+    parser.add_argument("--nombre", required=True)
+    parser.add_argument("--apellido", required=True)
+    parser.add_argument("--codcliente", default="", help="si se indica, mide también 'crear_caso'")
+    parser.add_argument("--repeticiones", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    socket.setdefaulttimeout(args.timeout)
+
+    resultado = {"antes": medir(args.antes, args), "despues": medir(args.despues, args)}
+    for accion, antes in resultado["antes"].items():
+        despues = resultado["despues"][accion]
+        print(f"{accion:16} p50 {antes['p50']:8.2f} -> {despues['p50']:8.2f} ms   "
+              f"p95 {antes['p95']:8.2f} -> {despues['p95']:8.2f} ms")
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == "__main__":
+    main()
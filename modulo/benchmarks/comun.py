@@ -0,0 +1,60 @@
+"""
+Utilidades compartidas por los benchmarks: peticiones HTTP con la
+librería estándar y resumen de latencias.
+"""
+import json
+import statistics
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+def peticion(url, metodo="GET", datos=None, json_body=None, cabeceras=None):
+    """
+    Hace una petición y devuelve (status, segundos, cuerpo).
+    """
+    cuerpo = None
+    cabeceras = dict(cabeceras or {})
+    if json_body is not None:
+        cuerpo = json.dumps(json_body).encode()
+        cabeceras["Content-Type"] = "application/json"
+    elif datos is not None:
+        cuerpo = urllib.parse.urlencode(datos).encode()
+        cabeceras["Content-Type"] = "application/x-www-form-urlencoded"
+
+    req = urllib.request.Request(url, data=cuerpo, method=metodo, headers=cabeceras)
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as res:
+            contenido = res.read()
+            status = res.status
+    except urllib.error.HTTPError as e:
+        contenido = e.read()
+        status = e.code
+    return status, time.perf_counter() - inicio, contenido
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = (len(ordenados) - 1) * p / 100
+    i = int(k)
+    j = min(i + 1, len(ordenados) - 1)
+    return ordenados[i] + (ordenados[j] - ordenados[i]) * (k - i)
+
+
+def resumen(latencias):
+    """
+    Resumen en milisegundos de una lista de latencias en segundos.
+    """
+    ms = [x * 1000 for x in latencias]
+    return {
+        "n": len(ms),
+        "media": round(statistics.fmean(ms), 2) if ms else 0.0,
+        "p50": round(percentil(ms, 50), 2),
+        "p95": round(percentil(ms, 95), 2),
+        "p99": round(percentil(ms, 99), 2),
+        "max": round(max(ms), 2) if ms else 0.0,
+    }
@@ -0,0 +1,121 @@
+"""
+Esquema y datos sintéticos para los benchmarks (SQLite o PostgreSQL).
+
+Crea las tablas con casos/sql/estandar/000_esquema.sql, las llena con un
+volumen configurable y aplica después los demás scripts, que inicializan
+los contadores a partir de los datos cargados. Con la misma semilla se
+generan siempre los mismos datos.
+"""
+import io
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from itertools import product
+
+from django.core.management import call_command
+from django.db import connection, transaction
+
+from casos import esquema
+
+NOMBRES = ["Luis", "Ana", "María", "José", "Carlos", "Lucía", "Andrés", "Sofía", "Jorge",
+           "Camila", "Julián", "Valentina", "Óscar", "Paula", "Iván", "Daniela"]
+APELLIDOS = ["Martínez", "Ruiz", "Gómez", "Pérez", "Rodríguez", "López", "Díaz", "Muñoz",
+             "Rojas", "Vargas", "Castaño", "Suárez", "Núñez", "Ríos", "Ortiz", "Peña"]
+ESPECIALIZACIONES = ["Civil", "Penal", "Laboral", "Familia", "Comercial", "Administrativo"]
+
+
+@dataclass
+class Volumen:
+    clientes: int = 1000
+    casos_por_cliente: int = 3
+    expedientes_por_caso: int = 3
+    abogados: int = 50
+    semilla: int = 42
+
+
+@dataclass
+class Datos:
+    """
+    Claves generadas, para que los escenarios elijan valores que existen.
+    """
+    clientes: list = field(default_factory=list)      # (cod, nombre, apellido, doc)
+    casos: list = field(default_factory=list)         # (nocaso, esp)
+    especializaciones: list = field(default_factory=list)
+    lugares: list = field(default_factory=list)
+    abogados: list = field(default_factory=list)
+
+
+def _nombres(n, rng):
+    combinaciones = [(nom, f"{a1} {a2}") for nom, a1, a2 in product(NOMBRES, APELLIDOS, APELLIDOS)]
+    rng.shuffle(combinaciones)
+    for i in range(n):
+        nom, ape = combinaciones[i % len(combinaciones)]
+        vuelta = i // len(combinaciones)
+        yield nom, (f"{ape} {vuelta}" if vuelta else ape)
+
+
+def generar(volumen):
+    """
+    Devuelve (Datos, [(tabla, filas), ...]) sin tocar la base de datos.
+    """
+    if not 0 < volumen.clientes < 100000:
+        raise ValueError("clientes debe estar entre 1 y 99999 (CODCLIENTE tiene 5 caracteres)")
+    rng = random.Random(volumen.semilla)
+    datos = Datos()
+    hoy = date(2025, 1, 1)
+
+    esp = [(f"E{i:03}", nombre) for i, nombre in enumerate(ESPECIALIZACIONES, start=1)]
+    datos.especializaciones = [e[0] for e in esp]
+    lugares = [(f"L{i:03}", f"Ciudad {i}", "CII") for i in range(1, 31)]
+    datos.lugares = [l[0] for l in lugares]
+    entidades = [(f"N{i:03}", f"Entidad {i}") for i in range(1, 21)]
+    abogados = [(str(90000 + i), rng.choice(NOMBRES), rng.choice(APELLIDOS))
+                for i in range(volumen.abogados)]
+    datos.abogados = [a[0] for a in abogados]
+    abogado_esp = sorted({(a[0], rng.choice(datos.especializaciones)) for a in abogados}
+                         | {(abogados[i % len(abogados)][0], e) for i, e in enumerate(datos.especializaciones)})
+    etapas = [(e, 1, "ET1") for e in datos.especializaciones]
+
+    clientes, casos, expedientes = [], [], []
+    nocaso = 0
+    for i, (nom, ape) in enumerate(_nombres(volumen.clientes, rng), start=1):
+        cod = f"{i:05}"
+        doc = str(1000000 + i)
+        clientes.append((cod, nom, ape, doc))
+        for k in range(volumen.casos_por_cliente):
+            nocaso += 1
+            e = rng.choice(datos.especializaciones)
+            inicio = hoy - timedelta(days=rng.randint(0, 1500))
+            fin = None if k == volumen.casos_por_cliente - 1 else inicio + timedelta(days=rng.randint(30, 400))
+            casos.append((nocaso, cod, e, inicio, fin, rng.randint(100, 50000) * 100))
+            datos.casos.append((nocaso, e))
+            for consec in range(1, volumen.expedientes_por_caso + 1):
+                expedientes.append((nocaso, consec, e, 1, rng.choice(datos.lugares),
+                                    rng.choice(datos.abogados), inicio + timedelta(days=consec * 15)))
+    datos.clientes = clientes
+
+    return datos, [
+        ("ESPECIALIZACION", esp), ("LUGAR", lugares), ("ENTIDAD", entidades),
+        ("ABOGADO", abogados), ("ABOGADO_ESPECIALIZACION", abogado_esp),
+        ("ESPECIA_ETAPA", etapas), ("CLIENTE", clientes), ("CASO", casos),
+        ("EXPEDIENTE", expedientes),
+    ]
+
+
+def sembrar(volumen):
+    """
+    Crea el esquema en la base vacía y carga los datos.
+    """
+    datos, tablas = generar(volumen)
+
+    esquema.aplicar(contadores=False)
+    with transaction.atomic(), connection.cursor() as cursor:
+        for tabla, filas in tablas:
+            if not filas:
+                continue
+            marcas = ", ".join(["%s"] * len(filas[0]))
+            cursor.executemany(f"INSERT INTO {tabla} VALUES ({marcas})", filas)
+    esquema.aplicar(tablas=False)
+
+    call_command("normalizar_clientes", stdout=io.StringIO())
+    return datos
@@ -0,0 +1,22 @@
+"""
+Settings para correr los benchmarks sin Oracle: los de modulo/settings.py
+con CASOS_BD=sqlite sobre un archivo temporal (CASOS_BENCH_DB).
+
+    DJANGO_SETTINGS_MODULE=benchmarks.settings_local
+
+Con CASOS_BD=postgresql se usa la base indicada por las variables PG*.
+"""
+import os
+import tempfile
+
+os.environ.setdefault('CASOS_BD', 'sqlite')
+
+from modulo.settings import *  # noqa: E402,F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+
+if CASOS_BD == 'sqlite':  # noqa: F405
+    DATABASES['default']['NAME'] = os.environ.get(  # noqa: F405
+        'CASOS_BENCH_DB', os.path.join(tempfile.gettempdir(), 'casos_bench.sqlite3')
+    )
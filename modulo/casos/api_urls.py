@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, views_async
 
 urlpatterns = [
     # ====================================================
@@ -7,10 +7,16 @@ urlpatterns = [
     # ====================================================
     path('especializaciones/', views.get_especializaciones, name='get_especializaciones'),
     path('buscar_cliente/', views.buscar_cliente, name='buscar_cliente'),
+    path('clientes/', views.buscar_clientes, name='buscar_clientes'),
     path('crear_caso/', views.crear_caso, name='crear_caso'),
     path('guardar_caso/', views.guardar_caso, name='guardar_caso'),
+    path('abrir_caso/', views.abrir_caso, name='abrir_caso'),
+    path('importar/', views.importar_casos, name='importar_casos'),
+    path('exportar/', views.exportar_casos, name='exportar_casos'),
     path('buscar_caso/<int:nocaso>/', views.buscar_caso, name='buscar_caso_expediente'),
     path('caso/<int:nocaso>/', views.buscar_caso_por_numero, name='buscar_caso_numero'),
+    path('casos/', views.casos_por_numero, name='casos_por_numero'),
+    path('estadisticas/', views.estadisticas_casos, name='estadisticas_casos'),
 
     # ====================================================
     #   EXPEDIENTES
@@ -20,4 +26,22 @@ urlpatterns = [
     path('entidades/', views.get_entidades, name='get_entidades'),
     path('crear_expediente/', views.crear_expediente, name='crear_expediente'),
     path('guardar_expediente/', views.guardar_expediente, name='guardar_expediente'),
-]
\ No newline at end of file
+
+    # ====================================================
+    #   LECTURAS ASYNC (servidor ASGI)
+    # ====================================================
+    path('async/especializaciones/', views_async.get_especializaciones, name='async_especializaciones'),
+    path('async/buscar_cliente/', views_async.buscar_cliente, name='async_buscar_cliente'),
+    path('async/buscar_caso/<int:nocaso>/', views_async.buscar_caso, name='async_buscar_caso'),
+    path('async/caso/<int:nocaso>/', views_async.buscar_caso_por_numero, name='async_caso_numero'),
+    path('async/abogados/', views_async.get_abogados, name='async_abogados'),
+    path('async/ciudades/', views_async.get_ciudades, name='async_ciudades'),
+    path('async/entidades/', views_async.get_entidades, name='async_entidades'),
+    path('eventos/', views_async.eventos_casos, name='eventos_casos'),
+
+    # ====================================================
+    #   DIAGNÓSTICO INTERNO
+    # ====================================================
+    path('interno/pool/', views.estado_pool, name='estado_pool'),
+    path('interno/consultas/', views.estado_consultas, name='estado_consultas'),
+]
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CasosConfig(AppConfig):
     name = 'casos'
+
+    def ready(self):
+        from . import consultas
+        consultas.activar()
@@ -0,0 +1,65 @@
+"""
+Backend Oracle de Django con medición del tiempo de espera del pool y
+carga diferida del cliente de Oracle.
+
+ENGINE: 'casos.backends.oracle'. Sin pool se comporta igual que
+'django.db.backends.oracle'. En modo thick (CASOS_ORACLE_MODO) el cliente
+se carga al abrir la primera conexión del proceso, de modo que manage.py
+check, las pruebas sin Oracle y el arranque de los workers no lo pagan.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db.backends.oracle import base as oracle
+
+from casos import pool
+
+logger = logging.getLogger("casos.oracle")
+
+_lock = threading.Lock()
+_cliente_cargado = False
+
+
+def modo_thin():
+    return getattr(settings, "CASOS_ORACLE_MODO", "thick") == "thin"
+
+
+def iniciar_cliente():
+    """
+    init_oracle_client una sola vez por proceso (solo en modo thick). Debe
+    ocurrir antes de la primera conexión: después python-oracledb ya quedó
+    en modo thin.
+    """
+    global _cliente_cargado
+    if _cliente_cargado or modo_thin():
+        return
+    with _lock:
+        if _cliente_cargado:
+            return
+        inicio = time.perf_counter()
+        oracle.Database.init_oracle_client(lib_dir=getattr(settings, "CASOS_ORACLE_LIB", None))
+        _cliente_cargado = True
+        logger.info("cliente de Oracle cargado en %.0f ms", (time.perf_counter() - inicio) * 1000)
+
+
+class DatabaseWrapper(oracle.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        iniciar_cliente()
+        if not self.is_pool:
+            return super().get_new_connection(conn_params)
+        inicio = time.perf_counter()
+        try:
+            return super().get_new_connection(conn_params)
+        finally:
+            pool.registrar_espera(self.alias, time.perf_counter() - inicio)
+
+    def pool_creado(self):
+        """
+        El pool de este alias si ya se creó, o None. A diferencia de .pool
+        no lo crea: crearlo antes de iniciar_cliente() dejaría a
+        python-oracledb en modo thin.
+        """
+        return self._connection_pools.get((self.alias, self.settings_dict["USER"]))
@@ -0,0 +1,143 @@
+"""
+Caché por proceso de los catálogos de referencia (especializaciones,
+ciudades, abogados, entidades).
+
+Cada catálogo se recarga cuando vence CASOS_CATALOGOS_TTL o cuando se
+invalida explícitamente con invalidar(). Cada carga incrementa la versión
+y recalcula el ETag a partir del contenido, de modo que todos los workers
+devuelven el mismo ETag para los mismos datos.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from functools import wraps
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Entrada:
+    datos: list
+    version: int
+    etag: str
+    cargado: float
+
+
+class CacheCatalogos:
+
+    def __init__(self):
+        self._cargadores = {}
+        self._entradas = {}
+        self._versiones = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, "CASOS_CATALOGOS_TTL", 300)
+
+    def registrar(self, nombre, cargador):
+        self._cargadores[nombre] = cargador
+
+    def nombres(self):
+        return list(self._cargadores)
+
+    def _vigente(self, entrada):
+        return entrada is not None and time.monotonic() - entrada.cargado < self.ttl
+
+    def vigente(self, nombre):
+        """
+        Entrada del catálogo si está cargada y no ha vencido; None si no.
+        """
+        entrada = self._entradas.get(nombre)
+        return entrada if self._vigente(entrada) else None
+
+    def obtener(self, nombre):
+        entrada = self._entradas.get(nombre)
+        if self._vigente(entrada):
+            return entrada
+
+        with self._lock:
+            # Otro hilo pudo recargarlo mientras esperábamos
+            entrada = self._entradas.get(nombre)
+            if self._vigente(entrada):
+                return entrada
+            return self._cargar(nombre)
+
+    def _cargar(self, nombre):
+        datos = self._cargadores[nombre]()
+        contenido = json.dumps(datos, sort_keys=True, default=str).encode()
+        version = self._versiones.get(nombre, 0) + 1
+        entrada = Entrada(
+            datos=datos,
+            version=version,
+            etag=f'"{nombre}-{hashlib.md5(contenido).hexdigest()}"',
+            cargado=time.monotonic(),
+        )
+        self._versiones[nombre] = version
+        self._entradas[nombre] = entrada
+        return entrada
+
+    def invalidar(self, nombre=None):
+        """
+        Descarta uno o todos los catálogos; se recargan en el próximo uso.
+        """
+        with self._lock:
+            if nombre is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(nombre, None)
+
+    def calentar(self, nombres=None):
+        """
+        Carga los catálogos indicados (o todos) y devuelve sus entradas.
+        ValueError si alguno no está registrado.
+        """
+        desconocidos = set(nombres or ()) - set(self._cargadores)
+        if desconocidos:
+            raise ValueError(
+                f"Catálogos desconocidos: {', '.join(sorted(desconocidos))} "
+                f"(disponibles: {', '.join(self._cargadores)})"
+            )
+        with self._lock:
+            return {nombre: self._cargar(nombre) for nombre in (nombres or self._cargadores)}
+
+
+cache = CacheCatalogos()
+
+
+def catalogo(nombre):
+    """
+    Registra la función como cargador del catálogo y la reemplaza por la
+    lectura desde la caché.
+    """
+    def decorador(cargador):
+        cache.registrar(nombre, cargador)
+
+        @wraps(cargador)
+        def leer():
+            return cache.obtener(nombre).datos
+        return leer
+    return decorador
+
+
+def invalidar(nombre=None):
+    cache.invalidar(nombre)
+
+
+def calentar_al_arrancar():
+    """
+    Llamado desde wsgi.py/asgi.py. Un fallo de base de datos no impide el
+    arranque: los catálogos se cargarán en la primera petición.
+    """
+    if not getattr(settings, "CASOS_CATALOGOS_CALENTAR", False):
+        return
+    from . import servicios  # noqa: F401  (registra los catálogos)
+    try:
+        cache.calentar()
+    except Exception:
+        logger.exception("No se pudieron calentar los catálogos")
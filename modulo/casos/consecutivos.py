@@ -0,0 +1,264 @@
+"""
+Asignación de consecutivos sin MAX()+1.
+
+NOCASO sale de la secuencia CASO_SEQ en Oracle o de la tabla CONSECUTIVO
+en los demás motores (DDL en casos/sql/). Cada proceso reserva un bloque
+de números de una sola vez y los entrega desde memoria, de modo que la
+mayoría de las asignaciones no van a la base de datos. En Oracle cada
+bloque reservado queda además en CASO_BLOQUE: la secuencia no dice qué
+números se entregaron.
+
+CONSECEXPE se asigna dentro del propio INSERT del expediente a partir de
+la fila contador del caso en EXPEDIENTE_CONSEC. En la misma operación se
+incrementa CASO.VERSION, que usan los ETag de las lecturas del caso.
+"""
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+
+from . import dialecto
+from .consultas import con_nombre, consulta, registrar
+from .db import single_result, many_results, execute
+
+
+class AsignadorCasos:
+
+    def __init__(self, secuencia="CASO_SEQ", contador="CASO", bloques="CASO_BLOQUE"):
+        self.secuencia = secuencia
+        self.contador = contador
+        self.bloques = bloques
+        self._lock = threading.Lock()
+        self._libres = deque()
+        self._entregados = set()
+        self._pid = None
+
+    @property
+    def bloque(self):
+        return getattr(settings, "CASOS_CONSECUTIVO_BLOQUE", 20)
+
+    def _del_proceso(self):
+        """
+        Descarta el bloque reservado antes de un fork: no se comparte entre
+        workers. Se llama con el lock tomado.
+        """
+        if self._pid != os.getpid():
+            self._libres.clear()
+            self._entregados.clear()
+            self._pid = os.getpid()
+
+    def siguiente(self):
+        with self._lock:
+            self._del_proceso()
+            if not self._libres:
+                # Los números de bloques anteriores ya quedan bajo tope():
+                # confirmar() los acepta sin guardarlos aquí.
+                self._entregados.clear()
+                self._libres.extend(self._reservar(self.bloque))
+            nocaso = self._libres.popleft()
+            self._entregados.add(nocaso)
+            return nocaso
+
+    def reservar(self, cantidad):
+        """
+        Números para una carga masiva; no pasan por el bloque del proceso.
+        """
+        return list(self._reservar(cantidad)) if cantidad > 0 else []
+
+    def _reservar(self, cantidad):
+        """
+        Reserva `cantidad` números en un solo viaje a la base de datos.
+
+        En la tabla CONSECUTIVO la reserva se confirma con la transacción
+        en curso: no debe hacerse dentro de un atomic() que pueda deshacerse,
+        o los números entregados se repetirían.
+        """
+        if dialecto.es_oracle():
+            filas = many_results(con_nombre(
+                "consecutivo_reservar",
+                f"SELECT {self.secuencia}.NEXTVAL FROM DUAL CONNECT BY LEVEL <= %s",
+            ), [cantidad])
+            numeros = sorted(f[0] for f in filas)
+            # Con autocommit, igual que la secuencia: el bloque queda
+            # registrado antes de entregar el primer número
+            for desde, hasta in tramos(numeros):
+                execute(con_nombre(
+                    "consecutivo_bloque_registrar",
+                    f"INSERT INTO {self.bloques} (DESDE, HASTA) VALUES (%s, %s)",
+                ), [desde, hasta])
+            return numeros
+
+        with transaction.atomic():
+            execute(consulta("consecutivo_sumar"), [cantidad, self.contador])
+            tope = single_result(consulta("consecutivo_valor"), [self.contador])[0]
+        return range(tope - cantidad + 1, tope + 1)
+
+    def confirmar(self, nocaso):
+        """
+        True si el número fue entregado por el asignador (en este proceso o
+        en cualquier otro). No comprueba si ya existe un caso con él.
+
+        En Oracle se busca el bloque de CASO_BLOQUE que lo contiene; los
+        números que la caché de la secuencia perdió no están en ninguno.
+        """
+        try:
+            nocaso = int(nocaso)
+        except (TypeError, ValueError):
+            return False
+        if nocaso <= 0:
+            return False
+        with self._lock:
+            self._del_proceso()
+            if nocaso in self._entregados:
+                return True
+        if dialecto.es_oracle():
+            fila = single_result(con_nombre(
+                "consecutivo_bloque",
+                f"SELECT DESDE FROM (SELECT DESDE FROM {self.bloques} WHERE HASTA >= %s"
+                " ORDER BY HASTA) WHERE ROWNUM = 1",
+            ), [nocaso])
+            return fila is not None and fila[0] <= nocaso
+        return nocaso <= self.tope()
+
+    def tope(self):
+        """
+        Mayor número entregado en cualquier proceso. En Oracle puede haber
+        huecos por debajo (números que la caché de la secuencia perdió).
+        """
+        if dialecto.es_oracle():
+            # No LAST_NUMBER de USER_SEQUENCES: incluye la caché sin entregar
+            fila = single_result(con_nombre(
+                "consecutivo_tope_bloques", f"SELECT MAX(HASTA) FROM {self.bloques}"
+            ))
+        else:
+            fila = single_result(consulta("consecutivo_valor"), [self.contador])
+        return (fila[0] or 0) if fila else 0
+
+
+def tramos(numeros):
+    """
+    Números ordenados -> pares (desde, hasta) de los tramos consecutivos.
+    Con otras sesiones pidiendo NEXTVAL a la vez un bloque puede salir
+    partido.
+    """
+    partes = []
+    for numero in numeros:
+        if partes and partes[-1][1] == numero - 1:
+            partes[-1][1] = numero
+        else:
+            partes.append([numero, numero])
+    return [tuple(p) for p in partes]
+
+
+registrar("consecutivo_sumar", "UPDATE CONSECUTIVO SET VALOR = VALOR + %s WHERE NOMBRE = %s")
+registrar("consecutivo_valor", "SELECT VALOR FROM CONSECUTIVO WHERE NOMBRE = %s")
+
+casos = AsignadorCasos()
+
+
+# ==============================
+# CONSECUTIVO DE EXPEDIENTE
+# ==============================
+
+class _Salida:
+    """
+    Variable OUT de oracledb para bloques PL/SQL ejecutados con el cursor
+    de Django (mismo protocolo que InsertVar del backend de Oracle).
+    """
+    def bind_parameter(self, cursor):
+        self.var = cursor.cursor.var(int)
+        return self.var
+
+    def valor(self):
+        return self.var.getvalue()
+
+
+# El contador se crea a partir de MAX(CONSECEXPE) la primera vez que se
+# usa en un caso; si dos sesiones lo crean a la vez, la perdedora reintenta
+# el UPDATE.
+_EXPEDIENTE_ORACLE = """
+    DECLARE
+        v_consec NUMBER;
+    BEGIN
+        UPDATE CASO SET VERSION = VERSION + 1 WHERE NOCASO = %(nocaso)s;
+
+        UPDATE EXPEDIENTE_CONSEC SET ULTIMO = ULTIMO + 1
+        WHERE NOCASO = %(nocaso)s
+        RETURNING ULTIMO INTO v_consec;
+
+        IF SQL%%ROWCOUNT = 0 THEN
+            BEGIN
+                SELECT NVL(MAX(CONSECEXPE), 0) + 1 INTO v_consec
+                FROM EXPEDIENTE WHERE NOCASO = %(nocaso)s;
+                INSERT INTO EXPEDIENTE_CONSEC (NOCASO, ULTIMO) VALUES (%(nocaso)s, v_consec);
+            EXCEPTION WHEN DUP_VAL_ON_INDEX THEN
+                UPDATE EXPEDIENTE_CONSEC SET ULTIMO = ULTIMO + 1
+                WHERE NOCASO = %(nocaso)s
+                RETURNING ULTIMO INTO v_consec;
+            END;
+        END IF;
+
+        INSERT INTO EXPEDIENTE
+        (NOCASO, CONSECEXPE, CODESPECIALIZACION, IDTIPOCASO2, CODLUGAR, CEDULA, FCHETAPA)
+        VALUES (%(nocaso)s, v_consec,
+               (SELECT CODESPECIALIZACION FROM CASO WHERE NOCASO = %(nocaso)s),
+               %(idetapa)s, %(codlugar)s, %(cedula)s, SYSDATE);
+
+        %(consec)s := v_consec;
+    END;
+"""
+
+_CONTADOR_UPSERT = """
+    INSERT INTO EXPEDIENTE_CONSEC (NOCASO, ULTIMO)
+    VALUES (%(nocaso)s, (SELECT COALESCE(MAX(CONSECEXPE), 0) + 1
+                         FROM EXPEDIENTE WHERE NOCASO = %(nocaso)s))
+    ON CONFLICT (NOCASO) DO UPDATE SET ULTIMO = EXPEDIENTE_CONSEC.ULTIMO + 1
+    RETURNING ULTIMO
+"""
+
+_VERSION_CASO = "UPDATE CASO SET VERSION = VERSION + 1 WHERE NOCASO = %(nocaso)s"
+
+_EXPEDIENTE_INSERT = """
+    INSERT INTO EXPEDIENTE
+    (NOCASO, CONSECEXPE, CODESPECIALIZACION, IDTIPOCASO2, CODLUGAR, CEDULA, FCHETAPA)
+    SELECT %(nocaso)s, {consec},
+           (SELECT CODESPECIALIZACION FROM CASO WHERE NOCASO = %(nocaso)s),
+           %(idetapa)s, %(codlugar)s, %(cedula)s, CURRENT_DATE
+"""
+
+
+registrar("expediente_insertar_oracle", _EXPEDIENTE_ORACLE)
+registrar("expediente_insertar_postgresql",
+          "WITH v AS (" + _VERSION_CASO + "), c AS (" + _CONTADOR_UPSERT + ")"
+          + _EXPEDIENTE_INSERT.format(consec="c.ULTIMO") + " FROM c RETURNING CONSECEXPE")
+registrar("expediente_version", _VERSION_CASO)
+registrar("expediente_contador", _CONTADOR_UPSERT)
+registrar("expediente_insertar", _EXPEDIENTE_INSERT.format(consec="%(consec)s"))
+
+
+def insertar_expediente(nocaso, idetapa, codlugar, cedula):
+    """
+    Inserta el expediente asignando CONSECEXPE en la misma operación y
+    devuelve el consecutivo asignado.
+
+    Oracle y PostgreSQL lo hacen en una sola sentencia (bloque PL/SQL o
+    CTE con RETURNING). En SQLite son tres sentencias en una transacción,
+    serializadas por el bloqueo de escritura de la base.
+    """
+    params = {"nocaso": nocaso, "idetapa": idetapa, "codlugar": codlugar, "cedula": cedula}
+
+    if dialecto.es_oracle():
+        salida = _Salida()
+        execute(consulta("expediente_insertar_oracle"), {**params, "consec": salida})
+        return salida.valor()
+
+    if dialecto.motor() == "postgresql":
+        return single_result(consulta("expediente_insertar_postgresql"), params)[0]
+
+    with transaction.atomic():
+        execute(consulta("expediente_version"), params)
+        consec = single_result(consulta("expediente_contador"), params)[0]
+        execute(consulta("expediente_insertar"), {**params, "consec": consec})
+    return consec
@@ -0,0 +1,154 @@
+"""
+Registro de consultas con nombre y sus estadísticas por proceso.
+
+Cada consulta se declara una vez con registrar(nombre, sql) y los
+servicios la piden por nombre con consulta(nombre). El resultado es la SQL
+como str (subclase Consulta, con el nombre), así que se pasa sin cambios
+a single_result, many_results o a los pasos de los servicios. El texto es
+siempre el mismo para un nombre, de modo que Oracle lo encuentra en la
+caché de sentencias del driver (stmtcachesize) sin volver a analizarlo.
+Las consultas que dependen del motor (dialecto) se registran con una
+función que arma la SQL la primera vez que se pide.
+
+Un execute_wrapper instalado en cada conexión al crearse registra por
+nombre las llamadas, el tiempo total y un histograma de latencias; las
+consultas sin nombre no se miden. Se consultan en
+/api/caso/interno/consultas/ (solo INTERNAL_IPS) o con manage.py consultas.
+"""
+import bisect
+import os
+import threading
+import time
+
+from django.db.backends.signals import connection_created
+
+# Límites superiores (ms) de los intervalos del histograma; el último
+# intervalo es "más de 1000 ms".
+LIMITES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+_lock = threading.Lock()
+_definiciones = {}
+_consultas = {}
+_estadisticas = {}
+
+
+class Consulta(str):
+    """
+    SQL de una consulta registrada; `nombre` identifica sus estadísticas.
+    """
+    nombre = None
+
+
+def con_nombre(nombre, texto):
+    """
+    Consulta con nombre a partir de un texto ya armado (SQL dinámica).
+    """
+    resultado = Consulta(texto)
+    resultado.nombre = nombre
+    return resultado
+
+
+def registrar(nombre, sql):
+    """
+    Declara una consulta. `sql` es el texto o una función sin argumentos
+    que lo devuelve (para las partes que dependen del motor).
+    """
+    anterior = _definiciones.get(nombre)
+    if isinstance(anterior, str) and anterior != sql:
+        raise ValueError(f"Consulta ya registrada con otra SQL: {nombre}")
+    _definiciones[nombre] = sql
+    return nombre
+
+
+def consulta(nombre):
+    """
+    SQL de una consulta registrada (se arma una sola vez por proceso).
+    """
+    resultado = _consultas.get(nombre)
+    if resultado is None:
+        definicion = _definiciones[nombre]
+        resultado = _consultas[nombre] = con_nombre(
+            nombre, definicion() if callable(definicion) else definicion
+        )
+    return resultado
+
+
+def nombres():
+    return sorted(_definiciones)
+
+
+# ==============================
+# ESTADÍSTICAS
+# ==============================
+
+def anotar(sql, segundos):
+    """
+    Suma una ejecución a las estadísticas de la consulta, si tiene nombre.
+    """
+    nombre = getattr(sql, "nombre", None)
+    if nombre is None:
+        return
+    ms = segundos * 1000
+    with _lock:
+        e = _estadisticas.get(nombre)
+        if e is None:
+            e = _estadisticas[nombre] = {
+                "llamadas": 0, "total": 0.0, "max": 0.0, "histograma": [0] * (len(LIMITES_MS) + 1),
+            }
+        e["llamadas"] += 1
+        e["total"] += ms
+        e["max"] = max(e["max"], ms)
+        e["histograma"][bisect.bisect_left(LIMITES_MS, ms)] += 1
+
+
+def _envoltura(execute, sql, params, many, context):
+    if getattr(sql, "nombre", None) is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        anotar(sql, time.perf_counter() - inicio)
+
+
+def _instalar(sender, connection, **kwargs):
+    if _envoltura not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_envoltura)
+
+
+def activar():
+    """
+    Mide las consultas con nombre en todas las conexiones que se creen
+    desde ahora (CasosConfig.ready).
+    """
+    connection_created.connect(_instalar, dispatch_uid="casos.consultas")
+
+
+def estadisticas():
+    """
+    Estadísticas de este proceso, de la consulta con más tiempo total a
+    la de menos. Incluye las registradas que no se han ejecutado.
+    """
+    with _lock:
+        copia = {n: dict(e, histograma=list(e["histograma"])) for n, e in _estadisticas.items()}
+
+    filas = []
+    for nombre in sorted(set(_definiciones) | set(copia)):
+        e = copia.get(nombre, {"llamadas": 0, "total": 0.0, "max": 0.0,
+                               "histograma": [0] * (len(LIMITES_MS) + 1)})
+        filas.append({
+            "nombre": nombre,
+            "llamadas": e["llamadas"],
+            "total_ms": round(e["total"], 3),
+            "media_ms": round(e["total"] / e["llamadas"], 3) if e["llamadas"] else 0.0,
+            "max_ms": round(e["max"], 3),
+            "histograma": dict(zip([f"<={l}" for l in LIMITES_MS] + [f">{LIMITES_MS[-1]}"],
+                                   e["histograma"])),
+        })
+    filas.sort(key=lambda f: f["total_ms"], reverse=True)
+    return {"pid": os.getpid(), "limites_ms": list(LIMITES_MS), "consultas": filas}
+
+
+def reiniciar():
+    with _lock:
+        _estadisticas.clear()
@@ -0,0 +1,115 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .consultas import con_nombre
+from .replicas import alias_lectura
+from .dialecto import limitar  # noqa: F401  (usado por servicios)
+
+# Pasos que puede pedir un servicio escrito como generador (ver ejecutar)
+UNO, VARIOS, CATALOGO = "uno", "varios", "catalogo"
+
+# ==============================
+# UTILIDADES SQL
+# ==============================
+# `using` es el alias de DATABASES; por defecto el primario. Las lecturas
+# que pueden ir a la réplica pasan using=alias_lectura() (casos/replicas.py).
+
+def single_result(query, params=[], using=DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchone()
+
+def many_results(query, params=[], using=DEFAULT_DB_ALIAS):
+    with connections[using].cursor() as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+def execute(query, params=[], using=DEFAULT_DB_ALIAS):
+    """
+    Devuelve el número de filas afectadas.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(query, params)
+        return cursor.rowcount
+
+# Violaciones de restricción por motor: ORA-/SQLSTATE/código extendido de SQLite
+_UNICA = {1, "23505", 1555, 2067}
+_FORANEA = {2291, "23503", 787}
+
+def restriccion_violada(error):
+    """
+    "unica" (clave primaria o única repetida), "foranea" o None (otra
+    restricción) para un IntegrityError de Django.
+    """
+    causa = error.__cause__ or error
+    # oracledb lleva el código en args[0]; psycopg, psycopg2 y sqlite3 en
+    # un atributo del error
+    codigo = getattr(causa.args[0], "code", None) if causa.args else None
+    for atributo in ("sqlstate", "pgcode", "sqlite_errorcode"):
+        codigo = codigo or getattr(causa, atributo, None)
+    if codigo in _UNICA:
+        return "unica"
+    if codigo in _FORANEA:
+        return "foranea"
+    return None
+
+# Oracle no acepta listas IN de más de 1000 elementos
+MAX_IN = 1000
+# Tamaños de lista IN: una lista se completa hasta el siguiente repitiendo
+# su último valor, para que haya pocas SQL distintas en la caché de
+# sentencias de Oracle.
+TAMANOS_IN = (10, 50, 100, 250, 500, MAX_IN)
+
+def many_results_in(query, valores, params=(), using=DEFAULT_DB_ALIAS):
+    """
+    many_results para una consulta con lista IN larga: `query` lleva
+    `{marcas}` en el lugar de la lista y se ejecuta por bloques de MAX_IN
+    valores. `params` son los parámetros que van antes de la lista.
+    """
+    valores = list(valores)
+    nombre = getattr(query, "nombre", None)
+    filas = []
+    for i in range(0, len(valores), MAX_IN):
+        parte = valores[i:i + MAX_IN]
+        tamano = next(t for t in TAMANOS_IN if t >= len(parte))
+        parte += parte[-1:] * (tamano - len(parte))
+        sql = query.format(marcas=", ".join(["%s"] * tamano))
+        if nombre is not None:
+            sql = con_nombre(nombre, sql)
+        filas.extend(many_results(sql, [*params, *parte], using))
+    return filas
+
+def cursor_nativo(cursor):
+    """
+    Cursor del driver (oracledb, psycopg, sqlite3) bajo los envoltorios
+    de Django, para usar opciones que Django no expone.
+    """
+    while hasattr(cursor, "cursor"):
+        cursor = cursor.cursor
+    return cursor
+
+
+def ejecutar(pasos, using=None):
+    """
+    Corre un servicio de lectura escrito como generador: cada
+    `yield (UNO|VARIOS, sql, params)` recibe el resultado de la consulta y
+    `yield (CATALOGO, nombre, None)` los datos del catálogo en caché.
+    La misma función la corre db_async.ejecutar_async en las vistas async.
+    Sin `using` las consultas van al alias de lectura de la petición.
+    """
+    from .catalogos import cache
+
+    using = using or alias_lectura()
+
+    try:
+        paso = next(pasos)
+        while True:
+            tipo, sql, params = paso
+            if tipo == UNO:
+                resultado = single_result(sql, params, using)
+            elif tipo == VARIOS:
+                resultado = many_results(sql, params, using)
+            else:
+                resultado = cache.obtener(sql).datos
+            paso = pasos.send(resultado)
+    except StopIteration as fin:
+        return fin.value
@@ -0,0 +1,114 @@
+"""
+Acceso a la base de datos desde las vistas async (casos/views_async.py).
+
+En Oracle con python-oracledb en modo thin (ORACLE_MODO=thin) las
+consultas van a un pool asyncio propio (oracledb.create_pool_async):
+mientras una consulta espera a la base de datos el worker ASGI sigue
+atendiendo otras peticiones. En modo thick o en otros motores las
+consultas se ejecutan con sync_to_async(thread_sensitive=True): bajo ASGI
+todas las de una petición van al mismo hilo y reutilizan su conexión de
+Django, que se cierra con request_finished como en WSGI. Las consultas van al alias de lectura de la petición
+(casos/replicas.py), con un pool asyncio por alias.
+"""
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .catalogos import cache
+from .db import UNO, VARIOS, single_result, many_results
+from . import consultas, dialecto, medicion
+from .replicas import alias_lectura
+
+_pools = {}
+
+
+def nativo():
+    """
+    True si se puede usar la API asyncio de python-oracledb.
+    """
+    if not dialecto.es_oracle():
+        return False
+    import oracledb
+    from .backends.oracle.base import modo_thin
+    return modo_thin() and hasattr(oracledb, "create_pool_async")
+
+
+def _obtener_pool(alias):
+    pool = _pools.get(alias)
+    if pool is None:
+        import oracledb
+        from django.db.backends.oracle.utils import dsn
+
+        db = settings.DATABASES[alias]
+        pool = _pools[alias] = oracledb.create_pool_async(
+            user=db["USER"],
+            password=db["PASSWORD"],
+            dsn=dsn(db),
+            min=1,
+            max=getattr(settings, "CASOS_ASYNC_POOL_MAX", 10),
+            increment=1,
+        )
+    return pool
+
+
+def _marcadores(sql):
+    """
+    %s (estilo Django) -> :1, :2, ... (estilo oracledb).
+    """
+    partes = sql.split("%s")
+    sql = partes[0]
+    for i, parte in enumerate(partes[1:], start=1):
+        sql += f":{i}" + parte
+    return sql.replace("%%", "%")
+
+
+def en_hilo(funcion):
+    """
+    Versión awaitable de una función síncrona que usa la base de datos,
+    en el hilo (y con la conexión) de la petición.
+    """
+    return sync_to_async(funcion, thread_sensitive=True)
+
+
+async def _consultar(tipo, sql, params, alias):
+    if not nativo():
+        return await en_hilo(single_result if tipo == UNO else many_results)(sql, params, alias)
+
+    async with _obtener_pool(alias).acquire() as conexion:
+        inicio = time.perf_counter()
+        try:
+            if tipo == UNO:
+                return await conexion.fetchone(_marcadores(sql), params or [])
+            return await conexion.fetchall(_marcadores(sql), params or [])
+        finally:
+            segundos = time.perf_counter() - inicio
+            consultas.anotar(sql, segundos)
+            if (m := medicion.actual()) is not None:
+                m.registrar(sql, segundos)
+
+
+async def catalogo(nombre):
+    """
+    Entrada del catálogo; solo va a la base de datos si no está vigente.
+    """
+    return cache.vigente(nombre) or await en_hilo(cache.obtener)(nombre)
+
+
+async def ejecutar_async(pasos):
+    """
+    Equivalente async de db.ejecutar para los servicios escritos como
+    generadores (servicios.pasos_*).
+    """
+    alias = alias_lectura()
+    try:
+        paso = next(pasos)
+        while True:
+            tipo, sql, params = paso
+            if tipo in (UNO, VARIOS):
+                resultado = await _consultar(tipo, sql, params, alias)
+            else:
+                resultado = (await catalogo(sql)).datos
+            paso = pasos.send(resultado)
+    except StopIteration as fin:
+        return fin.value
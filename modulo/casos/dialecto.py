@@ -0,0 +1,46 @@
+"""
+Diferencias de SQL entre Oracle, PostgreSQL y SQLite.
+
+Las consultas de casos/ usan SQL común y piden aquí las pocas
+construcciones que cambian según el motor (connection.vendor). El motor
+se elige en settings.py con CASOS_BD.
+"""
+from django.db import connection
+
+
+def motor():
+    return connection.vendor
+
+
+def es_oracle():
+    return connection.vendor == "oracle"
+
+
+def nvl(expresion, defecto):
+    """
+    NVL en Oracle, COALESCE en los demás.
+    """
+    if es_oracle():
+        return f"NVL({expresion}, {defecto})"
+    return f"COALESCE({expresion}, {defecto})"
+
+
+def limitar(query, n=None):
+    """
+    Primeras n filas de una consulta ordenada. Oracle 11g no tiene
+    FETCH FIRST, así que se envuelve con ROWNUM. Sin n el límite queda
+    como último parámetro (%s) y el texto no cambia de una página a otra.
+    """
+    limite = "%s" if n is None else int(n)
+    if es_oracle():
+        return f"SELECT * FROM ({query}) WHERE ROWNUM <= {limite}"
+    return f"{query} LIMIT {limite}"
+
+
+def mes(columna):
+    """
+    'YYYY-MM' de una columna DATE.
+    """
+    if connection.vendor == "sqlite":
+        return f"STRFTIME('%%Y-%%m', {columna})"
+    return f"TO_CHAR({columna}, 'YYYY-MM')"
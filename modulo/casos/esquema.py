@@ -0,0 +1,71 @@
+"""
+Scripts de casos/sql/estandar/ (SQLite y PostgreSQL).
+
+000_esquema.sql crea las tablas; los scripts 010 en adelante crean los
+contadores e índices a partir de los datos que ya existan. Un script con
+el motor en el nombre (080_eventos_caso.postgresql.sql) reemplaza en ese
+motor al del mismo número. Los CREATE TRIGGER y CREATE FUNCTION terminan,
+como en SQL*Plus, con una línea que solo tiene '/'. Los scripts de
+casos/sql/oracle/ usan PL/SQL y se ejecutan con SQL*Plus.
+"""
+import re
+from pathlib import Path
+
+from django.db import connection, transaction
+
+DIRECTORIO = Path(__file__).resolve().parent / "sql" / "estandar"
+TABLAS = "000"
+_BLOQUE = re.compile(r"CREATE\s+(OR\s+REPLACE\s+)?(TRIGGER|FUNCTION)\b", re.IGNORECASE)
+
+
+def sentencias(ruta):
+    """
+    Sentencias de un script .sql (separadas por ';', sin comentarios). Un
+    bloque CREATE TRIGGER/FUNCTION llega hasta la línea '/' entero, con
+    los ';' de su cuerpo.
+    """
+    def separar(lineas):
+        return [s.strip() for s in "\n".join(lineas).split(";") if s.strip()]
+
+    resultado, sueltas, bloque = [], [], None
+    for linea in ruta.read_text(encoding="utf-8").splitlines():
+        if linea.strip().startswith("--"):
+            continue
+        if bloque is not None:
+            if linea.strip() == "/":
+                resultado.append("\n".join(bloque).strip())
+                bloque = None
+            else:
+                bloque.append(linea)
+        elif _BLOQUE.match(linea.strip()):
+            resultado += separar(sueltas)
+            sueltas, bloque = [], [linea]
+        else:
+            sueltas.append(linea)
+    return resultado + separar(sueltas)
+
+
+def scripts(tablas=True, contadores=True):
+    motor = connection.vendor
+    for ruta in sorted(DIRECTORIO.glob("*.sql")):
+        nombre, *variante = ruta.stem.split(".")
+        if variante:
+            if variante != [motor]:
+                continue
+        elif DIRECTORIO.joinpath(f"{nombre}.{motor}.sql").exists():
+            continue
+        if (tablas if ruta.name.startswith(TABLAS) else contadores):
+            yield ruta
+
+
+def aplicar(tablas=True, contadores=True):
+    """
+    Ejecuta los scripts en una transacción; devuelve sus nombres.
+    """
+    aplicados = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for ruta in scripts(tablas, contadores):
+            for sentencia in sentencias(ruta):
+                cursor.execute(sentencia)
+            aplicados.append(ruta.name)
+    return aplicados
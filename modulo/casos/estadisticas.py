@@ -0,0 +1,131 @@
+"""
+Resumen de casos por especialización y mes (tabla CASO_ESTADISTICA).
+
+La tabla se crea y se llena a partir de CASO con los scripts
+050_estadistica_caso.sql de casos/sql/ y desde entonces se mantiene por
+incrementos: guardar_caso y la carga masiva suman sus casos en la misma
+transacción del INSERT. /api/caso/estadisticas/ lee solo esta tabla, cuyo
+tamaño depende de las especializaciones y los meses, no de los casos.
+
+Un caso es activo mientras FCHFIN es NULL y cerrado cuando la tiene; el
+mes es el de FCHINICIO. La API no cierra ni modifica casos: si se cambian
+por fuera, el resumen se reconstruye con manage.py recalcular_estadisticas.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+
+from . import dialecto
+from .consultas import consulta, registrar
+from .db import single_result, many_results, execute
+from .replicas import alias_lectura
+from .filas import Mapeador, monto
+
+_MERGE_ORACLE = """
+    MERGE INTO CASO_ESTADISTICA E
+    USING (SELECT %s AS ESP, %s AS MES, %s AS ACTIVOS, %s AS CERRADOS, %s AS VALOR FROM DUAL) D
+    ON (E.CODESPECIALIZACION = D.ESP AND E.MES = D.MES)
+    WHEN MATCHED THEN UPDATE SET
+        E.ACTIVOS = E.ACTIVOS + D.ACTIVOS,
+        E.CERRADOS = E.CERRADOS + D.CERRADOS,
+        E.VALOR = E.VALOR + D.VALOR
+    WHEN NOT MATCHED THEN
+        INSERT (CODESPECIALIZACION, MES, ACTIVOS, CERRADOS, VALOR)
+        VALUES (D.ESP, D.MES, D.ACTIVOS, D.CERRADOS, D.VALOR)
+"""
+
+_UPSERT = """
+    INSERT INTO CASO_ESTADISTICA (CODESPECIALIZACION, MES, ACTIVOS, CERRADOS, VALOR)
+    VALUES (%s, %s, %s, %s, %s)
+    ON CONFLICT (CODESPECIALIZACION, MES) DO UPDATE SET
+        ACTIVOS = CASO_ESTADISTICA.ACTIVOS + excluded.ACTIVOS,
+        CERRADOS = CASO_ESTADISTICA.CERRADOS + excluded.CERRADOS,
+        VALOR = CASO_ESTADISTICA.VALOR + excluded.VALOR
+"""
+
+registrar("estadistica_sumar", lambda: _MERGE_ORACLE if dialecto.es_oracle() else _UPSERT)
+registrar("estadisticas", """
+    SELECT CODESPECIALIZACION, MES, ACTIVOS, CERRADOS, VALOR
+    FROM CASO_ESTADISTICA
+    ORDER BY CODESPECIALIZACION, MES
+""")
+
+_DETALLE = Mapeador("esp", "mes", "activos", "cerrados", ("valor", monto))
+
+
+def mes(fecha):
+    """
+    date o 'YYYY-MM-DD' -> 'YYYY-MM'.
+    """
+    return str(fecha)[:7]
+
+
+def sumar_casos(casos):
+    """
+    Suma casos nuevos (sin FCHFIN) al resumen. `casos` son tuplas
+    (esp, fecha_inicio, valor); se agrupan por (esp, mes) y se aplica un
+    MERGE/upsert por grupo. Debe llamarse dentro de la transacción que
+    inserta los casos.
+    """
+    grupos = defaultdict(lambda: [0, Decimal(0)])
+    for esp, fecha_inicio, valor in casos:
+        grupo = grupos[(esp, mes(fecha_inicio))]
+        grupo[0] += 1
+        grupo[1] += Decimal(str(valor))
+    if not grupos:
+        return
+
+    # Orden fijo de claves: dos cargas simultáneas bloquean las filas del
+    # resumen en el mismo orden y no se interbloquean.
+    filas = [(esp, m, activos, 0, valor) for (esp, m), (activos, valor) in sorted(grupos.items())]
+    with connection.cursor() as cursor:
+        cursor.executemany(consulta("estadistica_sumar"), filas)
+
+
+def _grupo(**clave):
+    return {**clave, "activos": 0, "cerrados": 0, "valor": 0}
+
+
+def resumen():
+    """
+    Totales por especialización, por mes y generales, más el detalle
+    (especialización, mes). Una consulta sobre CASO_ESTADISTICA.
+    """
+    detalle = _DETALLE.filas(many_results(consulta("estadisticas"), using=alias_lectura()))
+
+    por_esp, por_mes = {}, {}
+    total = _grupo()
+    for d in detalle:
+        for grupo in (por_esp.setdefault(d["esp"], _grupo(esp=d["esp"])),
+                      por_mes.setdefault(d["mes"], _grupo(mes=d["mes"])), total):
+            grupo["activos"] += d["activos"]
+            grupo["cerrados"] += d["cerrados"]
+            grupo["valor"] += d["valor"]
+
+    return {
+        "por_especializacion": list(por_esp.values()),
+        "por_mes": sorted(por_mes.values(), key=lambda g: g["mes"]),
+        "total": total,
+        "detalle": detalle,
+    }
+
+
+def recalcular():
+    """
+    Reconstruye el resumen a partir de CASO; devuelve el número de grupos.
+    """
+    columna_mes = dialecto.mes("FCHINICIO")
+    with transaction.atomic():
+        execute("DELETE FROM CASO_ESTADISTICA")
+        execute(f"""
+            INSERT INTO CASO_ESTADISTICA (CODESPECIALIZACION, MES, ACTIVOS, CERRADOS, VALOR)
+            SELECT CODESPECIALIZACION, {columna_mes},
+                   SUM(CASE WHEN FCHFIN IS NULL THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN FCHFIN IS NULL THEN 0 ELSE 1 END),
+                   {dialecto.nvl("SUM(VALOR)", 0)}
+            FROM CASO
+            WHERE CODESPECIALIZACION IS NOT NULL AND FCHINICIO IS NOT NULL
+            GROUP BY CODESPECIALIZACION, {columna_mes}
+        """)
+        return single_result("SELECT COUNT(*) FROM CASO_ESTADISTICA")[0]
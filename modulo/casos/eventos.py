@@ -0,0 +1,353 @@
+"""
+Eventos de cambios en casos y expedientes para el endpoint SSE
+/api/caso/eventos/ (views_async.eventos, solo con el servidor ASGI).
+
+guardar_caso, abrir_caso y guardar_expediente llaman a publicar() dentro
+de su transacción, que guarda el evento en CASO_EVENTO
+(casos/sql/*/080_eventos_caso.sql): un guardado que se deshace no deja
+evento. El ID sale de una secuencia (identity en PostgreSQL), así que el
+guardado no toma ningún bloqueo compartido. Con CASOS_EVENTOS=False, o si
+ningún worker tiene conexiones SSE, publicar() no escribe nada.
+
+Cada proceso con conexiones SSE lee la tabla cada CASOS_EVENTOS_SONDEO
+segundos en un hilo y reparte los eventos nuevos a sus suscripciones,
+cada una con su propia cola asyncio y su filtro (cliente y/o casos). Así
+una conexión recibe los guardados de todos los workers, WSGI o ASGI. Dos
+transacciones pueden confirmarse en otro orden que el de sus ID: el hilo
+recuerda los eventos ya entregados por encima del último ID sin huecos y
+espera hasta CASOS_EVENTOS_ESPERA segundos a que un hueco se llene (o se
+descarte: un guardado deshecho también deja un ID sin usar). Mientras
+escucha, el hilo anuncia en CASO_EVENTO_OYENTES que hay oyentes y borra los
+eventos que ya no sirven para reconexiones.
+
+Al reconectarse con Last-Event-ID el navegador recibe de la tabla los
+eventos que perdió, hasta CASOS_EVENTOS_HISTORIA. Si son más (o ya se
+borraron, o la cola de la conexión se llenó) se envía el evento
+"reiniciar": la página debe volver a consultar los datos completos.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+
+from . import dialecto
+from .consultas import consulta, registrar
+from .db import execute, many_results, single_result
+from .dialecto import limitar
+from .renderers import a_json
+
+logger = logging.getLogger(__name__)
+
+# Eventos leídos por consulta al sondear
+LOTE = 500
+# Segundos entre lecturas de CASO_EVENTO_OYENTES en un proceso sin oyentes
+RELEER_OYENTES = 1
+
+registrar("evento_insertar", lambda: (
+    "INSERT INTO CASO_EVENTO (ID, TIPO, DATOS) VALUES (CASO_EVENTO_SEQ.NEXTVAL, %s, %s)"
+    if dialecto.es_oracle() else
+    "INSERT INTO CASO_EVENTO (TIPO, DATOS) VALUES (%s, %s)"
+))
+registrar("evento_ultimo", "SELECT MAX(ID) FROM CASO_EVENTO")
+registrar("evento_existe", "SELECT ID FROM CASO_EVENTO WHERE ID = %s")
+registrar("eventos_desde", lambda: limitar("""
+    SELECT ID, TIPO, DATOS
+    FROM CASO_EVENTO
+    WHERE ID > %s
+    ORDER BY ID
+"""))
+registrar("eventos_borrar", "DELETE FROM CASO_EVENTO WHERE ID < %s")
+registrar("eventos_oyentes", "SELECT HASTA FROM CASO_EVENTO_OYENTES")
+registrar("eventos_anunciar", "UPDATE CASO_EVENTO_OYENTES SET HASTA = %s WHERE HASTA < %s")
+
+
+@dataclass(frozen=True)
+class Evento:
+    id: int
+    tipo: str
+    datos: dict
+
+    def sse(self):
+        return f"id: {self.id}\nevent: {self.tipo}\ndata: {a_json(self.datos).decode()}\n\n"
+
+
+@dataclass(frozen=True)
+class Filtro:
+    """
+    Eventos de un cliente y/o de unos casos; sin nada, todos.
+    """
+    cliente: str = None
+    nocasos: frozenset = field(default_factory=frozenset)
+
+    def acepta(self, evento):
+        if not (self.cliente or self.nocasos):
+            return True
+        return (
+            (self.cliente is not None and evento.datos.get("codcliente") == self.cliente)
+            or evento.datos.get("nocaso") in self.nocasos
+        )
+
+
+class Suscripcion:
+
+    def __init__(self, filtro, maximo):
+        self.filtro = filtro
+        self.loop = asyncio.get_running_loop()
+        self.cola = asyncio.Queue(maxsize=maximo)
+
+    def entregar(self, evento):
+        """
+        Corre en el loop de la conexión. Si la cola está llena se vacía y
+        queda None: la conexión envía "reiniciar".
+        """
+        if not self.filtro.acepta(evento):
+            return
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            while not self.cola.empty():
+                self.cola.get_nowait()
+            self.cola.put_nowait(None)
+
+
+def _leer(ultimo, cantidad):
+    return [Evento(id_, tipo, json.loads(datos))
+            for id_, tipo, datos in many_results(consulta("eventos_desde"), [ultimo, cantidad])]
+
+
+def activos():
+    return getattr(settings, "CASOS_EVENTOS", True)
+
+
+class BusEventos:
+    """
+    Suscripciones SSE de este proceso. Con `hilo` (lo normal) la tabla se
+    sondea en un hilo mientras haya suscripciones; sin él hay que llamar a
+    sondear() (pruebas).
+    """
+
+    def __init__(self, hilo=True):
+        self._lock = threading.Lock()
+        self._suscripciones = set()
+        self._hilo = None
+        self._con_hilo = hilo
+        self._reiniciar_sondeo()
+        # Lo último leído de CASO_EVENTO_OYENTES (lado de publicar)
+        self._oyentes_hasta = self._oyentes_leido = 0
+
+    def _reiniciar_sondeo(self):
+        self._ultimo = None         # todos los ID <= _ultimo ya se trataron
+        self._vistos = set()        # ID entregados por encima de _ultimo
+        self._huecos = {}           # ID faltante -> cuándo se vio el hueco
+        self._anunciado = 0
+        self._borrado = 0
+
+    @property
+    def historia(self):
+        return getattr(settings, "CASOS_EVENTOS_HISTORIA", 200)
+
+    @property
+    def cola(self):
+        return getattr(settings, "CASOS_EVENTOS_COLA", 100)
+
+    @property
+    def sondeo(self):
+        return getattr(settings, "CASOS_EVENTOS_SONDEO", 1)
+
+    @property
+    def espera(self):
+        return getattr(settings, "CASOS_EVENTOS_ESPERA", 10)
+
+    @property
+    def margen(self):
+        """
+        Vigencia del anuncio de oyentes; se renueva a la mitad.
+        """
+        return max(5, 3 * self.sondeo)
+
+    def difundir(self, evento):
+        """
+        Entrega el evento a todas las suscripciones. Se puede llamar desde
+        cualquier hilo.
+        """
+        with self._lock:
+            suscripciones = list(self._suscripciones)
+        for s in suscripciones:
+            try:
+                s.loop.call_soon_threadsafe(s.entregar, evento)
+            except RuntimeError:
+                # Loop cerrado: la conexión ya terminó
+                self.retirar(s)
+
+    def hay_oyentes(self):
+        """
+        True si algún worker anunció conexiones SSE. Sin oyentes la tabla se
+        vuelve a leer a lo sumo cada RELEER_OYENTES segundos.
+        """
+        ahora = time.time()
+        if ahora < self._oyentes_hasta:
+            return True
+        if ahora - self._oyentes_leido < RELEER_OYENTES:
+            return False
+        fila = single_result(consulta("eventos_oyentes"))
+        self._oyentes_hasta = float(fila[0]) if fila else 0
+        self._oyentes_leido = ahora
+        return ahora < self._oyentes_hasta
+
+    def _anunciar(self, ahora):
+        if ahora - self._anunciado < self.margen / 2:
+            return
+        hasta = ahora + self.margen
+        execute(consulta("eventos_anunciar"), [hasta, hasta])
+        self._anunciado = ahora
+
+    def sondear(self):
+        """
+        Anuncia que hay oyentes, difunde los eventos nuevos y los devuelve.
+        La primera vez solo toma el ID actual como punto de partida.
+        """
+        ahora = time.monotonic()
+        self._anunciar(time.time())
+        if self._ultimo is None:
+            self._ultimo = single_result(consulta("evento_ultimo"))[0] or 0
+            return []
+
+        nuevos, desde = [], self._ultimo
+        while True:
+            lote = _leer(desde, LOTE)
+            for evento in lote:
+                if evento.id not in self._vistos:
+                    self._vistos.add(evento.id)
+                    self.difundir(evento)
+                    nuevos.append(evento)
+            if len(lote) < LOTE:
+                break
+            desde = lote[-1].id
+
+        # Avanza _ultimo por los ID entregados; un hueco (transacción aún
+        # abierta o deshecha) se salta después de CASOS_EVENTOS_ESPERA
+        while self._vistos:
+            siguiente = self._ultimo + 1
+            if siguiente in self._vistos:
+                self._vistos.discard(siguiente)
+                self._huecos.pop(siguiente, None)
+            elif ahora - self._huecos.setdefault(siguiente, ahora) >= self.espera:
+                del self._huecos[siguiente]
+            else:
+                break
+            self._ultimo = siguiente
+        self._borrar_viejos(ahora)
+        return nuevos
+
+    def _borrar_viejos(self, ahora):
+        """
+        Cada minuto, borra los eventos que ya no entran en una reconexión.
+        """
+        if ahora - self._borrado < 60:
+            return
+        self._borrado = ahora
+        execute(consulta("eventos_borrar"), [self._ultimo - 2 * self.historia])
+
+    def _sondear_mientras_haya_suscripciones(self):
+        try:
+            while True:
+                with self._lock:
+                    if not self._suscripciones:
+                        # La próxima suscripción parte del ID de ese momento
+                        self._hilo = None
+                        self._reiniciar_sondeo()
+                        return
+                try:
+                    self.sondear()
+                except Exception:
+                    logger.exception("No se pudieron leer los eventos de casos")
+                    connection.close()
+                time.sleep(self.sondeo)
+        finally:
+            connection.close()
+
+    def suscribir(self, filtro):
+        suscripcion = Suscripcion(filtro, self.cola)
+        with self._lock:
+            self._suscripciones.add(suscripcion)
+            if self._con_hilo and self._hilo is None:
+                self._hilo = threading.Thread(
+                    target=self._sondear_mientras_haya_suscripciones,
+                    name="casos-eventos", daemon=True,
+                )
+                self._hilo.start()
+        return suscripcion
+
+    def retirar(self, suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    def desde(self, ultimo):
+        """
+        Eventos ya confirmados posteriores al id `ultimo`, o None si son más
+        de CASOS_EVENTOS_HISTORIA o si ese evento ya no está en la tabla
+        (borrado, o base de datos restaurada).
+        """
+        if ultimo and single_result(consulta("evento_existe"), [ultimo]) is None:
+            return None
+        eventos = _leer(ultimo, self.historia + 1)
+        if len(eventos) > self.historia:
+            return None
+        return eventos
+
+
+bus = BusEventos()
+
+REINICIAR = "event: reiniciar\ndata: {}\n\n"
+
+
+def publicar(tipo, **datos):
+    """
+    Guarda el evento en la transacción en curso (en autocommit, de
+    inmediato), si hay quien lo lea.
+    """
+    if activos() and bus.hay_oyentes():
+        execute(consulta("evento_insertar"), [tipo, a_json(datos).decode()])
+
+
+async def flujo(filtro, ultimo=None):
+    """
+    Texto SSE para una conexión: primero lo perdido desde Last-Event-ID,
+    luego los eventos nuevos, con un comentario cada CASOS_EVENTOS_PING
+    segundos para que los proxies no cierren la conexión.
+    """
+    ping = getattr(settings, "CASOS_EVENTOS_PING", 15)
+    suscripcion = bus.suscribir(filtro)
+    # Lo reenviado, y lo que el navegador ya tenía, puede volver a llegar
+    # por la suscripción
+    vistos = set()
+    ultimo = ultimo or 0
+    try:
+        yield "retry: 3000\n\n"
+        if ultimo:
+            perdidos = await sync_to_async(bus.desde)(ultimo)
+            if perdidos is None:
+                yield REINICIAR
+            else:
+                for evento in perdidos:
+                    vistos.add(evento.id)
+                    if filtro.acepta(evento):
+                        yield evento.sse()
+        while True:
+            try:
+                evento = await asyncio.wait_for(suscripcion.cola.get(), ping)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if evento is None:
+                yield REINICIAR
+            elif evento.id > ultimo and evento.id not in vistos:
+                yield evento.sse()
+    finally:
+        bus.retirar(suscripcion)
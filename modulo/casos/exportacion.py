@@ -0,0 +1,143 @@
+"""
+Exportación de CASO con sus EXPEDIENTE en CSV o NDJSON.
+
+Las filas se leen por bloques con un cursor de servidor
+(connection.chunked_cursor) y se escriben a medida que llegan, de modo que
+la memoria no depende del número de filas exportadas.
+
+Con el servidor ASGI Django no recorre un generador síncrono a medida
+que envía: lo consume completo antes de responder. Ahí la vista entrega
+el contenido con en_async(), que pide cada parte en un hilo.
+"""
+import csv
+import json
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from . import dialecto
+from .consultas import con_nombre
+from .db import cursor_nativo
+from .servicios import ErrorServicio
+
+COLUMNAS = [
+    "nocaso", "codcliente", "especializacion", "inicio", "fin", "valor",
+    "consec", "etapa", "lugar", "abogado", "fecha_etapa",
+]
+
+
+def _fecha_param(valor, nombre):
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, "%Y-%m-%d").date()
+    except ValueError:
+        raise ErrorServicio(f"{nombre} debe tener formato YYYY-MM-DD", 400)
+
+
+def consulta_exportacion(desde=None, hasta=None, esp=None):
+    """
+    SQL y parámetros de la exportación; valida los filtros antes de que
+    empiece la respuesta.
+    """
+    condiciones, params = [], []
+    desde = _fecha_param(desde, "desde")
+    hasta = _fecha_param(hasta, "hasta")
+    if desde:
+        condiciones.append("K.FCHINICIO >= %s")
+        params.append(desde)
+    if hasta:
+        condiciones.append("K.FCHINICIO <= %s")
+        params.append(hasta)
+    if esp:
+        condiciones.append("K.CODESPECIALIZACION = %s")
+        params.append(esp)
+
+    where = ("WHERE " + " AND ".join(condiciones)) if condiciones else ""
+    sql = f"""
+        SELECT K.NOCASO, K.CODCLIENTE, K.CODESPECIALIZACION, K.FCHINICIO, K.FCHFIN, K.VALOR,
+               E.CONSECEXPE, E.IDTIPOCASO2, E.CODLUGAR, E.CEDULA, E.FCHETAPA
+        FROM CASO K
+        LEFT JOIN EXPEDIENTE E ON E.NOCASO = K.NOCASO
+        {where}
+        ORDER BY K.NOCASO, E.CONSECEXPE
+    """
+    return con_nombre("exportar", sql), params
+
+
+def bloques(sql, params, using):
+    """
+    Genera las filas en listas de hasta CASOS_EXPORTAR_ARRAYSIZE. El alias
+    se fija al armar la respuesta: el generador corre después de que el
+    middleware terminó con la petición.
+    """
+    tamano = getattr(settings, "CASOS_EXPORTAR_ARRAYSIZE", 1000)
+    with connections[using].chunked_cursor() as cursor:
+        nativo = cursor_nativo(cursor)
+        if dialecto.es_oracle():
+            # prefetchrows llena el primer viaje junto con el execute
+            nativo.arraysize = tamano
+            nativo.prefetchrows = tamano + 1
+        cursor.execute(sql, params)
+        while bloque := cursor.fetchmany(tamano):
+            yield bloque
+
+
+def _valor(v):
+    if v is None:
+        return None
+    if hasattr(v, "strftime"):
+        return v.strftime("%Y-%m-%d")
+    if isinstance(v, (int, str)):
+        return v
+    return float(v)
+
+
+class _Eco:
+    """
+    Destino de csv.writer que devuelve la línea en vez de guardarla.
+    """
+    def write(self, valor):
+        return valor
+
+
+def como_csv(bloques_):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(COLUMNAS)
+    for bloque in bloques_:
+        yield "".join(
+            escritor.writerow(["" if v is None else _valor(v) for v in fila])
+            for fila in bloque
+        )
+
+
+def como_ndjson(bloques_):
+    for bloque in bloques_:
+        yield "".join(
+            json.dumps(dict(zip(COLUMNAS, map(_valor, fila))), ensure_ascii=False) + "\n"
+            for fila in bloque
+        )
+
+
+async def en_async(partes):
+    """
+    Iterador async sobre un generador síncrono que usa la base de datos.
+    Cada parte se pide con sync_to_async(thread_sensitive=True): todas en
+    el mismo hilo de la petición, el del cursor de servidor abierto.
+    """
+    siguiente = sync_to_async(next, thread_sensitive=True)
+    fin = object()
+    try:
+        while (parte := await siguiente(partes, fin)) is not fin:
+            yield parte
+    finally:
+        # Cliente desconectado: cierra el cursor en su hilo
+        await sync_to_async(partes.close, thread_sensitive=True)()
+
+
+FORMATOS = {
+    "csv": (como_csv, "text/csv; charset=utf-8"),
+    "ndjson": (como_ndjson, "application/x-ndjson; charset=utf-8"),
+}
@@ -0,0 +1,40 @@
+"""
+Filas de la base de datos -> diccionarios de la API.
+
+Un Mapeador se declara junto a su consulta, con el nombre de cada columna
+en el orden del SELECT y su conversión si la necesita. Las tuplas
+(nombre, posición, conversión) se calculan una sola vez; por fila solo
+queda una comprensión de diccionario (o un zip si no hay conversiones).
+"""
+
+
+def fecha(valor):
+    """
+    date/datetime -> 'YYYY-MM-DD' (isoformat es más rápido que strftime).
+    """
+    return valor.isoformat()[:10] if valor else None
+
+
+def monto(valor):
+    return float(valor) if valor else 0
+
+
+class Mapeador:
+
+    def __init__(self, *columnas):
+        """
+        Cada columna es "nombre", ("nombre", conversión) o None para
+        ignorar esa posición del SELECT.
+        """
+        pasos = tuple(
+            (columna, i, None) if isinstance(columna, str) else (columna[0], i, columna[1])
+            for i, columna in enumerate(columnas) if columna is not None
+        )
+        self.claves = claves = [nombre for nombre, _, _ in pasos]
+        if len(pasos) == len(columnas) and all(c is None for _, _, c in pasos):
+            self.fila = lambda f: dict(zip(claves, f))
+        else:
+            self.fila = lambda f: {n: f[i] if c is None else c(f[i]) for n, i, c in pasos}
+
+    def filas(self, filas):
+        return list(map(self.fila, filas))
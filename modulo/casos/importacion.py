@@ -0,0 +1,188 @@
+"""
+Carga masiva de casos (POST /api/caso/importar/).
+
+Las filas se validan y se insertan por lotes: una consulta IN para los
+NOCASO que ya existen, una reserva de números para las filas que no traen
+NOCASO y un executemany (array DML en Oracle) por lote, cada lote en su
+propia transacción junto con su suma al resumen de estadísticas
+(casos/estadisticas.py). Las filas rechazadas se informan con su número de
+fila y no impiden la carga de las demás.
+"""
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from . import consecutivos, dialecto, estadisticas
+from .consultas import anotar, con_nombre, consulta, registrar
+from .db import many_results_in, cursor_nativo
+
+_INSERT = """
+    INSERT INTO CASO (NOCASO, CODCLIENTE, CODESPECIALIZACION, FCHINICIO, FCHFIN, VALOR, FCHCREACION)
+    VALUES (%s, %s, %s, %s, NULL, %s, CURRENT_TIMESTAMP)
+"""
+registrar("caso_importar", _INSERT)
+_INSERT_ORACLE = con_nombre("caso_importar", _INSERT % tuple(f":{i}" for i in range(1, 6)))
+
+
+def _lotes(filas, tamano):
+    filas = iter(filas)
+    while lote := list(islice(filas, tamano)):
+        yield lote
+
+
+def _validar(dato):
+    """
+    Devuelve (nocaso, codcliente, esp, fecha, valor) o lanza ValueError.
+    """
+    if isinstance(dato, ValueError):
+        # Línea NDJSON que no se pudo leer (parsers.NDJSONParser)
+        raise dato
+    if not isinstance(dato, dict):
+        raise ValueError("La fila debe ser un objeto JSON")
+
+    codcli = str(dato.get("codcliente") or "").strip()
+    esp = str(dato.get("especializacion") or "").strip()
+    fecha = dato.get("fechaInicio")
+    valor = dato.get("valor")
+    if not (codcli and esp and fecha and valor):
+        raise ValueError("Todos los campos son obligatorios")
+
+    try:
+        fecha = datetime.strptime(str(fecha), "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError("fechaInicio debe tener formato YYYY-MM-DD")
+
+    try:
+        valor = Decimal(str(valor))
+    except InvalidOperation:
+        raise ValueError("Valor inválido")
+    if valor <= 0:
+        raise ValueError("El valor debe ser mayor a cero")
+
+    nocaso = dato.get("nocaso")
+    if nocaso is not None:
+        try:
+            nocaso = int(nocaso)
+        except (TypeError, ValueError):
+            raise ValueError("nocaso debe ser un número")
+
+    return nocaso, codcli, esp, fecha, valor
+
+
+def _existentes(nocasos):
+    return {f[0] for f in many_results_in(
+        con_nombre("caso_importar_existentes", "SELECT NOCASO FROM CASO WHERE NOCASO IN ({marcas})"),
+        nocasos,
+    )}
+
+
+def _insertar_oracle(filas):
+    """
+    Array DML con batcherrors: las filas que violan una restricción se
+    devuelven como {índice: mensaje} y el resto queda insertado.
+    """
+    with connection.cursor() as cursor:
+        nativo = cursor_nativo(cursor)
+        inicio = time.perf_counter()
+        nativo.executemany(_INSERT_ORACLE, filas, batcherrors=True)
+        anotar(_INSERT_ORACLE, time.perf_counter() - inicio)
+        return {e.offset: e.message for e in nativo.getbatcherrors()}
+
+
+def _insertar_estandar(filas):
+    """
+    executemany del lote completo; si falla, se repite fila a fila con
+    savepoints para identificar las filas rechazadas.
+    """
+    with connection.cursor() as cursor:
+        try:
+            with transaction.atomic():
+                cursor.executemany(consulta("caso_importar"), filas)
+            return {}
+        except DatabaseError:
+            pass
+
+        errores = {}
+        for i, fila in enumerate(filas):
+            try:
+                with transaction.atomic():
+                    cursor.execute(consulta("caso_importar"), fila)
+            except DatabaseError as e:
+                errores[i] = str(e)
+        return errores
+
+
+def importar_casos(datos, tamano_lote=None):
+    """
+    Importa un iterable de diccionarios con los campos de guardar_caso
+    ("nocaso" es opcional: si falta se asigna uno).
+    """
+    tamano_lote = tamano_lote or getattr(settings, "CASOS_IMPORTAR_LOTE", 1000)
+    insertar = _insertar_oracle if dialecto.es_oracle() else _insertar_estandar
+
+    recibidos = insertados = 0
+    errores, asignados = [], []
+    vistos = set()
+    tope = None
+
+    for lote in _lotes(enumerate(datos, start=1), tamano_lote):
+        recibidos += len(lote)
+        validas = []
+        for fila, dato in lote:
+            try:
+                validas.append((fila, _validar(dato)))
+            except ValueError as e:
+                errores.append({"fila": fila, "nocaso": None, "error": str(e)})
+
+        # Números enviados: deben venir del asignador y no existir ya
+        enviados = {v[0] for _, v in validas if v[0] is not None}
+        if enviados and (tope is None or max(enviados) > tope):
+            tope = consecutivos.casos.tope()
+        existentes = _existentes(enviados) if enviados else set()
+
+        sin_numero = sum(1 for _, v in validas if v[0] is None)
+        nuevos = iter(consecutivos.casos.reservar(sin_numero))
+
+        filas, origen = [], []
+        for fila, (nocaso, codcli, esp, fecha, valor) in validas:
+            if nocaso is None:
+                nocaso = next(nuevos)
+                asignados.append({"fila": fila, "nocaso": nocaso})
+            elif nocaso <= 0 or nocaso > tope:
+                errores.append({"fila": fila, "nocaso": nocaso,
+                                "error": "El número de caso no fue asignado por el sistema"})
+                continue
+            elif nocaso in existentes or nocaso in vistos:
+                errores.append({"fila": fila, "nocaso": nocaso,
+                                "error": "El caso ya existe. No se puede modificar."})
+                continue
+            vistos.add(nocaso)
+            filas.append((nocaso, codcli, esp, fecha, valor))
+            origen.append(fila)
+
+        if not filas:
+            continue
+
+        with transaction.atomic():
+            fallidas = insertar(filas)
+            estadisticas.sumar_casos(
+                (esp, fecha, valor) for i, (_, _, esp, fecha, valor) in enumerate(filas)
+                if i not in fallidas
+            )
+
+        insertados += len(filas) - len(fallidas)
+        for i, mensaje in fallidas.items():
+            errores.append({"fila": origen[i], "nocaso": filas[i][0],
+                            "error": f"Error al guardar: {mensaje}"})
+
+    con_error = {e["fila"] for e in errores}
+    return {
+        "recibidos": recibidos,
+        "insertados": insertados,
+        "asignados": [a for a in asignados if a["fila"] not in con_error],
+        "errores": sorted(errores, key=lambda e: e["fila"]),
+    }
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from casos import catalogos, servicios  # noqa: F401  (registra los catálogos)
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga los catálogos de referencia en la caché del proceso. "
+        "Úselo desde el hook de arranque del worker (p. ej. post_fork de "
+        "gunicorn con call_command) o con CASOS_CATALOGOS_CALENTAR=True."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "catalogos", nargs="*",
+            help="Catálogos a cargar (por defecto todos): " + ", ".join(catalogos.cache.nombres()),
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        try:
+            entradas = catalogos.cache.calentar(options["catalogos"] or None)
+        except ValueError as e:
+            raise CommandError(str(e))
+        for nombre, entrada in entradas.items():
+            self.stdout.write(f"{nombre:20} {len(entrada.datos):6} filas  v{entrada.version}  {entrada.etag}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(entradas)} catálogos cargados en {(time.perf_counter() - inicio) * 1000:.1f} ms"
+        ))
@@ -0,0 +1,42 @@
+import json
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+
+from casos import consultas, importacion, servicios  # noqa: F401  (registran sus consultas)
+
+
+class Command(BaseCommand):
+    help = (
+        "Lista las consultas registradas (casos/consultas.py). Con --url "
+        "muestra las estadísticas del worker que atienda "
+        "/api/caso/interno/consultas/ en ese servidor; son por proceso."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", help="servidor en marcha, p. ej. http://127.0.0.1:8000")
+        parser.add_argument("--top", type=int, default=20, help="consultas a mostrar con --url")
+        parser.add_argument("--sql", action="store_true", help="mostrar la SQL de cada consulta")
+
+    def handle(self, *args, **options):
+        if options["url"]:
+            return self.estadisticas(options["url"].rstrip("/"), options["top"])
+
+        for nombre in consultas.nombres():
+            self.stdout.write(nombre)
+            if options["sql"]:
+                self.stdout.write("    " + " ".join(consultas.consulta(nombre).split()))
+        self.stdout.write(self.style.SUCCESS(f"{len(consultas.nombres())} consultas registradas"))
+
+    def estadisticas(self, url, top):
+        try:
+            with urllib.request.urlopen(f"{url}/api/caso/interno/consultas/") as res:
+                datos = json.load(res)
+        except OSError as e:
+            raise CommandError(f"No se pudo leer {url}: {e}")
+
+        self.stdout.write(f"pid {datos['pid']}")
+        self.stdout.write(f"{'consulta':32} {'llamadas':>9} {'total ms':>11} {'media ms':>9} {'max ms':>9}")
+        for c in datos["consultas"][:top]:
+            self.stdout.write(f"{c['nombre']:32} {c['llamadas']:9} {c['total_ms']:11.1f} "
+                              f"{c['media_ms']:9.2f} {c['max_ms']:9.2f}")
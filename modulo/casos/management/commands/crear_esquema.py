@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from casos import dialecto, esquema
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea las tablas de casos en SQLite o PostgreSQL (casos/sql/estandar/). "
+        "Con datos por cargar: --fase tablas, cargar los datos y luego "
+        "--fase contadores (inicializa CONSECUTIVO y EXPEDIENTE_CONSEC y "
+        "normaliza los clientes)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fase", choices=["todo", "tablas", "contadores"], default="todo")
+
+    def handle(self, *args, **options):
+        if dialecto.es_oracle():
+            raise CommandError("En Oracle ejecute los scripts de casos/sql/oracle/ con SQL*Plus")
+
+        fase = options["fase"]
+        aplicados = esquema.aplicar(
+            tablas=fase in ("todo", "tablas"),
+            contadores=fase in ("todo", "contadores"),
+        )
+        for nombre in aplicados:
+            self.stdout.write(nombre)
+        self.stdout.write(self.style.SUCCESS(f"{len(aplicados)} scripts aplicados ({dialecto.motor()})"))
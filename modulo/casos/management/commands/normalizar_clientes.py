@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from casos.db import many_results
+from casos.servicios import normalizar
+
+
+class Command(BaseCommand):
+    help = (
+        "Rellena NOMCLIENTE_NORM y APECLIENTE_NORM (búsqueda de clientes). "
+        "Los triggers de casos/sql/ las mantienen al crear o modificar "
+        "clientes; sirve para recalcularlas (--todos) o para filas cargadas "
+        "con los triggers desactivados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--todos", action="store_true",
+                            help="Recalcular también las filas ya normalizadas")
+        parser.add_argument("--lote", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        filtro = "" if options["todos"] else "WHERE NOMCLIENTE_NORM IS NULL OR APECLIENTE_NORM IS NULL"
+        filas = many_results(f"SELECT CODCLIENTE, NOMCLIENTE, APECLIENTE FROM CLIENTE {filtro}")
+
+        lote = options["lote"]
+        with transaction.atomic(), connection.cursor() as cursor:
+            for i in range(0, len(filas), lote):
+                cursor.executemany("""
+                    UPDATE CLIENTE SET NOMCLIENTE_NORM = %s, APECLIENTE_NORM = %s
+                    WHERE CODCLIENTE = %s
+                """, [(normalizar(nom), normalizar(ape), cod) for cod, nom, ape in filas[i:i + lote]])
+
+        self.stdout.write(self.style.SUCCESS(f"{len(filas)} clientes normalizados"))
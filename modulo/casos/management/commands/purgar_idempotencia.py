@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta, timezone
+
+from django.core.management.base import BaseCommand
+
+from casos.db import execute
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra las Idempotency-Key de guardar_caso más antiguas que --dias. "
+        "Un reintento con una clave borrada recibe 'El caso ya existe'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dias", type=int, default=7)
+
+    def handle(self, *args, **options):
+        # Fecha de corte en UTC sin zona; con un margen de días la diferencia
+        # con la hora del servidor de base de datos no importa.
+        corte = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=options["dias"])
+        borradas = execute("DELETE FROM CASO_IDEMPOTENCIA WHERE CREADO < %s", [corte])
+        self.stdout.write(self.style.SUCCESS(f"{borradas} claves borradas"))
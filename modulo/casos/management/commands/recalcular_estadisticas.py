@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from casos import estadisticas
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye CASO_ESTADISTICA (/api/caso/estadisticas/) a partir de "
+        "CASO. La API lo mantiene al guardar e importar casos; ejecútelo "
+        "después de cerrar o modificar casos fuera de ella."
+    )
+
+    def handle(self, *args, **options):
+        grupos = estadisticas.recalcular()
+        self.stdout.write(self.style.SUCCESS(f"{grupos} grupos (especialización, mes)"))
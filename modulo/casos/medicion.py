@@ -0,0 +1,134 @@
+"""
+Medición de SQL por petición: número de sentencias, tiempo total en la
+base de datos y sentencia más lenta.
+
+Se activa con CASOS_MEDIR_SQL (variable de entorno CASOS_MEDIR_SQL=1). La
+medición de la petición en curso vive en una ContextVar, que también ven
+los hilos de sync_to_async, y la registra un execute_wrapper que se
+instala en cada conexión al crearse. Con la opción apagada
+MedicionSQLMiddleware se retira de la cadena de middleware
+(MiddlewareNotUsed) y no se instala nada.
+
+El resultado sale en la cabecera Server-Timing y en una línea JSON del
+logger "casos.sql". Las respuestas en streaming (exportar) consultan la
+base de datos después de salir del middleware y no se miden.
+"""
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("casos.sql")
+
+_actual = ContextVar("casos_medicion", default=None)
+_ESPACIOS = re.compile(r"\s+")
+
+
+class Medicion:
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.total = 0.0
+        self.lenta = 0.0
+        self.sql_lenta = None
+
+    def registrar(self, sql, segundos):
+        self.consultas += 1
+        self.total += segundos
+        if segundos >= self.lenta:
+            self.lenta = segundos
+            self.sql_lenta = sql
+
+    def server_timing(self):
+        return (
+            f'db;desc="SQL ({self.consultas})";dur={self.total * 1000:.2f}, '
+            f'db-lenta;dur={self.lenta * 1000:.2f}, '
+            f'total;dur={(time.perf_counter() - self.inicio) * 1000:.2f}'
+        )
+
+    def como_dict(self):
+        return {
+            "consultas": self.consultas,
+            "db_ms": round(self.total * 1000, 2),
+            "lenta_ms": round(self.lenta * 1000, 2),
+            "lenta_sql": _ESPACIOS.sub(" ", self.sql_lenta).strip()[:200] if self.sql_lenta else None,
+            "total_ms": round((time.perf_counter() - self.inicio) * 1000, 2),
+        }
+
+
+def actual():
+    return _actual.get()
+
+
+def _envoltura(execute, sql, params, many, context):
+    medicion = _actual.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion.registrar(sql, time.perf_counter() - inicio)
+
+
+def _instalar(sender, connection, **kwargs):
+    if _envoltura not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_envoltura)
+
+
+class MedicionSQLMiddleware:
+    """
+    Mide el SQL de cada petición y agrega la cabecera Server-Timing.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "CASOS_MEDIR_SQL", False):
+            raise MiddlewareNotUsed
+        connection_created.connect(_instalar, dispatch_uid="casos.medicion")
+        for conexion in connections.all(initialized_only=True):
+            _instalar(None, conexion)
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        medicion = Medicion()
+        token = _actual.set(medicion)
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            _actual.reset(token)
+        return self._terminar(request, respuesta, medicion)
+
+    async def __acall__(self, request):
+        medicion = Medicion()
+        token = _actual.set(medicion)
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            _actual.reset(token)
+        return self._terminar(request, respuesta, medicion)
+
+    def _terminar(self, request, respuesta, medicion):
+        if not respuesta.streaming:
+            respuesta["Server-Timing"] = medicion.server_timing()
+        logger.info(json.dumps({
+            "metodo": request.method,
+            "ruta": request.path,
+            "status": respuesta.status_code,
+            **medicion.como_dict(),
+        }, ensure_ascii=False))
+        return respuesta
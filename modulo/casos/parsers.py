@@ -0,0 +1,32 @@
+import json
+
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Un objeto JSON por línea. Devuelve un generador para no cargar todo el
+    cuerpo en memoria. Una línea con JSON inválido se entrega como un
+    ValueError en lugar de interrumpir la lectura: la importación ya pudo
+    confirmar los lotes anteriores, así que la informa como fila rechazada
+    y sigue con las demás. Las líneas en blanco se saltan y no cuentan:
+    el número del mensaje es el de la fila en la respuesta de la importación.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", "utf-8")
+
+        def filas():
+            numero = 0
+            for linea in stream:
+                linea = linea.strip()
+                if not linea:
+                    continue
+                numero += 1
+                try:
+                    dato = json.loads(linea.decode(encoding))
+                except ValueError as e:
+                    dato = ValueError(f"Fila {numero}: JSON inválido ({e})")
+                yield dato
+        return filas()
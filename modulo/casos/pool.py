@@ -0,0 +1,53 @@
+"""
+Estadísticas del pool de conexiones Oracle (ORACLE_POOL=1).
+
+El estado del pool (abiertas, ocupadas, límites) lo da python-oracledb;
+el tiempo de espera para obtener una conexión lo mide el backend
+casos.backends.oracle en cada acquire().
+"""
+import threading
+
+from django.db import connections
+
+_lock = threading.Lock()
+_esperas = {}
+
+
+def registrar_espera(alias, segundos):
+    with _lock:
+        e = _esperas.setdefault(alias, {"adquisiciones": 0, "total": 0.0, "max": 0.0})
+        e["adquisiciones"] += 1
+        e["total"] += segundos
+        e["max"] = max(e["max"], segundos)
+
+
+def estado():
+    """
+    Estado de cada alias con pool en este proceso. Un alias cuyo pool aún
+    no se ha creado aparece con "creado": False.
+    """
+    resultado = {}
+    for alias in connections:
+        conexion = connections[alias]
+        if not getattr(conexion, "is_pool", False):
+            continue
+        # El pool se crea con la primera conexión del alias, no aquí
+        p = conexion.pool_creado()
+        with _lock:
+            e = dict(_esperas.get(alias, {"adquisiciones": 0, "total": 0.0, "max": 0.0}))
+        resultado[alias] = datos = {"creado": p is not None}
+        if p is not None:
+            datos.update(
+                abiertas=p.opened,
+                ocupadas=p.busy,
+                min=p.min,
+                max=p.max,
+                incremento=p.increment,
+                stmtcachesize=p.stmtcachesize,
+            )
+        datos["espera"] = {
+            "adquisiciones": e["adquisiciones"],
+            "media_ms": round(e["total"] / e["adquisiciones"] * 1000, 3) if e["adquisiciones"] else 0.0,
+            "max_ms": round(e["max"] * 1000, 3),
+        }
+    return resultado
@@ -0,0 +1,40 @@
+"""
+JSON de la API con orjson si está instalado (pip install orjson).
+
+orjson serializa en C y maneja fechas de forma nativa; Decimal y los
+demás tipos que entiende DRF pasan por su JSONEncoder. Sin orjson se usa
+el JSONRenderer de DRF sin cambios.
+"""
+import json
+
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_codificador = encoders.JSONEncoder()
+
+# Claves no str (p. ej. NOCASO en /api/caso/casos/) como las acepta json
+_OPCIONES = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def a_json(datos):
+    """
+    bytes JSON compactos en UTF-8, como los de JSONRenderer.
+    """
+    if orjson is not None:
+        return orjson.dumps(datos, default=_codificador.default, option=_OPCIONES)
+    return json.dumps(datos, cls=encoders.JSONEncoder, ensure_ascii=False,
+                      separators=(",", ":")).encode()
+
+
+class JSONRapidoRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Con indentación (p. ej. ?format=json desde el navegador) se deja a DRF
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=_codificador.default, option=_OPCIONES)
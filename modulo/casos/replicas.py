@@ -0,0 +1,137 @@
+"""
+Lecturas en una réplica de la base de datos.
+
+Con CASOS_REPLICA (alias de DATABASES) las peticiones GET y HEAD leen de
+la réplica y todo lo demás va al primario ("default"). La elección vale
+para la petición en curso (ContextVar, que también ven los hilos de
+sync_to_async) y la usan:
+
+- db.ejecutar y db_async.ejecutar_async, que corren los servicios de
+  lectura escritos como generadores;
+- los helpers de db.py con using=alias_lectura();
+- RouterReplica, para el ORM (admin, sesiones).
+
+Después de una escritura correcta el cliente recibe la cookie
+casos_primario durante CASOS_PRIMARIO_SEGUNDOS, y mientras la tenga sus
+lecturas van al primario: así ve lo que acaba de escribir aunque la
+réplica vaya atrasada. Las vistas POST que solo leen (consultas con
+cuerpo JSON) se marcan con @solo_lectura. Sin CASOS_REPLICA, ReplicaMiddleware se retira de
+la cadena (MiddlewareNotUsed) y todo va al primario.
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+COOKIE = "casos_primario"
+_LECTURA_SEGURA = ("GET", "HEAD", "OPTIONS")
+
+_lectura = ContextVar("casos_lectura", default=DEFAULT_DB_ALIAS)
+
+
+def replica():
+    """
+    Alias de la réplica configurada, o el primario si no hay.
+    """
+    return getattr(settings, "CASOS_REPLICA", None) or DEFAULT_DB_ALIAS
+
+
+def alias_lectura():
+    """
+    Alias para las lecturas de la petición en curso. Dentro de una
+    transacción del primario se lee del primario.
+    """
+    alias = _lectura.get()
+    if alias != DEFAULT_DB_ALIAS and connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    return alias
+
+
+def _alias(request, lectura):
+    if lectura and COOKIE not in request.COOKIES:
+        return replica()
+    return DEFAULT_DB_ALIAS
+
+
+def solo_lectura(vista):
+    """
+    Vista POST que no escribe: lee de la réplica y no marca al cliente.
+    Va por encima de @api_view.
+    """
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        request.casos_solo_lectura = True
+        token = _lectura.set(_alias(request, True))
+        try:
+            return vista(request, *args, **kwargs)
+        finally:
+            _lectura.reset(token)
+    return envoltura
+
+
+class RouterReplica:
+    """
+    DATABASE_ROUTERS: lecturas del ORM según alias_lectura(), escrituras
+    y migraciones en el primario.
+    """
+
+    def db_for_read(self, model, **hints):
+        return alias_lectura()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaMiddleware:
+    """
+    Elige el alias de lectura de cada petición y marca con la cookie
+    casos_primario a los clientes que acaban de escribir.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "CASOS_REPLICA", None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _lectura.set(_alias(request, request.method in _LECTURA_SEGURA))
+        try:
+            respuesta = self.get_response(request)
+        finally:
+            _lectura.reset(token)
+        return self._terminar(request, respuesta)
+
+    async def __acall__(self, request):
+        token = _lectura.set(_alias(request, request.method in _LECTURA_SEGURA))
+        try:
+            respuesta = await self.get_response(request)
+        finally:
+            _lectura.reset(token)
+        return self._terminar(request, respuesta)
+
+    def _terminar(self, request, respuesta):
+        escritura = not (request.method in _LECTURA_SEGURA
+                         or getattr(request, "casos_solo_lectura", False))
+        if escritura and respuesta.status_code < 400:
+            respuesta.set_cookie(
+                COOKIE, "1",
+                max_age=getattr(settings, "CASOS_PRIMARIO_SEGUNDOS", 5),
+                httponly=True, samesite="Lax",
+            )
+        return respuesta
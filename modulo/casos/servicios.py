@@ -0,0 +1,676 @@
+"""
+Lógica de consulta de casos y expedientes.
+
+La usan tanto las vistas DRF (casos/views.py) como la vista de plantilla
+(casos/views_templates.py), de modo que la interfaz HTML no tenga que
+llamar a su propia API por HTTP.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db import IntegrityError, transaction
+
+from . import consecutivos, dialecto, estadisticas, eventos
+from .catalogos import catalogo
+from .consultas import con_nombre, consulta, registrar
+from .replicas import alias_lectura, replica
+from .filas import Mapeador, fecha, monto
+from .db import (
+    UNO, VARIOS, CATALOGO, ejecutar, single_result, many_results, many_results_in, execute, limitar,
+    restriccion_violada,
+)
+
+
+class ErrorServicio(Exception):
+    """
+    Error de negocio con el código HTTP que debe devolver la API.
+    """
+    def __init__(self, mensaje, status=400):
+        super().__init__(mensaje)
+        self.mensaje = mensaje
+        self.status = status
+
+
+# Misma tabla que el trigger CLIENTE_NORM_TRG (casos/sql/oracle/030_busqueda_clientes.sql)
+_SIN_TILDES = str.maketrans("ÁÉÍÓÚÀÈÌÒÙÄËÏÖÜÂÊÎÔÛÑÇ", "AEIOUAEIOUAEIOUAEIOUNC")
+
+
+def normalizar(texto):
+    """
+    Forma de búsqueda de un nombre: mayúsculas y sin tildes.
+    """
+    return (texto or "").strip().upper().translate(_SIN_TILDES)
+
+
+def _prefijo_like(texto):
+    return normalizar(texto).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+# Columnas de las consultas, en el orden del SELECT
+_ESPECIALIZACION = Mapeador("codigo", "nombre")
+_CLIENTE = Mapeador("cod", "nom", "ape", "doc")
+_CODIGO_NOMBRE = Mapeador("cod", "nom")
+_EXPEDIENTE = Mapeador("consec", "etapa", "lugar", "abogado", ("fecha", fecha))
+_CASO_CLIENTE = Mapeador("nocaso", "especializacion", ("inicio", fecha), ("valor", monto), ("fin", fecha))
+
+
+# ==============================
+# CASOS
+# ==============================
+
+registrar("especializaciones", """
+    SELECT CODESPECIALIZACION, NOMESPECIALIZACION
+    FROM ESPECIALIZACION
+    ORDER BY CODESPECIALIZACION
+""")
+
+
+@catalogo("especializaciones")
+def listar_especializaciones():
+    return _ESPECIALIZACION.filas(many_results(consulta("especializaciones"), using=replica()))
+
+
+def _caso_activo(c):
+    return {
+        "nocaso": c[0],
+        "esp": c[1],
+        "inicio": fecha(c[2]),
+        "valor": monto(c[3]),
+        "es_nuevo": False
+    }
+
+
+# Cliente y sus casos en una sola consulta; el LEFT JOIN conserva al
+# cliente aunque no tenga casos (columnas de CASO en NULL). Sin paginación
+# el primer parámetro es 0 (todos los NOCASO son positivos).
+_CLIENTE_CASOS = """
+    SELECT C.CODCLIENTE, C.NOMCLIENTE, C.APECLIENTE, C.NDOCUMENTO,
+           K.NOCASO, K.CODESPECIALIZACION, K.FCHINICIO, K.VALOR, K.FCHFIN, K.FCHCREACION
+    FROM CLIENTE C
+    LEFT JOIN CASO K ON K.CODCLIENTE = C.CODCLIENTE AND K.NOCASO > %s
+    WHERE UPPER(C.NOMCLIENTE) = UPPER(%s)
+      AND UPPER(C.APECLIENTE) = UPPER(%s)
+    ORDER BY C.CODCLIENTE, K.NOCASO
+"""
+registrar("cliente_casos", _CLIENTE_CASOS)
+registrar("cliente_casos_pagina", lambda: limitar(_CLIENTE_CASOS))
+registrar("cliente_casos_codigo", """
+    SELECT C.CODCLIENTE, C.NOMCLIENTE, C.APECLIENTE, C.NDOCUMENTO,
+           K.NOCASO, K.CODESPECIALIZACION, K.FCHINICIO, K.VALOR, K.FCHFIN, K.FCHCREACION
+    FROM CLIENTE C
+    LEFT JOIN CASO K ON K.CODCLIENTE = C.CODCLIENTE
+    WHERE C.CODCLIENTE = %s
+    ORDER BY K.NOCASO
+""")
+registrar("cliente_caso_activo", lambda: limitar("""
+    SELECT NOCASO, CODESPECIALIZACION, FCHINICIO, VALOR
+    FROM CASO
+    WHERE CODCLIENTE = %s AND FCHFIN IS NULL
+    ORDER BY FCHCREACION DESC NULLS LAST, NOCASO DESC
+""", 1))
+
+
+def buscar_cliente(nom, ape, despues=None, limite=None):
+    """
+    Cliente por nombre y apellido, con sus casos y el último caso activo.
+
+    Con `limite` los casos se paginan por NOCASO: se devuelven los que
+    siguen a `despues` y "casos_siguiente" indica el valor para la
+    próxima página (None si no hay más).
+    """
+    return ejecutar(pasos_buscar_cliente(nom, ape, despues, limite))
+
+
+def pasos_buscar_cliente(nom, ape, despues=None, limite=None):
+    if not (nom and ape):
+        raise ErrorServicio("Debe ingresar nombre y apellido", 400)
+
+    paginado = limite is not None
+    params = [despues or 0, nom, ape]
+    if paginado:
+        filas = yield VARIOS, consulta("cliente_casos_pagina"), params + [limite + 1]
+    else:
+        filas = yield VARIOS, consulta("cliente_casos"), params
+
+    return (yield from _resumen_cliente(filas, limite))
+
+
+def pasos_cliente_por_codigo(codcli):
+    """
+    Cliente por CODCLIENTE con sus casos y el último caso activo; misma
+    respuesta que buscar_cliente sin paginar.
+    """
+    filas = yield VARIOS, consulta("cliente_casos_codigo"), [codcli]
+    return (yield from _resumen_cliente(filas))
+
+
+def _orden_creacion(caso):
+    """
+    Clave para el caso más reciente: FCHCREACION y, en los casos creados
+    antes de esa columna (NULL), NOCASO. NOCASO solo no basta porque cada
+    worker entrega números de su propio bloque.
+    """
+    creado = caso[5]
+    return (creado is not None, creado or datetime.min, caso[0])
+
+
+def _resumen_cliente(filas, limite=None):
+    """
+    Respuesta de buscar_cliente a partir de las filas cliente + caso.
+    """
+    if not filas:
+        raise ErrorServicio("Cliente no encontrado", 404)
+
+    paginado = limite is not None
+
+    # Si hay homónimos se toma el primero, como antes
+    cliente = filas[0][:4]
+    casos = [f[4:] for f in filas if f[0] == cliente[0] and f[4] is not None]
+
+    siguiente = None
+    if paginado and len(casos) > limite:
+        casos = casos[:limite]
+        siguiente = casos[-1][0]
+
+    # Casos del cliente (incluir fecha fin para saber si está cerrado)
+    casos_cliente = _CASO_CLIENTE.filas(casos)
+
+    # Último caso activo (sin fecha fin). Con paginación puede no estar en
+    # la página, así que se consulta aparte.
+    if paginado:
+        caso_activo = yield UNO, consulta("cliente_caso_activo"), [cliente[0]]
+    else:
+        caso_activo = max((c for c in casos if c[4] is None), key=_orden_creacion, default=None)
+
+    respuesta = {
+        "cliente": {
+            "cod": cliente[0],
+            "nom": cliente[1],
+            "ape": cliente[2],
+            "doc": cliente[3]
+        },
+        "casos_cliente": casos_cliente,
+        "caso_activo": _caso_activo(caso_activo) if caso_activo else None,
+        "especializaciones": (yield CATALOGO, "especializaciones", None)
+    }
+    if paginado:
+        respuesta["casos_siguiente"] = siguiente
+    return respuesta
+
+
+def buscar_clientes(nombre="", apellido="", doc="", limite=20, despues=None):
+    """
+    Búsqueda paginada de clientes por prefijo de nombre y/o apellido (sin
+    distinguir mayúsculas ni tildes) o por documento exacto.
+
+    Solo prefijos del campo completo: LIKE 'TEXTO%' usa el índice, un
+    '%TEXTO%' para buscar una palabra intermedia (segundo nombre o
+    apellido) recorrería toda la tabla.
+
+    Usa las columnas normalizadas e índices de 030_busqueda_clientes.sql.
+    La página siguiente se pide con el cursor opaco `siguiente`.
+    """
+    condiciones, params = [], []
+
+    if doc:
+        condiciones.append("NDOCUMENTO = %s")
+        params.append(doc.strip())
+    if apellido:
+        condiciones.append("APECLIENTE_NORM LIKE %s ESCAPE '\\'")
+        params.append(_prefijo_like(apellido))
+    if nombre:
+        condiciones.append("NOMCLIENTE_NORM LIKE %s ESCAPE '\\'")
+        params.append(_prefijo_like(nombre))
+
+    if not condiciones:
+        raise ErrorServicio("Debe indicar nombre, apellido o documento", 400)
+
+    if despues:
+        try:
+            ape_c, nom_c, cod_c = json.loads(base64.urlsafe_b64decode(despues.encode()))
+        except (ValueError, TypeError):
+            raise ErrorServicio("Cursor inválido", 400)
+        # Equivale a (APE, NOM, COD) > (ape_c, nom_c, cod_c); Oracle 11g no
+        # compara tuplas con índice.
+        condiciones.append("""(APECLIENTE_NORM > %s
+              OR (APECLIENTE_NORM = %s AND NOMCLIENTE_NORM > %s)
+              OR (APECLIENTE_NORM = %s AND NOMCLIENTE_NORM = %s AND CODCLIENTE > %s))""")
+        params += [ape_c, ape_c, nom_c, ape_c, nom_c, cod_c]
+
+    # Una SQL por combinación de filtros, todas con el nombre "buscar_clientes"
+    filas = many_results(con_nombre("buscar_clientes", limitar(f"""
+        SELECT CODCLIENTE, NOMCLIENTE, APECLIENTE, NDOCUMENTO,
+               APECLIENTE_NORM, NOMCLIENTE_NORM
+        FROM CLIENTE
+        WHERE {" AND ".join(condiciones)}
+        ORDER BY APECLIENTE_NORM, NOMCLIENTE_NORM, CODCLIENTE
+    """)), params + [limite + 1], alias_lectura())
+
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        ultima = filas[-1]
+        siguiente = base64.urlsafe_b64encode(
+            json.dumps([ultima[4], ultima[5], ultima[0]]).encode()
+        ).decode()
+
+    return {
+        "clientes": _CLIENTE.filas(filas),
+        "siguiente": siguiente
+    }
+
+
+
+def crear_caso(codcli, nom="", ape="", doc=""):
+    """
+    Genera el consecutivo de un nuevo caso para el cliente.
+    """
+    if not codcli:
+        raise ErrorServicio("Debe seleccionar un cliente", 400)
+
+    return {
+        "nocaso": consecutivos.casos.siguiente(),
+        "fecha_inicio": datetime.now().strftime("%Y-%m-%d"),
+        "cliente": {
+            "cod": codcli,
+            "nom": nom,
+            "ape": ape,
+            "doc": doc
+        }
+    }
+
+
+# Inserta el caso solo si el NOCASO no existe; rowcount dice si se creó
+registrar("caso_insertar", lambda: """
+    MERGE INTO CASO K
+    USING (SELECT %s AS NOCASO, %s AS CODCLIENTE, %s AS ESP, %s AS FCHINICIO, %s AS VALOR
+           FROM DUAL) D
+    ON (K.NOCASO = D.NOCASO)
+    WHEN NOT MATCHED THEN
+        INSERT (NOCASO, CODCLIENTE, CODESPECIALIZACION, FCHINICIO, FCHFIN, VALOR, FCHCREACION)
+        VALUES (D.NOCASO, D.CODCLIENTE, D.ESP, D.FCHINICIO, NULL, D.VALOR, SYSTIMESTAMP)
+""" if dialecto.es_oracle() else """
+    INSERT INTO CASO (NOCASO, CODCLIENTE, CODESPECIALIZACION, FCHINICIO, FCHFIN, VALOR, FCHCREACION)
+    VALUES (%s, %s, %s, %s, NULL, %s, CURRENT_TIMESTAMP)
+    ON CONFLICT (NOCASO) DO NOTHING
+""")
+registrar("idempotencia_insertar", "INSERT INTO CASO_IDEMPOTENCIA (CLAVE, NOCASO) VALUES (%s, %s)")
+registrar("idempotencia_caso", "SELECT NOCASO FROM CASO_IDEMPOTENCIA WHERE CLAVE = %s")
+
+
+def _publicar_caso(nocaso, codcli, esp, inicio, valor):
+    """
+    Evento "caso" para /api/caso/eventos/; se guarda con la transacción.
+    """
+    eventos.publicar("caso", nocaso=int(nocaso), codcliente=codcli, esp=esp,
+                     inicio=inicio.isoformat(), valor=monto(valor))
+
+
+def _insertar_caso(params):
+    """
+    True si el caso se insertó, False si el NOCASO ya existía.
+    """
+    try:
+        return execute(consulta("caso_insertar"), params) == 1
+    except IntegrityError as e:
+        violada = restriccion_violada(e)
+        # Solo en Oracle: dos MERGE simultáneos pueden no ver la fila del
+        # otro y el perdedor choca con la clave primaria. Oracle deshace solo
+        # la sentencia, así que la transacción sigue utilizable (en
+        # PostgreSQL quedaría abortada; allí ON CONFLICT no llega a fallar).
+        if violada == "unica" and dialecto.es_oracle():
+            return False
+        if violada == "foranea":
+            raise ErrorServicio("El cliente o la especialización no existen", 400)
+        raise
+
+
+def _insertar_idempotencia(clave, nocaso):
+    """
+    Guarda la Idempotency-Key; 409 si ya se usó (el atomic del llamador
+    deshace también el caso).
+    """
+    try:
+        execute(consulta("idempotencia_insertar"), [clave, nocaso])
+    except IntegrityError as e:
+        if restriccion_violada(e) != "unica":
+            raise
+        raise ErrorServicio("La Idempotency-Key ya se usó con otro caso", 409)
+
+
+def _validar_inicio_y_clave(fecha_inicio, clave):
+    """
+    fechaInicio como date; valida de paso la longitud de Idempotency-Key.
+    """
+    try:
+        inicio = datetime.strptime(str(fecha_inicio), "%Y-%m-%d").date()
+    except ValueError:
+        raise ErrorServicio("fechaInicio debe tener formato YYYY-MM-DD", 400)
+    if clave is not None and not 0 < len(clave) <= 64:
+        raise ErrorServicio("Idempotency-Key debe tener entre 1 y 64 caracteres", 400)
+    return inicio
+
+
+def guardar_caso(nocaso, codcli, esp, valor, fecha_inicio, clave=None):
+    """
+    Inserta un caso nuevo en una sola sentencia. Los casos existentes no
+    se modifican.
+
+    `clave` (cabecera Idempotency-Key) hace seguros los reintentos: si el
+    caso ya existe y fue creado con esa misma clave se responde como la
+    primera vez, con "creado": False.
+    """
+    if not (nocaso and codcli and esp and valor and fecha_inicio):
+        raise ErrorServicio("Todos los campos son obligatorios", 400)
+    inicio = _validar_inicio_y_clave(fecha_inicio, clave)
+
+    try:
+        if not consecutivos.casos.confirmar(nocaso):
+            raise ErrorServicio("El número de caso no fue asignado por el sistema", 400)
+
+        # Insertar nuevo caso y sumarlo al resumen de estadísticas
+        with transaction.atomic():
+            creado = _insertar_caso([nocaso, codcli, esp, inicio, valor])
+            if creado:
+                estadisticas.sumar_casos([(esp, inicio, valor)])
+                if clave:
+                    _insertar_idempotencia(clave, nocaso)
+                _publicar_caso(nocaso, codcli, esp, inicio, valor)
+
+        if not creado:
+            original = single_result(consulta("idempotencia_caso"), [clave]) if clave else None
+            if original is None or original[0] != int(nocaso):
+                raise ErrorServicio("El caso ya existe. No se puede modificar.", 400)
+
+    except ErrorServicio:
+        raise
+    except Exception as e:
+        raise ErrorServicio(f"Error al guardar: {str(e)}", 500)
+
+    return {"mensaje": "Caso creado correctamente", "nocaso": int(nocaso), "creado": creado}
+
+
+def abrir_caso(codcli, esp, valor, fecha_inicio, clave=None):
+    """
+    crear_caso + guardar_caso + buscar_cliente en una petición: asigna el
+    número, inserta el caso y devuelve los casos del cliente ya
+    actualizados, todo en una transacción.
+
+    Con `clave` (Idempotency-Key) un reintento no abre otro caso: responde
+    con el caso abierto la primera vez y "creado": False.
+    """
+    if not (codcli and esp and valor and fecha_inicio):
+        raise ErrorServicio("Todos los campos son obligatorios", 400)
+    inicio = _validar_inicio_y_clave(fecha_inicio, clave)
+
+    try:
+        original = single_result(consulta("idempotencia_caso"), [clave]) if clave else None
+        if original:
+            return {"mensaje": "Caso creado correctamente", "nocaso": original[0], "creado": False,
+                    **ejecutar(pasos_cliente_por_codigo(codcli))}
+
+        # Fuera del atomic: la reserva en CONSECUTIVO no debe deshacerse
+        nocaso = consecutivos.casos.siguiente()
+
+        with transaction.atomic():
+            if not _insertar_caso([nocaso, codcli, esp, inicio, valor]):
+                raise ErrorServicio(f"El número de caso {nocaso} ya está en uso", 500)
+            estadisticas.sumar_casos([(esp, inicio, valor)])
+            if clave:
+                _insertar_idempotencia(clave, nocaso)
+            # Dentro de la transacción se lee del primario; si el cliente no
+            # existe el 404 deshace el caso insertado.
+            resumen = ejecutar(pasos_cliente_por_codigo(codcli))
+            _publicar_caso(nocaso, codcli, esp, inicio, valor)
+
+    except ErrorServicio:
+        raise
+    except Exception as e:
+        raise ErrorServicio(f"Error al guardar: {str(e)}", 500)
+
+    return {"mensaje": "Caso creado correctamente", "nocaso": nocaso, "creado": True, **resumen}
+
+
+def version_caso(nocaso):
+    """
+    Marcador de versión del caso (CASO.VERSION), o None si no existe.
+    Cambia con cada expediente guardado; lo usan los ETag de las lecturas.
+    """
+    return ejecutar(pasos_version_caso(nocaso))
+
+
+registrar("caso_version", "SELECT VERSION FROM CASO WHERE NOCASO = %s")
+
+
+def pasos_version_caso(nocaso):
+    fila = yield UNO, consulta("caso_version"), [nocaso]
+    return fila[0] if fila else None
+
+
+_CASO = """
+    SELECT NOCASO, CODCLIENTE, CODESPECIALIZACION, FCHINICIO, FCHFIN, VALOR
+    FROM CASO
+"""
+registrar("caso", _CASO + "WHERE NOCASO = %s")
+
+
+def caso_por_numero(nocaso):
+    return ejecutar(pasos_caso_por_numero(nocaso))
+
+
+def pasos_caso_por_numero(nocaso):
+    caso = yield UNO, consulta("caso"), [nocaso]
+
+    if not caso:
+        raise ErrorServicio("Caso no encontrado", 404)
+
+    return _caso(caso)
+
+
+def _caso(caso):
+    return {
+        "nocaso": caso[0],
+        "codcliente": caso[1],
+        "esp": caso[2],
+        "inicio": fecha(caso[3]),
+        "fin": fecha(caso[4]),
+        "valor": monto(caso[5]),
+        "es_nuevo": False
+    }
+
+
+def casos_por_numero(nocasos, maximo=5000):
+    """
+    Varios casos por NOCASO en una petición, con consultas IN por bloques.
+    Devuelve {"casos": {nocaso: caso}, "faltantes": [...]} en el orden
+    recibido; los números repetidos se consultan una sola vez.
+    """
+    if not isinstance(nocasos, list) or not nocasos:
+        raise ErrorServicio("Debe enviar una lista de números de caso", 400)
+    try:
+        nocasos = list(dict.fromkeys(int(n) for n in nocasos))
+    except (TypeError, ValueError):
+        raise ErrorServicio("Los números de caso deben ser enteros", 400)
+    if len(nocasos) > maximo:
+        raise ErrorServicio(f"Máximo {maximo} casos por petición", 400)
+
+    filas = many_results_in(con_nombre("casos_por_numero", _CASO + "WHERE NOCASO IN ({marcas})"),
+                            nocasos, using=alias_lectura())
+    encontrados = {f[0]: _caso(f) for f in filas}
+
+    return {
+        "casos": {n: encontrados[n] for n in nocasos if n in encontrados},
+        "faltantes": [n for n in nocasos if n not in encontrados],
+    }
+
+
+# ==============================
+# EXPEDIENTES
+# ==============================
+
+registrar("ciudades", """
+    SELECT CODLUGAR, NOMLUGAR
+    FROM LUGAR
+    WHERE IDTIPOLUGAR = 'CII'
+""")
+registrar("abogados", """
+    SELECT CEDULA, NOMABOGADO, APEABOGADO
+    FROM ABOGADO
+    ORDER BY NOMABOGADO
+""")
+registrar("entidades", """
+    SELECT CODENTIDAD, NOMENTIDAD
+    FROM ENTIDAD
+    ORDER BY NOMENTIDAD
+""")
+
+
+@catalogo("ciudades")
+def listar_ciudades():
+    return _CODIGO_NOMBRE.filas(many_results(consulta("ciudades"), using=replica()))
+
+
+@catalogo("abogados")
+def listar_abogados():
+    abogados = many_results(consulta("abogados"), using=replica())
+    return [{"ced": a[0], "nom": f"{a[1]} {a[2]}"} for a in abogados]
+
+
+@catalogo("entidades")
+def listar_entidades():
+    return _CODIGO_NOMBRE.filas(many_results(consulta("entidades"), using=replica()))
+
+
+registrar("caso_expediente", """
+    SELECT NOCASO, CODCLIENTE, CODESPECIALIZACION, FCHINICIO, FCHFIN
+    FROM CASO
+    WHERE NOCASO = %s
+""")
+# Sin paginación el segundo parámetro es 0 (CONSECEXPE empieza en 1)
+_EXPEDIENTES = """
+    SELECT CONSECEXPE, IDTIPOCASO2, CODLUGAR, CEDULA, FCHETAPA
+    FROM EXPEDIENTE
+    WHERE NOCASO = %s AND CONSECEXPE > %s
+    ORDER BY CONSECEXPE
+"""
+registrar("expedientes", _EXPEDIENTES)
+registrar("expedientes_pagina", lambda: limitar(_EXPEDIENTES))
+
+
+def buscar_caso(nocaso, despues=None, limite=None):
+    """
+    Caso por NOCASO con la lista de sus expedientes.
+
+    Con `limite` los expedientes se paginan por CONSECEXPE a partir de
+    `despues`; "expedientes_siguiente" indica la próxima página.
+    """
+    return ejecutar(pasos_buscar_caso(nocaso, despues, limite))
+
+
+def pasos_buscar_caso(nocaso, despues=None, limite=None):
+    caso = yield UNO, consulta("caso_expediente"), [nocaso]
+
+    if not caso:
+        raise ErrorServicio("Caso no encontrado", 404)
+
+    # Expedientes del caso
+    paginado = limite is not None
+    params = [nocaso, despues or 0]
+    if paginado:
+        exps = yield VARIOS, consulta("expedientes_pagina"), params + [limite + 1]
+    else:
+        exps = yield VARIOS, consulta("expedientes"), params
+
+    siguiente = None
+    if paginado and len(exps) > limite:
+        exps = exps[:limite]
+        siguiente = exps[-1][0]
+
+    lista_expedientes = _EXPEDIENTE.filas(exps)
+
+    respuesta = {
+        "caso": {
+            "nocaso": caso[0],
+            "cliente": caso[1],
+            "esp": caso[2],
+            "inicio": fecha(caso[3]),
+            "fin": fecha(caso[4])
+        },
+        "lista_expedientes": lista_expedientes
+    }
+    if paginado:
+        respuesta["expedientes_siguiente"] = siguiente
+    return respuesta
+
+
+registrar("etapa_inicial", """
+    SELECT IDTIPOCASO2, CODETAPA
+    FROM ESPECIA_ETAPA
+    WHERE CODESPECIALIZACION = %s AND IDTIPOCASO2 = 1
+""")
+registrar("abogados_especializacion", """
+    SELECT A.CEDULA, A.NOMABOGADO, A.APEABOGADO
+    FROM ABOGADO A
+    JOIN ABOGADO_ESPECIALIZACION AE
+        ON A.CEDULA = AE.CEDULA
+    WHERE AE.CODESPECIALIZACION = %s
+""")
+
+
+def crear_expediente(nocaso, esp):
+    """
+    Prepara un expediente nuevo: etapa inicial y abogados de la
+    especialización. El consecutivo se asigna al guardarlo.
+    """
+    if not (nocaso and esp):
+        raise ErrorServicio("Datos incompletos", 400)
+
+    det_etapa = single_result(consulta("etapa_inicial"), [esp], alias_lectura())
+
+    idetapa = det_etapa[0] if det_etapa else None
+
+    # Abogados de la especialidad
+    abs_ = many_results(consulta("abogados_especializacion"), [esp], alias_lectura())
+
+    return {
+        "expediente": {
+            "consec": None,
+            "idetapa": idetapa,
+            "fecha": datetime.now().strftime("%Y-%m-%d")
+        },
+        "abogados": [{"ced": a[0], "nom": f"{a[1]} {a[2]}"} for a in abs_]
+    }
+
+
+registrar("caso_cliente", "SELECT CODCLIENTE FROM CASO WHERE NOCASO = %s")
+
+
+def guardar_expediente(nocaso, idetapa, codlugar, cedula):
+    """
+    Inserta el expediente; CONSECEXPE se asigna en el mismo INSERT. El
+    evento lleva el cliente del caso para el filtro ?cliente= del SSE.
+    """
+    if not (nocaso and idetapa and codlugar and cedula):
+        raise ErrorServicio("Todos los campos son obligatorios", 400)
+
+    with transaction.atomic():
+        consec = consecutivos.insertar_expediente(nocaso, idetapa, codlugar, cedula)
+        caso = single_result(consulta("caso_cliente"), [nocaso])
+        eventos.publicar("expediente", nocaso=int(nocaso), codcliente=caso[0] if caso else None,
+                         consec=consec, etapa=idetapa, lugar=codlugar, abogado=cedula)
+
+    return {"mensaje": "Etapa guardada correctamente", "consec": consec}
+
+
+# ==============================
+# ESTADÍSTICAS
+# ==============================
+
+def estadisticas_casos():
+    """
+    Casos activos, cerrados y valor total por especialización y por mes,
+    leídos del resumen CASO_ESTADISTICA (casos/estadisticas.py).
+    """
+    return estadisticas.resumen()
+
@@ -0,0 +1,67 @@
+-- Esquema base para SQLite/PostgreSQL (en Oracle ya existe).
+-- Solo tipos comunes a los tres motores. Aplicar en una base vacía con
+--   python manage.py crear_esquema
+-- y cargar los datos antes de los scripts 010+ (inicializan contadores).
+CREATE TABLE ESPECIALIZACION (
+    CODESPECIALIZACION VARCHAR(5) PRIMARY KEY,
+    NOMESPECIALIZACION VARCHAR(50)
+);
+
+CREATE TABLE LUGAR (
+    CODLUGAR    VARCHAR(5) PRIMARY KEY,
+    NOMLUGAR    VARCHAR(50),
+    IDTIPOLUGAR VARCHAR(3)
+);
+
+CREATE TABLE ENTIDAD (
+    CODENTIDAD VARCHAR(5) PRIMARY KEY,
+    NOMENTIDAD VARCHAR(50)
+);
+
+CREATE TABLE ABOGADO (
+    CEDULA     VARCHAR(15) PRIMARY KEY,
+    NOMABOGADO VARCHAR(30),
+    APEABOGADO VARCHAR(30)
+);
+
+CREATE TABLE ABOGADO_ESPECIALIZACION (
+    CEDULA             VARCHAR(15),
+    CODESPECIALIZACION VARCHAR(5),
+    PRIMARY KEY (CEDULA, CODESPECIALIZACION)
+);
+
+CREATE TABLE ESPECIA_ETAPA (
+    CODESPECIALIZACION VARCHAR(5),
+    IDTIPOCASO2        INTEGER,
+    CODETAPA           VARCHAR(5),
+    PRIMARY KEY (CODESPECIALIZACION, IDTIPOCASO2)
+);
+
+CREATE TABLE CLIENTE (
+    CODCLIENTE VARCHAR(5) PRIMARY KEY,
+    NOMCLIENTE VARCHAR(30),
+    APECLIENTE VARCHAR(30),
+    NDOCUMENTO VARCHAR(15)
+);
+
+CREATE TABLE CASO (
+    NOCASO             INTEGER PRIMARY KEY,
+    CODCLIENTE         VARCHAR(5),
+    CODESPECIALIZACION VARCHAR(5),
+    FCHINICIO          DATE,
+    FCHFIN             DATE,
+    VALOR              NUMERIC(12,2)
+);
+
+CREATE INDEX CASO_CLIENTE_IX ON CASO (CODCLIENTE, NOCASO);
+
+CREATE TABLE EXPEDIENTE (
+    NOCASO             INTEGER,
+    CONSECEXPE         INTEGER,
+    CODESPECIALIZACION VARCHAR(5),
+    IDTIPOCASO2        INTEGER,
+    CODLUGAR           VARCHAR(5),
+    CEDULA             VARCHAR(15),
+    FCHETAPA           DATE,
+    PRIMARY KEY (NOCASO, CONSECEXPE)
+);
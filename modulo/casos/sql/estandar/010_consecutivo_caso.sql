@@ -0,0 +1,8 @@
+-- Contador de NOCASO para SQLite/PostgreSQL (casos/consecutivos.py).
+CREATE TABLE CONSECUTIVO (
+    NOMBRE VARCHAR(30) PRIMARY KEY,
+    VALOR  INTEGER NOT NULL
+);
+
+INSERT INTO CONSECUTIVO (NOMBRE, VALOR)
+SELECT 'CASO', COALESCE(MAX(NOCASO), 0) FROM CASO;
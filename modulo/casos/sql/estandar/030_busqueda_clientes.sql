@@ -0,0 +1,8 @@
+-- Columnas normalizadas e índices para /api/caso/clientes/ (servicios.buscar_clientes).
+-- Las columnas las mantiene el trigger de 035_normalizacion_clientes.sql.
+ALTER TABLE CLIENTE ADD COLUMN NOMCLIENTE_NORM VARCHAR(100);
+ALTER TABLE CLIENTE ADD COLUMN APECLIENTE_NORM VARCHAR(100);
+
+CREATE INDEX CLIENTE_APE_NOM_IX ON CLIENTE (APECLIENTE_NORM, NOMCLIENTE_NORM, CODCLIENTE);
+CREATE INDEX CLIENTE_NOM_IX ON CLIENTE (NOMCLIENTE_NORM, APECLIENTE_NORM, CODCLIENTE);
+CREATE INDEX CLIENTE_DOC_IX ON CLIENTE (NDOCUMENTO);
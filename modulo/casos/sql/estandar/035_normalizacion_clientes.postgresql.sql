@@ -0,0 +1,21 @@
+-- Igual que 035_normalizacion_clientes.sql, con una función plpgsql y un
+-- trigger BEFORE como CLIENTE_NORM_TRG de Oracle. Se incluyen las minúsculas
+-- con tilde: con collation "C" UPPER no las convierte.
+CREATE OR REPLACE FUNCTION CLIENTE_NORM() RETURNS trigger AS $$
+BEGIN
+    NEW.NOMCLIENTE_NORM := TRANSLATE(UPPER(TRIM(NEW.NOMCLIENTE)),
+        'ÁÉÍÓÚÀÈÌÒÙÄËÏÖÜÂÊÎÔÛÑÇáéíóúàèìòùäëïöüâêîôûñç', 'AEIOUAEIOUAEIOUAEIOUNCAEIOUAEIOUAEIOUAEIOUNC');
+    NEW.APECLIENTE_NORM := TRANSLATE(UPPER(TRIM(NEW.APECLIENTE)),
+        'ÁÉÍÓÚÀÈÌÒÙÄËÏÖÜÂÊÎÔÛÑÇáéíóúàèìòùäëïöüâêîôûñç', 'AEIOUAEIOUAEIOUAEIOUNCAEIOUAEIOUAEIOUAEIOUNC');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+/
+
+CREATE TRIGGER CLIENTE_NORM_TRG
+BEFORE INSERT OR UPDATE OF NOMCLIENTE, APECLIENTE ON CLIENTE
+FOR EACH ROW EXECUTE FUNCTION CLIENTE_NORM();
+/
+
+-- Rellenar las filas existentes (dispara el trigger)
+UPDATE CLIENTE SET NOMCLIENTE = NOMCLIENTE;
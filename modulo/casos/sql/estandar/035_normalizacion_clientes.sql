@@ -0,0 +1,43 @@
+-- Mantiene NOMCLIENTE_NORM y APECLIENTE_NORM de los clientes que se crean o
+-- modifican después (casos/sql/oracle/030_busqueda_clientes.sql hace lo mismo
+-- en Oracle). La normalización debe coincidir con servicios.normalizar.
+-- UPPER de SQLite solo convierte ASCII: las letras con tilde se reemplazan
+-- aparte, mayúsculas y minúsculas en dos UPDATE (anidar los 44 REPLACE en una
+-- sola expresión desborda la pila del analizador de SQLite).
+-- Los bloques CREATE TRIGGER terminan con una línea '/' (casos/esquema.py).
+CREATE TRIGGER CLIENTE_NORM_UPD
+AFTER UPDATE OF NOMCLIENTE, APECLIENTE ON CLIENTE
+BEGIN
+    UPDATE CLIENTE SET
+        NOMCLIENTE_NORM =
+            REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(UPPER(TRIM(NEW.NOMCLIENTE)),
+                'Á', 'A'), 'É', 'E'), 'Í', 'I'), 'Ó', 'O'), 'Ú', 'U'), 'À', 'A'), 'È', 'E'), 'Ì', 'I'), 'Ò', 'O'), 'Ù', 'U'), 'Ä', 'A'),
+                'Ë', 'E'), 'Ï', 'I'), 'Ö', 'O'), 'Ü', 'U'), 'Â', 'A'), 'Ê', 'E'), 'Î', 'I'), 'Ô', 'O'), 'Û', 'U'), 'Ñ', 'N'), 'Ç', 'C'),
+        APECLIENTE_NORM =
+            REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(UPPER(TRIM(NEW.APECLIENTE)),
+                'Á', 'A'), 'É', 'E'), 'Í', 'I'), 'Ó', 'O'), 'Ú', 'U'), 'À', 'A'), 'È', 'E'), 'Ì', 'I'), 'Ò', 'O'), 'Ù', 'U'), 'Ä', 'A'),
+                'Ë', 'E'), 'Ï', 'I'), 'Ö', 'O'), 'Ü', 'U'), 'Â', 'A'), 'Ê', 'E'), 'Î', 'I'), 'Ô', 'O'), 'Û', 'U'), 'Ñ', 'N'), 'Ç', 'C')
+    WHERE CODCLIENTE = NEW.CODCLIENTE;
+    UPDATE CLIENTE SET
+        NOMCLIENTE_NORM =
+            REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(NOMCLIENTE_NORM,
+                'á', 'A'), 'é', 'E'), 'í', 'I'), 'ó', 'O'), 'ú', 'U'), 'à', 'A'), 'è', 'E'), 'ì', 'I'), 'ò', 'O'), 'ù', 'U'), 'ä', 'A'),
+                'ë', 'E'), 'ï', 'I'), 'ö', 'O'), 'ü', 'U'), 'â', 'A'), 'ê', 'E'), 'î', 'I'), 'ô', 'O'), 'û', 'U'), 'ñ', 'N'), 'ç', 'C'),
+        APECLIENTE_NORM =
+            REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(APECLIENTE_NORM,
+                'á', 'A'), 'é', 'E'), 'í', 'I'), 'ó', 'O'), 'ú', 'U'), 'à', 'A'), 'è', 'E'), 'ì', 'I'), 'ò', 'O'), 'ù', 'U'), 'ä', 'A'),
+                'ë', 'E'), 'ï', 'I'), 'ö', 'O'), 'ü', 'U'), 'â', 'A'), 'ê', 'E'), 'î', 'I'), 'ô', 'O'), 'û', 'U'), 'ñ', 'N'), 'ç', 'C')
+    WHERE CODCLIENTE = NEW.CODCLIENTE;
+END;
+/
+
+-- El INSERT pasa por el trigger anterior
+CREATE TRIGGER CLIENTE_NORM_INS
+AFTER INSERT ON CLIENTE
+BEGIN
+    UPDATE CLIENTE SET NOMCLIENTE = NEW.NOMCLIENTE WHERE CODCLIENTE = NEW.CODCLIENTE;
+END;
+/
+
+-- Rellenar las filas existentes (dispara el trigger)
+UPDATE CLIENTE SET NOMCLIENTE = NOMCLIENTE;
@@ -0,0 +1,4 @@
+-- Marcador de versión del caso para el ETag de /api/caso/caso/<n>/ y
+-- /api/caso/buscar_caso/<n>/. Lo incrementa cada expediente guardado
+-- (casos/consecutivos.py).
+ALTER TABLE CASO ADD COLUMN VERSION INTEGER NOT NULL DEFAULT 1;
@@ -0,0 +1,22 @@
+-- Resumen de casos por especialización y mes para /api/caso/estadisticas/
+-- (casos/estadisticas.py). Se llena aquí a partir de CASO y después lo
+-- incrementan guardar_caso y la carga masiva con INSERT ... ON CONFLICT en
+-- la misma transacción del INSERT. El mes sale del texto 'YYYY-MM-DD' de
+-- la fecha, igual en SQLite y PostgreSQL.
+CREATE TABLE CASO_ESTADISTICA (
+    CODESPECIALIZACION VARCHAR(5) NOT NULL,
+    MES                VARCHAR(7) NOT NULL,
+    ACTIVOS            INTEGER NOT NULL,
+    CERRADOS           INTEGER NOT NULL,
+    VALOR              NUMERIC(15,2) NOT NULL,
+    PRIMARY KEY (CODESPECIALIZACION, MES)
+);
+
+INSERT INTO CASO_ESTADISTICA (CODESPECIALIZACION, MES, ACTIVOS, CERRADOS, VALOR)
+SELECT CODESPECIALIZACION, SUBSTR(CAST(FCHINICIO AS VARCHAR(10)), 1, 7),
+       SUM(CASE WHEN FCHFIN IS NULL THEN 1 ELSE 0 END),
+       SUM(CASE WHEN FCHFIN IS NULL THEN 0 ELSE 1 END),
+       COALESCE(SUM(VALOR), 0)
+FROM CASO
+WHERE CODESPECIALIZACION IS NOT NULL AND FCHINICIO IS NOT NULL
+GROUP BY CODESPECIALIZACION, SUBSTR(CAST(FCHINICIO AS VARCHAR(10)), 1, 7);
@@ -0,0 +1,7 @@
+-- Momento en que se creó cada caso, para elegir el último caso activo del
+-- cliente (servicios._resumen_cliente). NOCASO no sirve: cada worker
+-- reserva su propio bloque de números (casos/consecutivos.py) y los casos
+-- de dos workers se intercalan. Los INSERT de la aplicación lo llenan con
+-- CURRENT_TIMESTAMP; en los casos anteriores queda NULL y se ordenan por
+-- NOCASO, que entonces sí era creciente.
+ALTER TABLE CASO ADD COLUMN FCHCREACION TIMESTAMP;
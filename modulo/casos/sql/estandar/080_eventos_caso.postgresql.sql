@@ -0,0 +1,13 @@
+-- Igual que 080_eventos_caso.sql, con una columna identity para el ID.
+CREATE TABLE CASO_EVENTO (
+    ID        BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    TIPO      VARCHAR(20) NOT NULL,
+    DATOS     VARCHAR(4000) NOT NULL,
+    FCHEVENTO TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+CREATE TABLE CASO_EVENTO_OYENTES (
+    HASTA NUMERIC(15, 3) NOT NULL
+);
+
+INSERT INTO CASO_EVENTO_OYENTES (HASTA) VALUES (0);
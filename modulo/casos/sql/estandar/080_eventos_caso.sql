@@ -0,0 +1,20 @@
+-- Eventos de casos y expedientes para /api/caso/eventos/ (casos/eventos.py).
+-- publicar() los guarda en la transacción del guardado, solo si algún
+-- worker tiene conexiones SSE (CASO_EVENTO_OYENTES), y cada worker los lee
+-- por ID. Dos guardados pueden confirmarse en otro orden que el de su ID:
+-- quien lee espera CASOS_EVENTOS_ESPERA segundos por los huecos. Los
+-- mismos workers borran los eventos viejos.
+-- PostgreSQL: 080_eventos_caso.postgresql.sql.
+CREATE TABLE CASO_EVENTO (
+    ID        INTEGER PRIMARY KEY AUTOINCREMENT,
+    TIPO      VARCHAR(20) NOT NULL,
+    DATOS     VARCHAR(4000) NOT NULL,
+    FCHEVENTO TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+-- Hasta cuándo (segundos Unix) hay algún worker escuchando
+CREATE TABLE CASO_EVENTO_OYENTES (
+    HASTA NUMERIC(15, 3) NOT NULL
+);
+
+INSERT INTO CASO_EVENTO_OYENTES (HASTA) VALUES (0);
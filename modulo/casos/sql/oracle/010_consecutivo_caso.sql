@@ -0,0 +1,12 @@
+-- Secuencia para NOCASO (casos/consecutivos.py).
+-- Arranca después del mayor NOCASO existente. Los procesos piden bloques
+-- con CONNECT BY LEVEL, así que INCREMENT BY queda en 1.
+DECLARE
+    v_inicio NUMBER;
+BEGIN
+    SELECT NVL(MAX(NOCASO), 0) + 1 INTO v_inicio FROM CASO;
+    EXECUTE IMMEDIATE
+        'CREATE SEQUENCE CASO_SEQ START WITH ' || v_inicio ||
+        ' INCREMENT BY 1 CACHE 100 NOCYCLE';
+END;
+/
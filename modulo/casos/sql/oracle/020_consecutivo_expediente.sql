@@ -0,0 +1,11 @@
+-- Contador de CONSECEXPE por caso (casos/consecutivos.py).
+-- Si un caso no tiene fila, se crea en su primer expediente.
+CREATE TABLE EXPEDIENTE_CONSEC (
+    NOCASO NUMBER(8) PRIMARY KEY,
+    ULTIMO NUMBER(5) NOT NULL
+);
+
+INSERT INTO EXPEDIENTE_CONSEC (NOCASO, ULTIMO)
+SELECT NOCASO, MAX(CONSECEXPE) FROM EXPEDIENTE GROUP BY NOCASO;
+
+COMMIT;
@@ -0,0 +1,28 @@
+-- Columnas normalizadas e índices para /api/caso/clientes/ (servicios.buscar_clientes).
+-- La normalización (mayúsculas, sin tildes) debe coincidir con servicios.normalizar.
+ALTER TABLE CLIENTE ADD (
+    NOMCLIENTE_NORM VARCHAR2(100),
+    APECLIENTE_NORM VARCHAR2(100)
+);
+
+CREATE OR REPLACE TRIGGER CLIENTE_NORM_TRG
+BEFORE INSERT OR UPDATE OF NOMCLIENTE, APECLIENTE ON CLIENTE
+FOR EACH ROW
+BEGIN
+    :NEW.NOMCLIENTE_NORM := TRANSLATE(UPPER(TRIM(:NEW.NOMCLIENTE)),
+        'ÁÉÍÓÚÀÈÌÒÙÄËÏÖÜÂÊÎÔÛÑÇ', 'AEIOUAEIOUAEIOUAEIOUNC');
+    :NEW.APECLIENTE_NORM := TRANSLATE(UPPER(TRIM(:NEW.APECLIENTE)),
+        'ÁÉÍÓÚÀÈÌÒÙÄËÏÖÜÂÊÎÔÛÑÇ', 'AEIOUAEIOUAEIOUAEIOUNC');
+END;
+/
+
+-- Rellenar las filas existentes (dispara el trigger)
+UPDATE CLIENTE SET NOMCLIENTE = NOMCLIENTE;
+COMMIT;
+
+-- Búsqueda por apellido (y nombre) con orden de paginación incluido
+CREATE INDEX CLIENTE_APE_NOM_IX ON CLIENTE (APECLIENTE_NORM, NOMCLIENTE_NORM, CODCLIENTE);
+-- Búsqueda solo por nombre
+CREATE INDEX CLIENTE_NOM_IX ON CLIENTE (NOMCLIENTE_NORM, APECLIENTE_NORM, CODCLIENTE);
+-- Documento exacto (omitir si NDOCUMENTO ya tiene índice único)
+CREATE INDEX CLIENTE_DOC_IX ON CLIENTE (NDOCUMENTO);
@@ -0,0 +1,5 @@
+-- Marcador de versión del caso para el ETag de /api/caso/caso/<n>/ y
+-- /api/caso/buscar_caso/<n>/. Lo incrementa cada expediente guardado
+-- (casos/consecutivos.py). En 11g, ADD con DEFAULT y NOT NULL no reescribe
+-- las filas existentes.
+ALTER TABLE CASO ADD (VERSION NUMBER(10) DEFAULT 1 NOT NULL);
@@ -0,0 +1,24 @@
+-- Resumen de casos por especialización y mes para /api/caso/estadisticas/
+-- (casos/estadisticas.py). Se llena aquí a partir de CASO y después lo
+-- incrementan guardar_caso y la carga masiva con un MERGE en la misma
+-- transacción del INSERT. Es una tabla y no una vista materializada ON
+-- COMMIT para que el mismo código sirva en SQLite y PostgreSQL.
+CREATE TABLE CASO_ESTADISTICA (
+    CODESPECIALIZACION VARCHAR2(5) NOT NULL,
+    MES                VARCHAR2(7) NOT NULL,
+    ACTIVOS            NUMBER(10) NOT NULL,
+    CERRADOS           NUMBER(10) NOT NULL,
+    VALOR              NUMBER(15,2) NOT NULL,
+    CONSTRAINT CASO_ESTADISTICA_PK PRIMARY KEY (CODESPECIALIZACION, MES)
+);
+
+INSERT INTO CASO_ESTADISTICA (CODESPECIALIZACION, MES, ACTIVOS, CERRADOS, VALOR)
+SELECT CODESPECIALIZACION, TO_CHAR(FCHINICIO, 'YYYY-MM'),
+       SUM(CASE WHEN FCHFIN IS NULL THEN 1 ELSE 0 END),
+       SUM(CASE WHEN FCHFIN IS NULL THEN 0 ELSE 1 END),
+       NVL(SUM(VALOR), 0)
+FROM CASO
+WHERE CODESPECIALIZACION IS NOT NULL AND FCHINICIO IS NOT NULL
+GROUP BY CODESPECIALIZACION, TO_CHAR(FCHINICIO, 'YYYY-MM');
+
+COMMIT;
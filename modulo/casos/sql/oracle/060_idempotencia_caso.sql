@@ -0,0 +1,9 @@
+-- Claves Idempotency-Key de /api/caso/guardar_caso/ (servicios.guardar_caso).
+-- Un reintento con la misma clave y el mismo NOCASO responde como la
+-- primera vez sin volver a insertar. Las claves viejas se borran con
+-- manage.py purgar_idempotencia.
+CREATE TABLE CASO_IDEMPOTENCIA (
+    CLAVE  VARCHAR2(64) PRIMARY KEY,
+    NOCASO NUMBER(8) NOT NULL,
+    CREADO DATE DEFAULT SYSDATE NOT NULL
+);
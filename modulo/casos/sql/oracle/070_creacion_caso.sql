@@ -0,0 +1,8 @@
+-- Momento en que se creó cada caso, para elegir el último caso activo del
+-- cliente (servicios._resumen_cliente). NOCASO no sirve: cada worker
+-- reserva su propio bloque de la secuencia (casos/consecutivos.py) y los
+-- casos de dos workers se intercalan. La columna se agrega sin DEFAULT para
+-- no reescribir las filas existentes (quedan en NULL y se ordenan por
+-- NOCASO); el DEFAULT se fija después y solo aplica a los INSERT nuevos.
+ALTER TABLE CASO ADD (FCHCREACION TIMESTAMP);
+ALTER TABLE CASO MODIFY (FCHCREACION DEFAULT SYSTIMESTAMP);
@@ -0,0 +1,23 @@
+-- Eventos de casos y expedientes para /api/caso/eventos/ (casos/eventos.py).
+-- publicar() los guarda en la transacción del guardado, solo si algún
+-- worker tiene conexiones SSE (CASO_EVENTO_OYENTES), y cada worker los lee
+-- por ID. Con la caché de la secuencia dos sesiones pueden confirmar sus
+-- eventos en otro orden que el de su ID: quien lee espera
+-- CASOS_EVENTOS_ESPERA segundos por los huecos. Los mismos workers borran
+-- los eventos viejos.
+CREATE SEQUENCE CASO_EVENTO_SEQ START WITH 1 INCREMENT BY 1 CACHE 100;
+
+CREATE TABLE CASO_EVENTO (
+    ID        NUMBER(12) PRIMARY KEY,
+    TIPO      VARCHAR2(20) NOT NULL,
+    DATOS     VARCHAR2(4000) NOT NULL,
+    FCHEVENTO DATE DEFAULT SYSDATE NOT NULL
+);
+
+-- Hasta cuándo (segundos Unix) hay algún worker escuchando
+CREATE TABLE CASO_EVENTO_OYENTES (
+    HASTA NUMBER(15, 3) NOT NULL
+);
+
+INSERT INTO CASO_EVENTO_OYENTES (HASTA) VALUES (0);
+COMMIT;
@@ -0,0 +1,8 @@
+-- Bloques de CASO_SEQ entregados a los procesos (casos/consecutivos.py).
+-- LAST_NUMBER de USER_SEQUENCES incluye la caché de la secuencia, así que
+-- no dice qué números se entregaron: AsignadorCasos.confirmar() busca el
+-- número en el bloque que lo contiene. Una fila por bloque reservado.
+CREATE TABLE CASO_BLOQUE (
+    HASTA NUMBER(8) PRIMARY KEY,
+    DESDE NUMBER(8) NOT NULL
+);
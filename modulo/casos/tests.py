@@ -1,3 +1,1070 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from . import (
+    catalogos, consecutivos, consultas, db, esquema, estadisticas, eventos, exportacion,
+    pool, renderers, replicas, servicios,
+)
+from .filas import Mapeador, fecha, monto
+
+
+@skipIf(connection.vendor == "oracle",
+        "los scripts de Oracle (casos/sql/oracle/) se ejecutan con SQL*Plus")
+class EsquemaCasosMixin:
+    """
+    Crea en la base de pruebas las mismas tablas que crear_esquema, con los
+    scripts de casos/sql/estandar/, así que el esquema de las pruebas no
+    se aparta del real (CASOS_BD=sqlite python manage.py test casos).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Dentro de la transacción de la clase: el rollback final lo deshace
+        esquema.aplicar()
+
+    def insertar(self, tabla, **valores):
+        columnas = ", ".join(valores)
+        marcas = ", ".join(["%s"] * len(valores))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {tabla} ({columnas}) VALUES ({marcas})", list(valores.values())
+            )
+
+
+class CatalogosTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        catalogos.invalidar()
+        self.addCleanup(catalogos.invalidar)
+        self.insertar("ESPECIALIZACION", CODESPECIALIZACION="E001", NOMESPECIALIZACION="Civil")
+
+    def nueva_especializacion(self):
+        self.insertar("ESPECIALIZACION", CODESPECIALIZACION="E002", NOMESPECIALIZACION="Penal")
+
+    def test_etag_y_304(self):
+        url = reverse("get_especializaciones")
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), [{"codigo": "E001", "nombre": "Civil"}])
+        self.assertIn("public", res["Cache-Control"])
+        with self.assertNumQueries(0):
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, 304)
+
+    def test_se_recarga_al_vencer(self):
+        with mock.patch.object(catalogos.time, "monotonic", return_value=1000.0):
+            entrada = catalogos.cache.obtener("especializaciones")
+        self.nueva_especializacion()
+        with override_settings(CASOS_CATALOGOS_TTL=300):
+            with mock.patch.object(catalogos.time, "monotonic", return_value=1299.0), \
+                    self.assertNumQueries(0):
+                self.assertIs(catalogos.cache.obtener("especializaciones"), entrada)
+            with mock.patch.object(catalogos.time, "monotonic", return_value=1300.0):
+                recargada = catalogos.cache.obtener("especializaciones")
+        self.assertEqual(len(recargada.datos), 2)
+        self.assertEqual(recargada.version, entrada.version + 1)
+        self.assertNotEqual(recargada.etag, entrada.etag)
+
+    def test_invalidar_despues_de_escribir(self):
+        url = reverse("get_especializaciones")
+        etag = self.client.get(url)["ETag"]
+        self.nueva_especializacion()
+        # Sin invalidar sigue la versión en caché
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        catalogos.invalidar("especializaciones")
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.json()), 2)
+
+    def test_mismo_contenido_mismo_etag(self):
+        etag = catalogos.cache.obtener("especializaciones").etag
+        catalogos.invalidar()
+        self.assertEqual(catalogos.cache.obtener("especializaciones").etag, etag)
+
+    def test_calentar(self):
+        entradas = catalogos.cache.calentar(["especializaciones"])
+        self.assertEqual(list(entradas), ["especializaciones"])
+        with self.assertNumQueries(0):
+            catalogos.cache.obtener("especializaciones")
+        with self.assertRaises(ValueError):
+            catalogos.cache.calentar(["especialidades"])
+
+    def test_comando_calentar_catalogos(self):
+        salida = io.StringIO()
+        call_command("calentar_catalogos", "especializaciones", stdout=salida)
+        self.assertIn("1 catálogos cargados", salida.getvalue())
+        with self.assertRaisesMessage(CommandError, "Catálogos desconocidos: especialidades"):
+            call_command("calentar_catalogos", "especialidades", stdout=io.StringIO())
+
+
+class BuscarClienteTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        catalogos.invalidar()
+        self.insertar("ESPECIALIZACION", CODESPECIALIZACION="E001", NOMESPECIALIZACION="Civil")
+        self.insertar("CLIENTE", CODCLIENTE="C001", NOMCLIENTE="Luis",
+                      APECLIENTE="Martínez", NDOCUMENTO="123")
+        self.insertar("CLIENTE", CODCLIENTE="C002", NOMCLIENTE="Ana",
+                      APECLIENTE="Ruiz", NDOCUMENTO="456")
+        for nocaso, fin in [(1, date(2024, 3, 1)), (2, None), (3, None), (4, date(2024, 6, 1))]:
+            self.insertar("CASO", NOCASO=nocaso, CODCLIENTE="C001", CODESPECIALIZACION="E001",
+                          FCHINICIO=date(2024, 1, nocaso), FCHFIN=fin, VALOR=1000 * nocaso)
+
+    def buscar(self, nombre, apellido):
+        return self.client.get(reverse("buscar_cliente"), {"nombre": nombre, "apellido": apellido})
+
+    def test_una_consulta_con_catalogo_en_cache(self):
+        catalogos.cache.obtener("especializaciones")
+        with self.assertNumQueries(1):
+            # SQLite solo pasa a mayúsculas ASCII: la tilde va en minúscula
+            res = self.buscar("LUIS", "martínez")
+        self.assertEqual(res.status_code, 200)
+
+    def test_dos_consultas_con_catalogo_frio(self):
+        with self.assertNumQueries(2):
+            self.buscar("Luis", "Martínez")
+
+    def test_caso_activo_es_el_ultimo_sin_fecha_fin(self):
+        data = self.buscar("Luis", "Martínez").json()
+        self.assertEqual([c["nocaso"] for c in data["casos_cliente"]], [1, 2, 3, 4])
+        self.assertEqual(data["caso_activo"]["nocaso"], 3)
+        self.assertEqual(data["cliente"]["doc"], "123")
+
+    def test_caso_activo_es_el_ultimo_creado(self):
+        # Dos workers con bloques distintos: el 8 se creó después que el 9
+        for nocaso, creado in [(9, datetime(2024, 5, 1, 9)), (8, datetime(2024, 5, 1, 10))]:
+            self.insertar("CASO", NOCASO=nocaso, CODCLIENTE="C001", CODESPECIALIZACION="E001",
+                          FCHINICIO=date(2024, 5, 1), VALOR=500, FCHCREACION=creado)
+        self.assertEqual(self.buscar("Luis", "Martínez").json()["caso_activo"]["nocaso"], 8)
+        pagina = self.client.get(reverse("buscar_cliente"),
+                                 {"nombre": "Luis", "apellido": "Martínez", "limit": 2}).json()
+        self.assertEqual(pagina["caso_activo"]["nocaso"], 8)
+
+    def test_casos_paginados_por_nocaso(self):
+        url = reverse("buscar_cliente")
+        pagina = self.client.get(url, {"nombre": "Luis", "apellido": "Martínez", "limit": 2}).json()
+        self.assertEqual([c["nocaso"] for c in pagina["casos_cliente"]], [1, 2])
+        self.assertEqual(pagina["casos_siguiente"], 2)
+        self.assertEqual(pagina["caso_activo"]["nocaso"], 3)
+
+        pagina = self.client.get(url, {"nombre": "Luis", "apellido": "Martínez",
+                                       "limit": 2, "after": 2}).json()
+        self.assertEqual([c["nocaso"] for c in pagina["casos_cliente"]], [3, 4])
+        self.assertIsNone(pagina["casos_siguiente"])
+
+    def test_sin_paginacion_no_cambia_la_respuesta(self):
+        self.assertNotIn("casos_siguiente", self.buscar("Luis", "Martínez").json())
+
+    def test_cliente_sin_casos(self):
+        data = self.buscar("Ana", "Ruiz").json()
+        self.assertEqual(data["casos_cliente"], [])
+        self.assertIsNone(data["caso_activo"])
+
+    def test_cliente_no_encontrado(self):
+        self.assertEqual(self.buscar("Nadie", "Nunca").status_code, 404)
+
+
+class BuscarClientesTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        for cod, nom, ape in [("C001", "Luis", "Martínez"), ("C002", "José Luis", "Martin"),
+                              ("C003", "Ángela", "Muñoz"), ("C004", "Ana", "Ruiz")]:
+            self.insertar("CLIENTE", CODCLIENTE=cod, NOMCLIENTE=nom, APECLIENTE=ape,
+                          NDOCUMENTO=cod[1:])
+
+    def buscar(self, **parametros):
+        res = self.client.get(reverse("buscar_clientes"), parametros)
+        self.assertEqual(res.status_code, 200)
+        return [c["cod"] for c in res.json()["clientes"]]
+
+    def normalizados(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT CODCLIENTE, NOMCLIENTE_NORM, APECLIENTE_NORM FROM CLIENTE "
+                           "ORDER BY CODCLIENTE")
+            return cursor.fetchall()
+
+    def test_el_trigger_llena_las_columnas(self):
+        esperado = [
+            ("C001", "LUIS", "MARTINEZ"), ("C002", "JOSE LUIS", "MARTIN"),
+            ("C003", "ANGELA", "MUNOZ"), ("C004", "ANA", "RUIZ"),
+        ]
+        self.assertEqual(self.normalizados(), esperado)
+        # normalizar_clientes calcula lo mismo en Python
+        call_command("normalizar_clientes", "--todos", stdout=io.StringIO())
+        self.assertEqual(self.normalizados(), esperado)
+
+    def test_cliente_nuevo_o_modificado(self):
+        self.insertar("CLIENTE", CODCLIENTE="C005", NOMCLIENTE=" çelia ", APECLIENTE="Núñez",
+                      NDOCUMENTO="5")
+        self.assertEqual(self.buscar(apellido="nunez", nombre="CELIA"), ["C005"])
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE CLIENTE SET APECLIENTE = 'Öste' WHERE CODCLIENTE = 'C005'")
+        self.assertEqual(self.buscar(apellido="nunez"), [])
+        self.assertEqual(self.buscar(apellido="oste"), ["C005"])
+
+    def test_sin_mayusculas_ni_tildes(self):
+        self.assertEqual(self.buscar(apellido="martí"), ["C002", "C001"])
+        self.assertEqual(self.buscar(apellido="MUNOZ", nombre="angel"), ["C003"])
+        self.assertEqual(self.buscar(nombre="ÁN"), ["C003", "C004"])
+
+    def test_solo_prefijos(self):
+        self.assertEqual(self.buscar(apellido="tinez"), [])
+        self.assertEqual(self.buscar(nombre="luis"), ["C001"])
+
+    def test_comodines_literales(self):
+        self.assertEqual(self.buscar(apellido="M%"), [])
+        self.assertEqual(self.buscar(apellido="_uiz"), [])
+
+    def test_paginas_con_cursor(self):
+        url = reverse("buscar_clientes")
+        pagina = self.client.get(url, {"apellido": "m", "limit": 2}).json()
+        self.assertEqual([c["cod"] for c in pagina["clientes"]], ["C002", "C001"])
+        pagina = self.client.get(url, {"apellido": "m", "limit": 2,
+                                       "after": pagina["siguiente"]}).json()
+        self.assertEqual([c["cod"] for c in pagina["clientes"]], ["C003"])
+        self.assertIsNone(pagina["siguiente"])
+
+
+@override_settings(CASOS_MEDIR_SQL=True)
+class MedicionSQLTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        self.insertar("CASO", NOCASO=1, CODCLIENTE="C001", CODESPECIALIZACION="E001",
+                      FCHINICIO=date(2024, 1, 1), FCHFIN=None, VALOR=1000)
+
+    def test_server_timing_cuenta_las_consultas(self):
+        res = self.client.get(reverse("buscar_caso_numero", args=[1]))
+        self.assertEqual(res.status_code, 200)
+        # VERSION para el ETag y la lectura del caso
+        self.assertIn('db;desc="SQL (2)"', res["Server-Timing"])
+
+    @override_settings(CASOS_MEDIR_SQL=False)
+    def test_apagado_no_agrega_cabecera(self):
+        res = self.client.get(reverse("buscar_caso_numero", args=[1]))
+        self.assertNotIn("Server-Timing", res)
+
+
+class CasoCondicionalTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        self.insertar("CASO", NOCASO=1, CODCLIENTE="C001", CODESPECIALIZACION="E001",
+                      FCHINICIO=date(2024, 1, 1), FCHFIN=None, VALOR=1000)
+        self.url = reverse("buscar_caso_numero", args=[1])
+
+    def test_304_sin_leer_el_caso(self):
+        etag = self.client.get(self.url)["ETag"]
+        with self.assertNumQueries(1):
+            res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+
+    def test_nueva_version_invalida_el_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE CASO SET VERSION = VERSION + 1 WHERE NOCASO = 1")
+        res = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+
+    def test_cada_pagina_tiene_su_etag(self):
+        url = reverse("buscar_caso_expediente", args=[1])
+        pagina1 = self.client.get(url, {"limit": 2})
+        pagina2 = self.client.get(url, {"limit": 2, "after": 2})
+        self.assertNotEqual(pagina1["ETag"], pagina2["ETag"])
+        self.assertNotEqual(pagina1["ETag"], self.client.get(url)["ETag"])
+        res = self.client.get(url, {"limit": 2, "after": 2}, HTTP_IF_NONE_MATCH=pagina1["ETag"])
+        self.assertEqual(res.status_code, 200)
+
+    def test_caso_inexistente_sin_etag(self):
+        res = self.client.get(reverse("buscar_caso_numero", args=[99]))
+        self.assertEqual(res.status_code, 404)
+        self.assertNotIn("ETag", res)
+
+
+class VistasAsyncTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        catalogos.invalidar()
+        self.insertar("ESPECIALIZACION", CODESPECIALIZACION="E001", NOMESPECIALIZACION="Civil")
+        self.insertar("CLIENTE", CODCLIENTE="C001", NOMCLIENTE="Luis",
+                      APECLIENTE="Martínez", NDOCUMENTO="123")
+        for nocaso in (1, 2):
+            self.insertar("CASO", NOCASO=nocaso, CODCLIENTE="C001", CODESPECIALIZACION="E001",
+                          FCHINICIO=date(2024, 1, nocaso), FCHFIN=None, VALOR=1000)
+
+    async def test_catalogo_con_etag(self):
+        url = reverse("async_especializaciones")
+        res = await self.async_client.get(url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(json.loads(res.content), [{"codigo": "E001", "nombre": "Civil"}])
+        res = await self.async_client.get(url, headers={"if-none-match": res["ETag"]})
+        self.assertEqual(res.status_code, 304)
+
+    async def test_buscar_cliente(self):
+        res = await self.async_client.get(reverse("async_buscar_cliente"),
+                                          {"nombre": "Luis", "apellido": "Martínez"})
+        self.assertEqual(res.status_code, 200)
+        data = json.loads(res.content)
+        self.assertEqual([c["nocaso"] for c in data["casos_cliente"]], [1, 2])
+        self.assertEqual(data["caso_activo"]["nocaso"], 2)
+        res = await self.async_client.get(reverse("async_buscar_cliente"),
+                                          {"nombre": "Nadie", "apellido": "Nunca"})
+        self.assertEqual(res.status_code, 404)
+
+    async def test_caso_con_etag(self):
+        url = reverse("async_caso_numero", args=[1])
+        res = await self.async_client.get(url)
+        self.assertEqual(res.status_code, 200)
+        etag = res["ETag"]
+        res = await self.async_client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(res.status_code, 304)
+
+        await sync_to_async(self.insertar_version)(1)
+        res = await self.async_client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res["ETag"], etag)
+
+    async def test_caso_inexistente(self):
+        res = await self.async_client.get(reverse("async_caso_numero", args=[99]))
+        self.assertEqual(res.status_code, 404)
+        self.assertNotIn("ETag", res)
+
+    def insertar_version(self, nocaso):
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE CASO SET VERSION = VERSION + 1 WHERE NOCASO = %s", [nocaso])
+
+
+class CasosPorNumeroTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        for nocaso in (1, 2, 3):
+            self.insertar("CASO", NOCASO=nocaso, CODCLIENTE="C001", CODESPECIALIZACION="E001",
+                          FCHINICIO=date(2024, 1, nocaso), FCHFIN=None, VALOR=1000)
+
+    def pedir(self, nocasos):
+        return self.client.post(reverse("casos_por_numero"), {"nocasos": nocasos},
+                                content_type="application/json")
+
+    def test_casos_y_faltantes_en_una_consulta(self):
+        with self.assertNumQueries(1):
+            data = self.pedir([3, 99, 1, 3]).json()
+        self.assertEqual(list(data["casos"]), ["3", "1"])
+        self.assertEqual(data["casos"]["1"]["inicio"], "2024-01-01")
+        self.assertEqual(data["faltantes"], [99])
+
+    def test_lista_invalida(self):
+        self.assertEqual(self.pedir([]).status_code, 400)
+        self.assertEqual(self.pedir(["x"]).status_code, 400)
+
+    def test_cuerpo_que_no_es_lista_ni_objeto(self):
+        for cuerpo in (5, "x", None):
+            res = self.client.post(reverse("casos_por_numero"), json.dumps(cuerpo),
+                                   content_type="application/json")
+            self.assertEqual(res.status_code, 400)
+            self.assertEqual(res.json(), {"error": "Debe enviar una lista de números de caso"})
+
+
+class EstadisticasTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        for nocaso, esp, inicio, fin in [(1, "E001", date(2024, 1, 5), None),
+                                         (2, "E001", date(2024, 1, 20), date(2024, 3, 1)),
+                                         (3, "E002", date(2024, 2, 1), None)]:
+            self.insertar("CASO", NOCASO=nocaso, CODCLIENTE="C001", CODESPECIALIZACION=esp,
+                          FCHINICIO=inicio, FCHFIN=fin, VALOR=1000 * nocaso)
+        estadisticas.recalcular()
+
+    def resumen(self):
+        with self.assertNumQueries(1):
+            return self.client.get(reverse("estadisticas_casos")).json()
+
+    def test_totales_por_especializacion_y_mes(self):
+        data = self.resumen()
+        self.assertEqual(data["por_especializacion"], [
+            {"esp": "E001", "activos": 1, "cerrados": 1, "valor": 3000},
+            {"esp": "E002", "activos": 1, "cerrados": 0, "valor": 3000},
+        ])
+        self.assertEqual([m["mes"] for m in data["por_mes"]], ["2024-01", "2024-02"])
+        self.assertEqual(data["total"], {"activos": 2, "cerrados": 1, "valor": 6000})
+
+    def test_guardar_caso_suma_al_resumen(self):
+        with mock.patch.object(consecutivos.casos, "confirmar", return_value=True):
+            servicios.guardar_caso(4, "C001", "E002", 500, "2024-03-10")
+            servicios.guardar_caso(5, "C001", "E002", 250, "2024-03-15")
+        data = self.resumen()
+        self.assertIn({"esp": "E002", "mes": "2024-03", "activos": 2, "cerrados": 0, "valor": 750},
+                      data["detalle"])
+        self.assertEqual(data["total"]["activos"], 4)
+
+
+class ConsultasTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        self.insertar("CASO", NOCASO=1, CODCLIENTE="C001", CODESPECIALIZACION="E001",
+                      FCHINICIO=date(2024, 1, 1), FCHFIN=None, VALOR=1000)
+        consultas.reiniciar()
+
+    def llamadas(self):
+        return {c["nombre"]: c["llamadas"] for c in consultas.estadisticas()["consultas"]}
+
+    def test_cuenta_las_llamadas_por_nombre(self):
+        self.client.get(reverse("buscar_caso_numero", args=[1]))
+        self.client.get(reverse("buscar_caso_numero", args=[1]))
+        llamadas = self.llamadas()
+        self.assertEqual(llamadas["caso_version"], 2)
+        self.assertEqual(llamadas["caso"], 2)
+        self.assertEqual(llamadas["expedientes"], 0)
+
+    def test_lista_in_rellenada_sin_filas_repetidas(self):
+        # [1, 99] se completa a 10 marcas repitiendo el 99
+        data = servicios.casos_por_numero([1, 99])
+        self.assertEqual(list(data["casos"]), [1])
+        self.assertEqual(data["faltantes"], [99])
+        self.assertEqual(self.llamadas()["casos_por_numero"], 1)
+
+
+@override_settings(CASOS_REPLICA="replica", CASOS_PRIMARIO_SEGUNDOS=7)
+class ReplicaTests(SimpleTestCase):
+
+    def atender(self, request, status=200):
+        def vista(request):
+            self.alias = replicas.alias_lectura()
+            return HttpResponse(status=status)
+        return replicas.ReplicaMiddleware(vista)(request)
+
+    def test_get_lee_de_la_replica(self):
+        res = self.atender(RequestFactory().get("/api/caso/caso/1/"))
+        self.assertEqual(self.alias, "replica")
+        self.assertNotIn(replicas.COOKIE, res.cookies)
+
+    def test_escritura_usa_el_primario_y_marca_al_cliente(self):
+        res = self.atender(RequestFactory().post("/api/caso/guardar_caso/"))
+        self.assertEqual(self.alias, "default")
+        self.assertEqual(res.cookies[replicas.COOKIE]["max-age"], 7)
+
+    def test_escritura_fallida_no_marca_al_cliente(self):
+        res = self.atender(RequestFactory().post("/api/caso/guardar_caso/"), status=400)
+        self.assertNotIn(replicas.COOKIE, res.cookies)
+
+    def test_cliente_marcado_lee_del_primario(self):
+        factory = RequestFactory()
+        factory.cookies[replicas.COOKIE] = "1"
+        self.atender(factory.get("/api/caso/caso/1/"))
+        self.assertEqual(self.alias, "default")
+        self.assertEqual(replicas.alias_lectura(), "default")
+
+
+class GuardarCasoTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        confirmar = mock.patch.object(consecutivos.casos, "confirmar", return_value=True)
+        confirmar.start()
+        self.addCleanup(confirmar.stop)
+
+    def guardar(self, nocaso, clave=None, valor=1500):
+        cabeceras = {"HTTP_IDEMPOTENCY_KEY": clave} if clave else {}
+        return self.client.post(reverse("guardar_caso"), {
+            "nocaso": nocaso, "codcliente": "C001", "especializacion": "E001",
+            "fechaInicio": "2024-12-10", "valor": valor,
+        }, content_type="application/json", **cabeceras)
+
+    def test_crea_el_caso(self):
+        res = self.guardar(7)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.json()["creado"])
+
+    def test_caso_existente_sin_clave(self):
+        self.guardar(7)
+        res = self.guardar(7)
+        self.assertEqual(res.status_code, 400)
+
+    def test_reintento_con_la_misma_clave(self):
+        self.guardar(7, clave="abc")
+        res = self.guardar(7, clave="abc")
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(res.json()["creado"])
+        self.assertEqual(estadisticas.resumen()["total"]["activos"], 1)
+
+    def test_clave_usada_con_otro_caso(self):
+        self.guardar(7, clave="abc")
+        self.assertEqual(self.guardar(8, clave="abc").status_code, 409)
+        self.assertEqual(servicios.casos_por_numero([8])["faltantes"], [8])
+
+    def insercion_falla(self, codigo):
+        """
+        caso_insertar de Oracle que falla con ORA-`codigo`.
+        """
+        def ejecutar(sql, params=()):
+            if sql.nombre == "caso_insertar":
+                raise integrity_error(ErrorOracle(SimpleNamespace(code=codigo)))
+            return db.execute(sql, params)
+        return mock.patch.object(servicios, "execute", side_effect=ejecutar)
+
+    def test_solo_la_clave_primaria_es_caso_existente(self):
+        with mock.patch.object(servicios.dialecto, "es_oracle", return_value=True):
+            with self.insercion_falla(1):
+                res = self.guardar(7)
+            self.assertEqual(res.json()["error"], "El caso ya existe. No se puede modificar.")
+            # ORA-02291: cliente o especialización inexistente
+            with self.insercion_falla(2291):
+                res = self.guardar(7)
+            self.assertEqual(res.status_code, 400)
+            self.assertEqual(res.json()["error"], "El cliente o la especialización no existen")
+            # ORA-02290 (CHECK): error del servidor, no "ya existe"
+            with self.insercion_falla(2290):
+                self.assertEqual(self.guardar(7).status_code, 500)
+
+
+class ErrorOracle(Exception):
+    """
+    Error de oracledb: el código va en args[0].code.
+    """
+
+
+class ErrorPostgresql(Exception):
+    """
+    Error de psycopg (sqlstate) o psycopg2 (pgcode).
+    """
+    def __init__(self, **codigo):
+        super().__init__("restricción violada")
+        self.__dict__.update(codigo)
+
+
+def integrity_error(causa):
+    try:
+        raise IntegrityError("restricción violada") from causa
+    except IntegrityError as e:
+        return e
+
+
+class RestriccionVioladaTests(EsquemaCasosMixin, TestCase):
+
+    def violar(self, **valores):
+        with self.assertRaises(IntegrityError) as error, transaction.atomic():
+            self.insertar("CASO_IDEMPOTENCIA", **valores)
+        return db.restriccion_violada(error.exception)
+
+    def test_sqlite(self):
+        self.insertar("CASO_IDEMPOTENCIA", CLAVE="abc", NOCASO=1)
+        self.assertEqual(self.violar(CLAVE="abc", NOCASO=2), "unica")
+        self.assertIsNone(self.violar(CLAVE="def", NOCASO=None))
+
+    def test_oracle_y_postgresql(self):
+        casos = [
+            (ErrorOracle(SimpleNamespace(code=1)), "unica"),
+            (ErrorOracle(SimpleNamespace(code=2291)), "foranea"),
+            (ErrorOracle(SimpleNamespace(code=1400)), None),
+            (ErrorPostgresql(sqlstate="23505"), "unica"),      # psycopg
+            (ErrorPostgresql(pgcode="23503"), "foranea"),      # psycopg2
+        ]
+        for causa, esperado in casos:
+            self.assertEqual(db.restriccion_violada(integrity_error(causa)), esperado)
+
+
+class AbrirCasoTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        catalogos.invalidar()
+        siguiente = mock.patch.object(consecutivos.casos, "siguiente", side_effect=[7, 8])
+        siguiente.start()
+        self.addCleanup(siguiente.stop)
+        self.insertar("CLIENTE", CODCLIENTE="C001", NOMCLIENTE="Luis",
+                      APECLIENTE="Martínez", NDOCUMENTO="123")
+        self.insertar("CASO", NOCASO=1, CODCLIENTE="C001", CODESPECIALIZACION="E001",
+                      FCHINICIO=date(2024, 1, 1), FCHFIN=date(2024, 3, 1), VALOR=1000)
+
+    def abrir(self, codcliente="C001", clave=None):
+        cabeceras = {"HTTP_IDEMPOTENCY_KEY": clave} if clave else {}
+        return self.client.post(reverse("abrir_caso"), {
+            "codcliente": codcliente, "especializacion": "E001",
+            "fechaInicio": "2024-12-10", "valor": 1500,
+        }, content_type="application/json", **cabeceras)
+
+    def test_devuelve_los_casos_del_cliente_actualizados(self):
+        data = self.abrir().json()
+        self.assertEqual(data["nocaso"], 7)
+        self.assertTrue(data["creado"])
+        self.assertEqual([c["nocaso"] for c in data["casos_cliente"]], [1, 7])
+        self.assertEqual(data["caso_activo"]["nocaso"], 7)
+
+    def test_reintento_con_la_misma_clave_no_abre_otro_caso(self):
+        self.abrir(clave="abc")
+        data = self.abrir(clave="abc").json()
+        self.assertEqual(data["nocaso"], 7)
+        self.assertFalse(data["creado"])
+        self.assertEqual([c["nocaso"] for c in data["casos_cliente"]], [1, 7])
+
+    def test_cliente_inexistente_deshace_el_caso(self):
+        self.assertEqual(self.abrir("C999").status_code, 404)
+        self.assertEqual(servicios.casos_por_numero([7])["faltantes"], [7])
+        self.assertEqual(estadisticas.resumen()["total"]["activos"], 0)
+
+
+@override_settings(CASOS_CONSECUTIVO_BLOQUE=3)
+class AsignadorCasosTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        self.asignador = consecutivos.AsignadorCasos()
+
+    def test_un_viaje_por_bloque(self):
+        # UPDATE + SELECT de CONSECUTIVO, entre el SAVEPOINT y el RELEASE del atomic()
+        with self.assertNumQueries(4):
+            self.assertEqual(self.asignador.siguiente(), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual([self.asignador.siguiente(), self.asignador.siguiente()], [2, 3])
+        self.assertEqual(self.asignador.tope(), 3)
+
+    def test_el_bloque_agotado_pasa_al_siguiente(self):
+        numeros = [self.asignador.siguiente() for _ in range(4)]
+        self.assertEqual(numeros, [1, 2, 3, 4])
+        self.assertEqual(self.asignador.tope(), 6)
+        # Solo se recuerdan los números del bloque en curso
+        self.assertEqual(self.asignador._entregados, {4})
+
+    def test_dos_procesos_no_repiten_numeros(self):
+        otro = consecutivos.AsignadorCasos()
+        numeros = [self.asignador.siguiente(), otro.siguiente(),
+                   self.asignador.siguiente(), otro.siguiente()]
+        self.assertEqual(numeros, [1, 4, 2, 5])
+
+    def test_reservar_no_usa_el_bloque(self):
+        self.assertEqual(self.asignador.reservar(5), [1, 2, 3, 4, 5])
+        self.assertEqual(self.asignador.reservar(0), [])
+        self.assertEqual(self.asignador.siguiente(), 6)
+
+    def test_confirmar(self):
+        self.asignador.siguiente()
+        with self.assertNumQueries(0):
+            self.assertTrue(self.asignador.confirmar(1))
+        # Entregado por otro proceso: se compara con tope()
+        otro = consecutivos.AsignadorCasos()
+        nocaso = otro.siguiente()
+        with self.assertNumQueries(1):
+            self.assertTrue(self.asignador.confirmar(str(nocaso)))
+        self.assertEqual(self.asignador.tope(), 6)
+        self.assertFalse(self.asignador.confirmar(7))
+        for invalido in (0, -1, "x", None):
+            self.assertFalse(self.asignador.confirmar(invalido))
+
+    def test_confirmar_numero_de_un_bloque_anterior(self):
+        for _ in range(4):
+            self.asignador.siguiente()
+        self.assertTrue(self.asignador.confirmar(1))
+
+    def test_confirmar_despues_de_un_fork(self):
+        self.asignador.siguiente()
+        # Otro pid: lo entregado por el padre no se toma de memoria
+        self.asignador._pid = -1
+        with self.assertNumQueries(1):
+            self.assertTrue(self.asignador.confirmar(1))
+        self.assertEqual(self.asignador._entregados, set())
+
+    def test_tramos_de_la_secuencia(self):
+        self.assertEqual(consecutivos.tramos([1, 2, 3]), [(1, 3)])
+        # NEXTVAL intercalado con otra sesión: el bloque sale partido
+        self.assertEqual(consecutivos.tramos([5, 6, 9, 10, 12]), [(5, 6), (9, 10), (12, 12)])
+        self.assertEqual(consecutivos.tramos([]), [])
+
+
+class InsertarExpedienteTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        for nocaso in (1, 2):
+            self.insertar("CASO", NOCASO=nocaso, CODCLIENTE="C001", CODESPECIALIZACION="E001",
+                          FCHINICIO=date(2024, 1, 1), VALOR=1000)
+        # Expedientes de antes de EXPEDIENTE_CONSEC: el caso no tiene contador
+        for consec in (1, 2):
+            self.insertar("EXPEDIENTE", NOCASO=1, CONSECEXPE=consec, CODESPECIALIZACION="E001",
+                          IDTIPOCASO2=1, CODLUGAR="L1", CEDULA="99", FCHETAPA=date(2024, 1, 1))
+
+    def insertar_expediente(self, nocaso):
+        return consecutivos.insertar_expediente(nocaso, 1, "L1", "99")
+
+    def test_consecutivos_sin_repetir(self):
+        self.assertEqual([self.insertar_expediente(1) for _ in range(3)], [3, 4, 5])
+        self.assertEqual(self.insertar_expediente(2), 1)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT CONSECEXPE, CODESPECIALIZACION FROM EXPEDIENTE "
+                           "WHERE NOCASO = 1 ORDER BY CONSECEXPE")
+            self.assertEqual(cursor.fetchall(), [(n, "E001") for n in range(1, 6)])
+        self.assertEqual(servicios.version_caso(1), 4)
+
+    def test_insercion_deshecha_no_consume_el_consecutivo(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.insertar_expediente(1)
+            raise RuntimeError
+        self.assertEqual(self.insertar_expediente(1), 3)
+        self.assertEqual(servicios.version_caso(1), 2)
+
+    def sentencias(self, motor):
+        """
+        Nombres de las consultas que ejecuta insertar_expediente en `motor`.
+        """
+        nombres = []
+
+        def anotar(resultado):
+            def ejecutar(sql, params):
+                nombres.append(sql.nombre)
+                return resultado
+            return ejecutar
+
+        with mock.patch.object(consecutivos.dialecto, "motor", return_value=motor), \
+                mock.patch.object(consecutivos.dialecto, "es_oracle", return_value=motor == "oracle"), \
+                mock.patch.object(consecutivos, "execute", side_effect=anotar(None)), \
+                mock.patch.object(consecutivos, "single_result", side_effect=anotar((7,))), \
+                mock.patch.object(consecutivos._Salida, "valor", return_value=7):
+            self.assertEqual(self.insertar_expediente(1), 7)
+        return nombres
+
+    def test_sentencias_por_motor(self):
+        self.assertEqual(self.sentencias("oracle"), ["expediente_insertar_oracle"])
+        self.assertEqual(self.sentencias("postgresql"), ["expediente_insertar_postgresql"])
+        self.assertEqual(self.sentencias("sqlite"),
+                         ["expediente_version", "expediente_contador", "expediente_insertar"])
+
+    def test_sql_de_cada_motor(self):
+        oracle = consultas.consulta("expediente_insertar_oracle")
+        self.assertIn("RETURNING ULTIMO INTO v_consec", oracle)
+        self.assertIn("DUP_VAL_ON_INDEX", oracle)
+        postgresql = consultas.consulta("expediente_insertar_postgresql")
+        self.assertTrue(postgresql.startswith("WITH v AS ("))
+        self.assertIn("ON CONFLICT (NOCASO) DO UPDATE", postgresql)
+        self.assertTrue(postgresql.rstrip().endswith("FROM c RETURNING CONSECEXPE"))
+
+
+@override_settings(CASOS_IMPORTAR_LOTE=2)
+class ImportarCasosTests(EsquemaCasosMixin, TestCase):
+
+    def caso(self, **cambios):
+        return {"codcliente": "C001", "especializacion": "E001",
+                "fechaInicio": "2024-12-10", "valor": 1500, **cambios}
+
+    def importar(self, cuerpo, content_type):
+        res = self.client.post(reverse("importar_casos"), cuerpo, content_type=content_type)
+        self.assertEqual(res.status_code, 200)
+        return res.json()
+
+    def test_lista_json(self):
+        self.insertar("CASO", NOCASO=1, CODCLIENTE="C001", CODESPECIALIZACION="E001",
+                      FCHINICIO=date(2024, 1, 1), VALOR=1000)
+        consecutivos.casos.reservar(1)
+        data = self.importar([self.caso(), self.caso(nocaso=1), self.caso(valor=0)],
+                             "application/json")
+        self.assertEqual((data["recibidos"], data["insertados"]), (3, 1))
+        self.assertEqual(data["asignados"], [{"fila": 1, "nocaso": 2}])
+        self.assertEqual([(e["fila"], e["nocaso"]) for e in data["errores"]], [(2, 1), (3, None)])
+        self.assertEqual(servicios.casos_por_numero([2])["faltantes"], [])
+
+    def test_ndjson_con_linea_invalida(self):
+        lineas = [json.dumps(self.caso()), "", json.dumps(self.caso()), "{no es json",
+                  "", json.dumps(self.caso())]
+        data = self.importar("\n".join(lineas), "application/x-ndjson")
+        # Los lotes anteriores a la línea inválida quedan y la carga sigue
+        self.assertEqual((data["recibidos"], data["insertados"]), (4, 3))
+        self.assertEqual([a["fila"] for a in data["asignados"]], [1, 2, 4])
+        [error] = data["errores"]
+        # Las líneas en blanco no cuentan, ni en "fila" ni en el mensaje
+        self.assertEqual(error["fila"], 3)
+        self.assertTrue(error["error"].startswith("Fila 3: JSON inválido"))
+        self.assertEqual(estadisticas.resumen()["total"]["activos"], 3)
+
+    def test_cuerpo_que_no_es_lista(self):
+        res = self.client.post(reverse("importar_casos"), {"nocaso": 1},
+                               content_type="application/json")
+        self.assertEqual(res.status_code, 400)
+
+
+@override_settings(CASOS_EXPORTAR_ARRAYSIZE=2)
+class ExportarCasosTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        for nocaso in (1, 2, 3):
+            self.insertar("CASO", NOCASO=nocaso, CODCLIENTE="C001", CODESPECIALIZACION="E001",
+                          FCHINICIO=date(2024, nocaso, 1), VALOR=1000)
+        for consec in (1, 2):
+            self.insertar("EXPEDIENTE", NOCASO=1, CONSECEXPE=consec, CODESPECIALIZACION="E001",
+                          IDTIPOCASO2=1, CODLUGAR="L1", CEDULA="99", FCHETAPA=date(2024, 2, consec))
+
+    def exportar(self, formato):
+        return self.client.get(reverse("exportar_casos"), {"formato": formato})
+
+    def test_csv_por_bloques(self):
+        res = self.exportar("csv")
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(res["Content-Disposition"], 'attachment; filename="casos.csv"')
+        partes = [p.decode() for p in res.streaming_content]
+        # Encabezado y luego un bloque de CASOS_EXPORTAR_ARRAYSIZE filas por parte
+        self.assertEqual(len(partes), 3)
+        self.assertEqual(partes[0], ",".join(exportacion.COLUMNAS) + "\r\n")
+        self.assertEqual(partes[1].splitlines(), [
+            "1,C001,E001,2024-01-01,,1000,1,1,L1,99,2024-02-01",
+            "1,C001,E001,2024-01-01,,1000,2,1,L1,99,2024-02-02",
+        ])
+        self.assertEqual(partes[2].splitlines(), [
+            "2,C001,E001,2024-02-01,,1000,,,,,", "3,C001,E001,2024-03-01,,1000,,,,,",
+        ])
+
+    def test_ndjson(self):
+        res = self.exportar("ndjson")
+        self.assertEqual(res["Content-Type"], "application/x-ndjson; charset=utf-8")
+        filas = [json.loads(l) for l in b"".join(res.streaming_content).splitlines()]
+        self.assertEqual([(f["nocaso"], f["consec"]) for f in filas],
+                         [(1, 1), (1, 2), (2, None), (3, None)])
+
+    async def test_asgi_entrega_un_iterador_async(self):
+        res = await self.async_client.get(reverse("exportar_casos"), {"formato": "ndjson"})
+        self.assertTrue(res.is_async)
+        partes = [p async for p in res.streaming_content]
+        self.assertEqual(len(partes), 2)
+        self.assertEqual(json.loads(partes[1].splitlines()[-1])["nocaso"], 3)
+
+    def test_formato_invalido(self):
+        self.assertEqual(self.exportar("xml").status_code, 400)
+
+
+class EventosTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        bus = mock.patch.object(eventos, "bus", eventos.BusEventos(hilo=False))
+        bus.start()
+        self.addCleanup(bus.stop)
+        confirmar = mock.patch.object(consecutivos.casos, "confirmar", return_value=True)
+        confirmar.start()
+        self.addCleanup(confirmar.stop)
+
+    def guardar(self, nocaso, clave=None):
+        return servicios.guardar_caso(nocaso, "C001", "E001", 1500, "2024-12-10", clave)
+
+    def publicados(self):
+        return [(e.tipo, e.datos["nocaso"]) for e in eventos.bus.desde(0)]
+
+    def evento(self, id_, nocaso):
+        self.insertar("CASO_EVENTO", ID=id_, TIPO="caso", DATOS=json.dumps({"nocaso": nocaso}))
+
+    def test_se_guarda_con_el_caso(self):
+        eventos.bus.sondear()
+        self.guardar(7)
+        self.assertEqual(self.publicados(), [("caso", 7)])
+
+    def test_sin_oyentes_no_se_guarda(self):
+        self.guardar(7)
+        self.assertEqual(self.publicados(), [])
+
+    @override_settings(CASOS_EVENTOS=False)
+    def test_desactivados(self):
+        eventos.bus.sondear()
+        self.guardar(7)
+        self.assertEqual(self.publicados(), [])
+
+    def test_guardado_deshecho_no_publica(self):
+        eventos.bus.sondear()
+        self.guardar(7, clave="abc")
+        # 409: se deshace el caso 8 y su evento
+        with self.assertRaises(servicios.ErrorServicio):
+            self.guardar(8, clave="abc")
+        self.guardar(9)
+        self.assertEqual(self.publicados(), [("caso", 7), ("caso", 9)])
+
+    def test_otro_proceso_recibe_los_eventos(self):
+        otro = eventos.BusEventos(hilo=False)
+        otro.sondear()
+        self.guardar(7)
+        self.guardar(8)
+        self.assertEqual([e.datos["nocaso"] for e in otro.sondear()], [7, 8])
+        self.assertEqual(otro.sondear(), [])
+
+    def test_evento_confirmado_fuera_de_orden(self):
+        bus = eventos.bus
+        bus.sondear()
+        self.evento(2, 8)
+        self.assertEqual([e.id for e in bus.sondear()], [2])
+        # El 1 se confirmó después que el 2: llega en el siguiente sondeo
+        self.evento(1, 7)
+        self.assertEqual([e.id for e in bus.sondear()], [1])
+        self.assertEqual(bus.sondear(), [])
+        self.assertEqual(bus._ultimo, 2)
+
+    def test_hueco_se_descarta_despues_de_la_espera(self):
+        bus = eventos.bus
+        bus.sondear()
+        self.evento(2, 8)
+        bus.sondear()
+        self.assertEqual(bus._ultimo, 0)
+        with override_settings(CASOS_EVENTOS_ESPERA=0):
+            bus.sondear()
+        self.assertEqual(bus._ultimo, 2)
+
+    @override_settings(CASOS_EVENTOS_HISTORIA=1)
+    def test_borra_los_eventos_viejos(self):
+        bus = eventos.bus
+        bus.sondear()
+        for id_ in range(1, 6):
+            self.evento(id_, id_)
+        bus._borrado = -60
+        bus.sondear()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT ID FROM CASO_EVENTO ORDER BY ID")
+            self.assertEqual(cursor.fetchall(), [(3,), (4,), (5,)])
+
+    def test_expediente_lleva_el_cliente(self):
+        eventos.bus.sondear()
+        self.guardar(7)
+        servicios.guardar_expediente(7, 1, "L1", "99")
+        evento = eventos.bus.desde(0)[-1]
+        self.assertEqual(evento.tipo, "expediente")
+        self.assertEqual((evento.datos["codcliente"], evento.datos["consec"]), ("C001", 1))
+        self.assertTrue(eventos.Filtro(cliente="C001").acepta(evento))
+        self.assertFalse(eventos.Filtro(cliente="C002").acepta(evento))
+
+    def test_filtro(self):
+        evento = eventos.Evento(1, "caso", {"nocaso": 7, "codcliente": "C001"})
+        self.assertTrue(eventos.Filtro().acepta(evento))
+        self.assertTrue(eventos.Filtro(nocasos=frozenset({7})).acepta(evento))
+        self.assertFalse(eventos.Filtro(nocasos=frozenset({8})).acepta(evento))
+        # Cliente o casos: basta con uno
+        self.assertTrue(eventos.Filtro("C002", frozenset({7})).acepta(evento))
+        self.assertFalse(eventos.Filtro("C002", frozenset({8})).acepta(evento))
+
+    def test_reconexion_con_eventos_borrados(self):
+        for id_ in (1, 2, 3):
+            self.evento(id_, id_)
+        self.assertEqual(len(eventos.bus.desde(1)), 2)
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM CASO_EVENTO WHERE ID < 3")
+        self.assertIsNone(eventos.bus.desde(1))
+        self.assertIsNone(eventos.bus.desde(99))
+        with override_settings(CASOS_EVENTOS_HISTORIA=1):
+            self.assertEqual(len(eventos.bus.desde(0)), 1)
+
+    async def test_flujo_filtrado_por_cliente(self):
+        flujo = eventos.flujo(eventos.Filtro(cliente="C001"))
+        await anext(flujo)
+        await sync_to_async(eventos.bus.sondear)()
+        await sync_to_async(eventos.publicar)("caso", nocaso=8, codcliente="C002")
+        await sync_to_async(eventos.publicar)("caso", nocaso=7, codcliente="C001")
+        await sync_to_async(eventos.bus.sondear)()
+        texto = await asyncio.wait_for(anext(flujo), 1)
+        await flujo.aclose()
+        self.assertTrue(texto.startswith("id: 2\nevent: caso\n"))
+        self.assertIn('"nocaso":7', texto)
+
+    @override_settings(CASOS_EVENTOS_PING=0.05)
+    async def test_reconexion_con_eventos_perdidos(self):
+        await sync_to_async(eventos.bus.sondear)()
+        for nocaso in (7, 8):
+            await sync_to_async(eventos.publicar)("caso", nocaso=nocaso, codcliente="C001")
+        flujo = eventos.flujo(eventos.Filtro(), ultimo=1)
+        await anext(flujo)
+        self.assertTrue((await anext(flujo)).startswith("id: 2\n"))
+        # El mismo evento llega luego por el sondeo: no se repite
+        await sync_to_async(eventos.bus.sondear)()
+        self.assertEqual(await asyncio.wait_for(anext(flujo), 1), ": ping\n\n")
+        await flujo.aclose()
+
+        flujo = eventos.flujo(eventos.Filtro(), ultimo=99)
+        await anext(flujo)
+        self.assertEqual(await anext(flujo), eventos.REINICIAR)
+        await flujo.aclose()
+
+
+class EsquemaTests(SimpleTestCase):
+
+    def nombres(self, motor):
+        with mock.patch.object(connection, "vendor", motor):
+            return [r.name for r in esquema.scripts()]
+
+    def test_script_propio_del_motor(self):
+        self.assertIn("080_eventos_caso.sql", self.nombres("sqlite"))
+        self.assertNotIn("080_eventos_caso.postgresql.sql", self.nombres("sqlite"))
+        postgresql = self.nombres("postgresql")
+        self.assertIn("080_eventos_caso.postgresql.sql", postgresql)
+        self.assertNotIn("080_eventos_caso.sql", postgresql)
+        self.assertEqual(len(postgresql), len(self.nombres("sqlite")))
+
+    def test_bloques_terminados_en_barra(self):
+        ruta = esquema.DIRECTORIO / "035_normalizacion_clientes.postgresql.sql"
+        funcion, trigger, relleno = esquema.sentencias(ruta)
+        self.assertTrue(funcion.startswith("CREATE OR REPLACE FUNCTION CLIENTE_NORM()"))
+        self.assertIn("RETURN NEW;", funcion)
+        self.assertTrue(funcion.endswith("$$ LANGUAGE plpgsql;"))
+        self.assertTrue(trigger.startswith("CREATE TRIGGER CLIENTE_NORM_TRG"))
+        self.assertEqual(relleno, "UPDATE CLIENTE SET NOMCLIENTE = NOMCLIENTE")
+
+
+class PlantillaClienteTests(EsquemaCasosMixin, TestCase):
+
+    def setUp(self):
+        catalogos.invalidar()
+        self.insertar("ESPECIALIZACION", CODESPECIALIZACION="E001", NOMESPECIALIZACION="Civil")
+        catalogos.cache.obtener("especializaciones")
+
+    def test_estado_inicial_para_el_javascript(self):
+        res = self.client.get(reverse("cliente_template"))
+        self.assertContains(res, 'id="cliente-inicial"')
+        self.assertContains(res, reverse("abrir_caso"))
+
+    def test_crear_caso_no_consulta_la_base_de_datos(self):
+        with self.assertNumQueries(0):
+            res = self.client.post(reverse("cliente_template"), {
+                "accion": "crear_caso", "codcliente": "C001",
+                "nomcliente": "Luis", "apellcliente": "Martínez", "doccliente": "123",
+            })
+        self.assertContains(res, 'name="clave" value="')
+        self.assertEqual(res.context["caso_nuevo"]["nocaso"], None)
+
+
+class RenderizadorTests(SimpleTestCase):
+
+    def test_filas_del_mapeador_en_json(self):
+        mapeador = Mapeador("nocaso", None, ("inicio", fecha), "valor", ("total", monto), "fin")
+        filas = mapeador.filas([
+            (7, "ignorada", datetime(2024, 12, 10, 8, 30), Decimal("1500.50"), Decimal("2"), date(2025, 1, 31)),
+        ])
+        datos = {"casos": filas, "por_numero": {7: filas[0]}}
+
+        texto = renderers.JSONRapidoRenderer().render(datos, "application/json")
+        # DRF convierte Decimal a número; las claves int pasan a str
+        self.assertEqual(json.loads(texto), {
+            "casos": [{"nocaso": 7, "inicio": "2024-12-10", "valor": 1500.5,
+                       "total": 2.0, "fin": "2025-01-31"}],
+            "por_numero": {"7": {"nocaso": 7, "inicio": "2024-12-10", "valor": 1500.5,
+                                 "total": 2.0, "fin": "2025-01-31"}},
+        })
+        self.assertEqual(renderers.a_json(datos), texto)
+
+    def test_mapeador_sin_conversiones(self):
+        mapeador = Mapeador("cod", "nom")
+        self.assertEqual(mapeador.filas([("C1", "Luis")]), [{"cod": "C1", "nom": "Luis"}])
+        self.assertEqual(mapeador.claves, ["cod", "nom"])
+
+
+class EstadoPoolTests(SimpleTestCase):
+
+    class ConexionSinPool:
+        is_pool = True
+
+        def pool_creado(self):
+            return None
+
+        @property
+        def pool(self):
+            raise AssertionError("estado() no debe crear el pool")
+
+    def test_no_crea_el_pool(self):
+        with mock.patch.object(pool, "connections", {"default": self.ConexionSinPool()}):
+            estado = pool.estado()
+        self.assertFalse(estado["default"]["creado"])
+        self.assertEqual(estado["default"]["espera"]["adquisiciones"], 0)
@@ -1,49 +1,135 @@
-from rest_framework.decorators import api_view
+from functools import wraps
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+from rest_framework.decorators import api_view, parser_classes
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
-from django.db import connection
-from datetime import datetime
+
+from . import catalogos, consultas, exportacion, importacion, pool, servicios
+from .parsers import NDJSONParser
+from .replicas import alias_lectura, solo_lectura
+from .servicios import ErrorServicio
 
 # ==============================
 # UTILIDADES
 # ==============================
 
-def single_result(query, params=[]):
-    with connection.cursor() as cursor:
-        cursor.execute(query, params)
-        return cursor.fetchone()
+def responder_errores(vista):
+    """
+    Convierte ErrorServicio en la respuesta {"error": ...} de la API.
+    """
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        try:
+            return vista(request, *args, **kwargs)
+        except ErrorServicio as e:
+            return Response({"error": e.mensaje}, status=e.status)
+    return envoltura
+
+
+def parametro_limite(request, defecto=20, maximo=100):
+    try:
+        limite = int(request.GET.get("limit", defecto))
+    except ValueError:
+        raise ErrorServicio("limit debe ser un número", 400)
+    return max(1, min(limite, maximo))
+
+
+def parametros_pagina(request, defecto=100, maximo=1000):
+    """
+    (after, limit) para paginación por clave. Si el cliente no envía
+    ninguno de los dos se devuelve (None, None) y la lista va completa.
+    """
+    if "after" not in request.GET and "limit" not in request.GET:
+        return None, None
+    try:
+        despues = int(request.GET["after"]) if request.GET.get("after") else None
+    except ValueError:
+        raise ErrorServicio("after debe ser un número", 400)
+    return despues, parametro_limite(request, defecto, maximo)
+
 
-def many_results(query, params=[]):
-    with connection.cursor() as cursor:
-        cursor.execute(query, params)
-        return cursor.fetchall()
+def solo_interno(vista):
+    """
+    Endpoints de diagnóstico: solo para las IPs de INTERNAL_IPS.
+    """
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        if request.META.get("REMOTE_ADDR") not in getattr(settings, "INTERNAL_IPS", []):
+            raise Http404
+        return vista(request, *args, **kwargs)
+    return envoltura
 
-def execute(query, params=[]):
-    with connection.cursor() as cursor:
-        cursor.execute(query, params)
+
+def catalogo_http(nombre):
+    """
+    ETag y Cache-Control para los endpoints de catálogos: si el cliente ya
+    tiene la versión vigente se responde 304 sin tocar la base de datos.
+    """
+    def etag(request, *args, **kwargs):
+        return catalogos.cache.obtener(nombre).etag
+
+    def decorador(vista):
+        vista = condition(etag_func=etag)(vista)
+        return cache_control(
+            public=True,
+            max_age=getattr(settings, "CASOS_CATALOGOS_MAX_AGE", 60),
+        )(vista)
+    return decorador
+
+def etag_de_caso(request, nocaso, version):
+    """
+    ETag de una lectura del caso. Cada página (after/limit) tiene el suyo;
+    None si los parámetros de página no son válidos (la vista dará 400).
+    """
+    try:
+        despues, limite = parametros_pagina(request)
+    except ErrorServicio:
+        return None
+    pagina = "" if limite is None else f"-p{despues or 0}-{limite}"
+    return f'"caso-{nocaso}-v{version}{pagina}"'
+
+
+def etag_caso(request, nocaso, *args, **kwargs):
+    version = servicios.version_caso(nocaso)
+    return etag_de_caso(request, nocaso, version) if version is not None else None
+
+
+def caso_http(vista):
+    """
+    ETag de las lecturas de un caso a partir de CASO.VERSION: si no cambió
+    se responde 304 con una consulta por clave primaria, sin leer el caso
+    ni sus expedientes. no-cache obliga al navegador a revalidar siempre.
+    """
+    vista = condition(etag_func=etag_caso)(vista)
+    return cache_control(private=True, no_cache=True)(vista)
 
 # ==============================
 # API GESTIÓN CASO
 # ==============================
 
+@catalogo_http("especializaciones")
 @api_view(['GET'])
 def get_especializaciones(request):
     """
     Obtener todas las especializaciones disponibles
     """
-    esp_rows = many_results("""
-        SELECT CODESPECIALIZACION, NOMESPECIALIZACION
-        FROM ESPECIALIZACION
-        ORDER BY CODESPECIALIZACION
-    """)
-    return Response([{"codigo": e[0], "nombre": e[1]} for e in esp_rows])
+    return Response(servicios.listar_especializaciones())
 
 
+@solo_lectura
 @api_view(['GET', 'POST'])
+@responder_errores
 def buscar_cliente(request):
     """
     Buscar cliente por nombre y apellido.
     GET: ?nombre=Luis&apellido=Martínez
     POST: {"nomcliente": "Luis", "apellcliente": "Martínez"}
+    Casos paginados (opcional): ?after=<NOCASO>&limit=100
     """
     if request.method == 'POST':
         nom = request.data.get("nomcliente", "").strip()
@@ -52,78 +138,33 @@ def buscar_cliente(request):
         nom = request.GET.get("nombre", "").strip()
         ape = request.GET.get("apellido", "").strip()
 
-    if not (nom and ape):
-        return Response({"error": "Debe ingresar nombre y apellido"}, status=400)
-
-    cliente = single_result("""
-        SELECT CODCLIENTE, NOMCLIENTE, APECLIENTE, NDOCUMENTO
-        FROM CLIENTE
-        WHERE UPPER(NOMCLIENTE) = UPPER(%s)
-          AND UPPER(APECLIENTE) = UPPER(%s)
-    """, [nom, ape])
-
-    if not cliente:
-        return Response({"error": "Cliente no encontrado"}, status=404)
-
-    # Casos del cliente (incluir fecha fin para saber si está cerrado)
-    casos = many_results("""
-        SELECT NOCASO, CODESPECIALIZACION, FCHINICIO, VALOR, FCHFIN
-        FROM CASO
-        WHERE CODCLIENTE = %s
-        ORDER BY NOCASO
-    """, [cliente[0]])
-
-    casos_cliente = [
-        {
-            "nocaso": c[0], 
-            "especializacion": c[1], 
-            "inicio": c[2].strftime("%Y-%m-%d") if c[2] else None, 
-            "valor": float(c[3]) if c[3] else 0,
-            "fin": c[4].strftime("%Y-%m-%d") if c[4] else None
-        }
-        for c in casos
-    ]
-
-    # Último caso activo (sin fecha fin)
-    caso_activo = single_result("""
-        SELECT NOCASO, CODESPECIALIZACION, FCHINICIO, VALOR
-        FROM CASO
-        WHERE CODCLIENTE = %s AND FCHFIN IS NULL
-        ORDER BY NOCASO DESC
-    """, [cliente[0]])
-
-    caso = None
-    if caso_activo:
-        caso = {
-            "nocaso": caso_activo[0],
-            "esp": caso_activo[1],
-            "inicio": caso_activo[2].strftime("%Y-%m-%d") if caso_activo[2] else None,
-            "valor": float(caso_activo[3]) if caso_activo[3] else 0,
-            "es_nuevo": False
-        }
-
-    # Especializaciones
-    esp_rows = many_results("""
-        SELECT CODESPECIALIZACION, NOMESPECIALIZACION
-        FROM ESPECIALIZACION
-        ORDER BY CODESPECIALIZACION
-    """)
-    especializaciones = [{"codigo": e[0], "nombre": e[1]} for e in esp_rows]
-
-    return Response({
-        "cliente": {
-            "cod": cliente[0],
-            "nom": cliente[1],
-            "ape": cliente[2],
-            "doc": cliente[3]
-        },
-        "casos_cliente": casos_cliente,
-        "caso_activo": caso,
-        "especializaciones": especializaciones
-    })
+    despues, limite = parametros_pagina(request)
+    return Response(servicios.buscar_cliente(nom, ape, despues, limite))
+
+
+@api_view(['GET'])
+@responder_errores
+def buscar_clientes(request):
+    """
+    Buscar clientes por prefijo de nombre/apellido o por documento.
+    Sin distinguir mayúsculas ni tildes, pero solo desde el inicio del
+    campo: "mart" encuentra "Martínez", "tinez" no, y "Luis" no encuentra
+    a "José Luis".
+    GET: ?apellido=mart&nombre=lu&limit=20
+    GET: ?doc=123456789
+    Página siguiente: ?...&after=<siguiente>
+    """
+    return Response(servicios.buscar_clientes(
+        nombre=request.GET.get("nombre", "").strip(),
+        apellido=request.GET.get("apellido", "").strip(),
+        doc=request.GET.get("doc", "").strip(),
+        limite=parametro_limite(request),
+        despues=request.GET.get("after"),
+    ))
 
 
 @api_view(['POST'])
+@responder_errores
 def crear_caso(request):
     """
     Crear un nuevo caso para un cliente (genera consecutivo).
@@ -135,36 +176,16 @@ def crear_caso(request):
         "ndocumento": "123456789"
     }
     """
-    codcli = request.data.get("codcliente", "").strip()
-    nom = request.data.get("nomcliente", "").strip()
-    ape = request.data.get("apellcliente", "").strip()
-    doc = request.data.get("ndocumento", "").strip()
-
-    if not codcli:
-        return Response({"error": "Debe seleccionar un cliente"}, status=400)
-
-    # Consecutivo funcional: max(nocaso) + 1
-    ultimo = single_result("""
-        SELECT NVL(MAX(NOCASO),0)
-        FROM CASO
-    """)[0]
-
-    nuevo_consec = ultimo + 1
-    fecha_actual = datetime.now().strftime("%Y-%m-%d")
-
-    return Response({
-        "nocaso": nuevo_consec,
-        "fecha_inicio": fecha_actual,
-        "cliente": {
-            "cod": codcli,
-            "nom": nom,
-            "ape": ape,
-            "doc": doc
-        }
-    })
+    return Response(servicios.crear_caso(
+        request.data.get("codcliente", "").strip(),
+        request.data.get("nomcliente", "").strip(),
+        request.data.get("apellcliente", "").strip(),
+        request.data.get("ndocumento", "").strip(),
+    ))
 
 
 @api_view(['POST'])
+@responder_errores
 def guardar_caso(request):
     """
     Guardar un nuevo caso en la base de datos.
@@ -176,151 +197,176 @@ def guardar_caso(request):
         "fechaInicio": "2024-12-10",
         "valor": 1500
     }
+    Cabecera opcional Idempotency-Key: un reintento con la misma clave
+    responde como la primera vez ("creado": false).
     """
-    nocaso = request.data.get("nocaso")
-    codcli = request.data.get("codcliente")
-    esp = request.data.get("especializacion")
-    valor = request.data.get("valor")
-    fecha_inicio = request.data.get("fechaInicio")
+    return Response(servicios.guardar_caso(
+        request.data.get("nocaso"),
+        request.data.get("codcliente"),
+        request.data.get("especializacion"),
+        request.data.get("valor"),
+        request.data.get("fechaInicio"),
+        request.headers.get("Idempotency-Key"),
+    ))
 
-    if not (nocaso and codcli and esp and valor and fecha_inicio):
-        return Response({"error": "Todos los campos son obligatorios"}, status=400)
 
-    try:
-        # Verificar si el caso ya existe
-        caso_existe = single_result("""
-            SELECT NOCASO FROM CASO WHERE NOCASO = %s
-        """, [nocaso])
+@api_view(['POST'])
+@responder_errores
+def abrir_caso(request):
+    """
+    Asignar número, guardar el caso y devolver los casos del cliente en
+    una sola petición (crear_caso + guardar_caso + buscar_cliente).
+    Body JSON:
+    {
+        "codcliente": "C002",
+        "especializacion": "E001",
+        "fechaInicio": "2024-12-10",
+        "valor": 1500
+    }
+    Cabecera opcional Idempotency-Key, como en guardar_caso.
+    """
+    return Response(servicios.abrir_caso(
+        request.data.get("codcliente"),
+        request.data.get("especializacion"),
+        request.data.get("valor"),
+        request.data.get("fechaInicio"),
+        request.headers.get("Idempotency-Key"),
+    ))
 
-        if caso_existe:
-            return Response({"error": "El caso ya existe. No se puede modificar."}, status=400)
 
-        # Insertar nuevo caso
-        execute("""
-            INSERT INTO CASO (NOCASO, CODCLIENTE, CODESPECIALIZACION, FCHINICIO, FCHFIN, VALOR)
-            VALUES (%s, %s, %s, TO_DATE(%s,'YYYY-MM-DD'), NULL, %s)
-        """, [nocaso, codcli, esp, fecha_inicio, valor])
+@api_view(['POST'])
+@parser_classes([JSONParser, NDJSONParser])
+@responder_errores
+def importar_casos(request):
+    """
+    Carga masiva de casos.
+    Body JSON: [{"nocaso": 5, "codcliente": "C002", "especializacion": "E001",
+                 "fechaInicio": "2024-12-10", "valor": 1500}, ...]
+    o NDJSON (Content-Type: application/x-ndjson), un caso por línea; una
+    línea con JSON inválido se informa en "errores" como cualquier fila.
+    "nocaso" es opcional; los asignados se devuelven en "asignados".
+    """
+    datos = request.data
+    if isinstance(datos, dict):
+        datos = datos.get("casos")
+    if datos is None or isinstance(datos, (dict, str)):
+        raise ErrorServicio("Debe enviar una lista de casos", 400)
+
+    return Response(importacion.importar_casos(datos))
 
-        return Response({"mensaje": "Caso creado correctamente"})
-    
-    except Exception as e:
-        return Response({"error": f"Error al guardar: {str(e)}"}, status=500)
 
+@require_GET
+def exportar_casos(request):
+    """
+    Exportar casos con sus expedientes, una fila por expediente.
+    GET: ?formato=csv|ndjson&desde=2024-01-01&hasta=2024-12-31&esp=E001
+    La respuesta se genera en streaming (no es una vista DRF); con ASGI el
+    contenido es un iterador async para que Django no lo junte completo.
+    """
+    formato = request.GET.get("formato", "csv")
+    if formato not in exportacion.FORMATOS:
+        return JsonResponse({"error": "formato debe ser csv o ndjson"}, status=400)
 
+    try:
+        sql, params = exportacion.consulta_exportacion(
+            request.GET.get("desde"), request.GET.get("hasta"), request.GET.get("esp"),
+        )
+    except ErrorServicio as e:
+        return JsonResponse({"error": e.mensaje}, status=e.status)
+
+    generar, content_type = exportacion.FORMATOS[formato]
+    contenido = generar(exportacion.bloques(sql, params, alias_lectura()))
+    if isinstance(request, ASGIRequest):
+        contenido = exportacion.en_async(contenido)
+    respuesta = StreamingHttpResponse(contenido, content_type=content_type)
+    respuesta["Content-Disposition"] = f'attachment; filename="casos.{formato}"'
+    return respuesta
+
+
+@caso_http
 @api_view(['GET'])
+@responder_errores
 def buscar_caso_por_numero(request, nocaso):
     """
     Buscar un caso específico por su número.
     """
-    caso = single_result("""
-        SELECT NOCASO, CODCLIENTE, CODESPECIALIZACION, FCHINICIO, FCHFIN, VALOR
-        FROM CASO
-        WHERE NOCASO = %s
-    """, [nocaso])
+    return Response(servicios.caso_por_numero(nocaso))
+
 
-    if not caso:
-        return Response({"error": "Caso no encontrado"}, status=404)
+@solo_lectura
+@api_view(['POST'])
+@responder_errores
+def casos_por_numero(request):
+    """
+    Varios casos en una sola petición.
+    Body JSON: {"nocasos": [5, 7, 9]} o directamente [5, 7, 9]
+    Respuesta: {"casos": {"5": {...}, "9": {...}}, "faltantes": [7]}
+    """
+    datos = request.data
+    if isinstance(datos, dict):
+        # Otro JSON (5, "x", null) no trae la lista: el servicio responde 400
+        datos = datos.get("nocasos")
+    return Response(servicios.casos_por_numero(
+        datos,
+        getattr(settings, "CASOS_MULTI_MAX", 5000),
+    ))
 
-    return Response({
-        "nocaso": caso[0],
-        "codcliente": caso[1],
-        "esp": caso[2],
-        "inicio": caso[3].strftime("%Y-%m-%d") if caso[3] else None,
-        "fin": caso[4].strftime("%Y-%m-%d") if caso[4] else None,
-        "valor": float(caso[5]) if caso[5] else 0,
-        "es_nuevo": False
-    })
+
+@api_view(['GET'])
+def estadisticas_casos(request):
+    """
+    Casos activos, cerrados y valor total por especialización y por mes.
+    Se lee del resumen CASO_ESTADISTICA, sin agrupar sobre CASO.
+    """
+    return Response(servicios.estadisticas_casos())
 
 
 # ==============================
 # API GESTIÓN EXPEDIENTE
 # ==============================
 
+@catalogo_http("ciudades")
 @api_view(['GET'])
 def get_ciudades(request):
     """
     Listar ciudades para desplegable.
     """
-    ciudades = many_results("""
-        SELECT CODLUGAR, NOMLUGAR
-        FROM LUGAR
-        WHERE IDTIPOLUGAR = 'CII'
-    """)
-    return Response([{"cod": c[0], "nom": c[1]} for c in ciudades])
+    return Response(servicios.listar_ciudades())
 
 
+@catalogo_http("abogados")
 @api_view(['GET'])
 def get_abogados(request):
     """
     Listar todos los abogados.
     """
-    abogados = many_results("""
-        SELECT CEDULA, NOMABOGADO, APEABOGADO
-        FROM ABOGADO
-        ORDER BY NOMABOGADO
-    """)
-    return Response([{"ced": a[0], "nom": f"{a[1]} {a[2]}"} for a in abogados])
+    return Response(servicios.listar_abogados())
 
 
+@catalogo_http("entidades")
 @api_view(['GET'])
 def get_entidades(request):
     """
     Listar entidades si es necesario.
     """
-    entidades = many_results("""
-        SELECT CODENTIDAD, NOMENTIDAD
-        FROM ENTIDAD
-        ORDER BY NOMENTIDAD
-    """)
-    return Response([{"cod": e[0], "nom": e[1]} for e in entidades])
+    return Response(servicios.listar_entidades())
 
 
+@caso_http
 @api_view(['GET'])
+@responder_errores
 def buscar_caso(request, nocaso):
     """
     Buscar caso por NOCASO y listar expedientes.
+    Expedientes paginados (opcional): ?after=<CONSECEXPE>&limit=100
     """
-    caso = single_result("""
-        SELECT NOCASO, CODCLIENTE, CODESPECIALIZACION, FCHINICIO, FCHFIN
-        FROM CASO
-        WHERE NOCASO = %s
-    """, [nocaso])
-
-    if not caso:
-        return Response({"error": "Caso no encontrado"}, status=404)
-
-    # Expedientes del caso
-    exps = many_results("""
-        SELECT CONSECEXPE, IDTIPOCASO2, CODLUGAR, CEDULA, FCHETAPA
-        FROM EXPEDIENTE
-        WHERE NOCASO = %s
-        ORDER BY CONSECEXPE
-    """, [nocaso])
-
-    lista_expedientes = [
-        {
-            "consec": e[0], 
-            "etapa": e[1], 
-            "lugar": e[2], 
-            "abogado": e[3], 
-            "fecha": e[4].strftime("%Y-%m-%d") if e[4] else None
-        }
-        for e in exps
-    ]
-
-    return Response({
-        "caso": {
-            "nocaso": caso[0],
-            "cliente": caso[1],
-            "esp": caso[2],
-            "inicio": caso[3].strftime("%Y-%m-%d") if caso[3] else None,
-            "fin": caso[4].strftime("%Y-%m-%d") if caso[4] else None
-        },
-        "lista_expedientes": lista_expedientes
-    })
+    despues, limite = parametros_pagina(request)
+    return Response(servicios.buscar_caso(nocaso, despues, limite))
 
 
+@solo_lectura
 @api_view(['POST'])
+@responder_errores
 def crear_expediente(request):
     """
     Crear nuevo expediente.
@@ -330,77 +376,52 @@ def crear_expediente(request):
         "esp": "E001"
     }
     """
-    nocaso = request.data.get("nocaso")
-    esp = request.data.get("esp")
-
-    if not (nocaso and esp):
-        return Response({"error": "Datos incompletos"}, status=400)
-
-    # Consecutivo
-    ultimo = single_result("""
-        SELECT NVL(MAX(CONSECEXPE),0)
-        FROM EXPEDIENTE
-        WHERE NOCASO = %s
-    """, [nocaso])[0]
-    nuevo = ultimo + 1
-
-    det_etapa = single_result("""
-        SELECT IDTIPOCASO2, CODETAPA
-        FROM ESPECIA_ETAPA
-        WHERE CODESPECIALIZACION = %s AND IDTIPOCASO2 = 1
-    """, [esp])
-
-    idetapa = det_etapa[0] if det_etapa else None
-
-    # Abogados de la especialidad
-    abs_ = many_results("""
-        SELECT A.CEDULA, A.NOMABOGADO, A.APEABOGADO
-        FROM ABOGADO A
-        JOIN ABOGADO_ESPECIALIZACION AE
-            ON A.CEDULA = AE.CEDULA
-        WHERE AE.CODESPECIALIZACION = %s
-    """, [esp])
-
-    abogados = [{"ced": a[0], "nom": f"{a[1]} {a[2]}"} for a in abs_]
-
-    return Response({
-        "expediente": {
-            "consec": nuevo,
-            "idetapa": idetapa,
-            "fecha": datetime.now().strftime("%Y-%m-%d")
-        },
-        "abogados": abogados
-    })
+    return Response(servicios.crear_expediente(
+        request.data.get("nocaso"),
+        request.data.get("esp"),
+    ))
 
 
 @api_view(['POST'])
+@responder_errores
 def guardar_expediente(request):
     """
-    Guardar expediente en la BD.
+    Guardar expediente en la BD. El consecutivo lo asigna el servidor y
+    se devuelve en la respuesta ("consec").
     Body JSON:
     {
         "nocaso": 5,
-        "consec": 2,
         "idetapa": 1,
         "codlugar": "L001",
         "cedula": "90005"
     }
     """
-    nocaso = request.data.get("nocaso")
-    consec = request.data.get("consec")
-    idetapa = request.data.get("idetapa")
-    codlugar = request.data.get("codlugar")
-    cedula = request.data.get("cedula")
+    return Response(servicios.guardar_expediente(
+        request.data.get("nocaso"),
+        request.data.get("idetapa"),
+        request.data.get("codlugar"),
+        request.data.get("cedula"),
+    ))
 
-    if not (nocaso and consec and idetapa and codlugar and cedula):
-        return Response({"error": "Todos los campos son obligatorios"}, status=400)
 
-    execute("""
-        INSERT INTO EXPEDIENTE
-        (NOCASO, CONSECEXPE, CODESPECIALIZACION, IDTIPOCASO2, CODLUGAR, CEDULA, FCHETAPA)
-        VALUES (%s, %s,
-               (SELECT CODESPECIALIZACION FROM CASO WHERE NOCASO=%s),
-               %s, %s, %s, SYSDATE)
-    """, [nocaso, consec, nocaso, idetapa, codlugar, cedula])
+# ==============================
+# DIAGNÓSTICO INTERNO
+# ==============================
+
+@solo_interno
+@require_GET
+def estado_pool(request):
+    """
+    Conexiones abiertas/ocupadas y espera del pool en este proceso.
+    """
+    return JsonResponse(pool.estado())
+
 
-    return Response({"mensaje": "Etapa guardada correctamente"})
\ No newline at end of file
+@solo_interno
+@require_GET
+def estado_consultas(request):
+    """
+    Llamadas e histograma de latencias de cada consulta registrada en este
+    proceso, de la de más tiempo total a la de menos.
+    """
+    return JsonResponse(consultas.estadisticas())
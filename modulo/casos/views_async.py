@@ -0,0 +1,163 @@
+"""
+Versiones async de los endpoints de solo lectura, para el servidor ASGI
+(modulo/asgi.py). Usan las mismas consultas que las vistas DRF a través de
+los servicios servicios.pasos_* y casos/db_async.py.
+
+No son vistas DRF: DRF no admite vistas async.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET
+
+from . import db_async, eventos, servicios
+from .renderers import a_json
+from .servicios import ErrorServicio
+from .views import etag_de_caso, parametros_pagina
+
+# ==============================
+# UTILIDADES
+# ==============================
+
+def responder_errores(vista):
+    """
+    Convierte ErrorServicio en la respuesta {"error": ...} de la API.
+    """
+    @wraps(vista)
+    async def envoltura(request, *args, **kwargs):
+        try:
+            return await vista(request, *args, **kwargs)
+        except ErrorServicio as e:
+            return JsonResponse({"error": e.mensaje}, status=e.status)
+    return envoltura
+
+
+def _json(datos):
+    return HttpResponse(a_json(datos), content_type="application/json")
+
+
+async def _catalogo(request, nombre):
+    """
+    Igual que catalogo_http en views.py: 304 si el cliente tiene el ETag
+    vigente, y la base de datos solo se consulta si el catálogo venció.
+    """
+    entrada = await db_async.catalogo(nombre)
+    respuesta = get_conditional_response(request, etag=entrada.etag) or _json(entrada.datos)
+    respuesta["ETag"] = entrada.etag
+    patch_cache_control(
+        respuesta, public=True, max_age=getattr(settings, "CASOS_CATALOGOS_MAX_AGE", 60),
+    )
+    return respuesta
+
+def caso_http(vista):
+    """
+    Igual que caso_http en views.py: 304 si CASO.VERSION no cambió.
+    """
+    @wraps(vista)
+    async def envoltura(request, nocaso, *args, **kwargs):
+        version = await db_async.ejecutar_async(servicios.pasos_version_caso(nocaso))
+        etag = etag_de_caso(request, nocaso, version) if version is not None else None
+        if etag is None:
+            return await vista(request, nocaso, *args, **kwargs)
+        respuesta = get_conditional_response(request, etag=etag)
+        if respuesta is None:
+            respuesta = await vista(request, nocaso, *args, **kwargs)
+            if respuesta.status_code == 200:
+                respuesta["ETag"] = etag
+        patch_cache_control(respuesta, private=True, no_cache=True)
+        return respuesta
+    return envoltura
+
+# ==============================
+# API GESTIÓN CASO
+# ==============================
+
+@require_GET
+async def get_especializaciones(request):
+    return await _catalogo(request, "especializaciones")
+
+
+@require_GET
+@responder_errores
+async def buscar_cliente(request):
+    """
+    GET: ?nombre=Luis&apellido=Martínez[&after=<NOCASO>&limit=100]
+    """
+    despues, limite = parametros_pagina(request)
+    return _json(await db_async.ejecutar_async(servicios.pasos_buscar_cliente(
+        request.GET.get("nombre", "").strip(),
+        request.GET.get("apellido", "").strip(),
+        despues, limite,
+    )))
+
+
+@require_GET
+@caso_http
+@responder_errores
+async def buscar_caso_por_numero(request, nocaso):
+    return _json(await db_async.ejecutar_async(servicios.pasos_caso_por_numero(nocaso)))
+
+# ==============================
+# API GESTIÓN EXPEDIENTE
+# ==============================
+
+@require_GET
+async def get_ciudades(request):
+    return await _catalogo(request, "ciudades")
+
+
+@require_GET
+async def get_abogados(request):
+    return await _catalogo(request, "abogados")
+
+
+@require_GET
+async def get_entidades(request):
+    return await _catalogo(request, "entidades")
+
+
+@require_GET
+@caso_http
+@responder_errores
+async def buscar_caso(request, nocaso):
+    """
+    GET: [?after=<CONSECEXPE>&limit=100]
+    """
+    despues, limite = parametros_pagina(request)
+    return _json(await db_async.ejecutar_async(
+        servicios.pasos_buscar_caso(nocaso, despues, limite)
+    ))
+
+# ==============================
+# EVENTOS (SSE)
+# ==============================
+
+@require_GET
+async def eventos_casos(request):
+    """
+    Server-sent events de casos y expedientes guardados (casos/eventos.py).
+    GET: ?cliente=C001 y/o ?nocaso=5&nocaso=7; sin filtros, todos.
+    El navegador reenvía Last-Event-ID al reconectarse.
+    """
+    # Con WSGI la respuesta infinita ocuparía un hilo por conexión
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"error": "Disponible solo con el servidor ASGI"}, status=501)
+    if not eventos.activos():
+        return JsonResponse({"error": "Eventos desactivados (CASOS_EVENTOS)"}, status=503)
+    try:
+        nocasos = frozenset(int(n) for n in request.GET.getlist("nocaso"))
+        ultimo = request.headers.get("Last-Event-ID")
+        ultimo = int(ultimo) if ultimo else None
+    except ValueError:
+        return JsonResponse({"error": "nocaso y Last-Event-ID deben ser números"}, status=400)
+
+    filtro = eventos.Filtro(request.GET.get("cliente", "").strip() or None, nocasos)
+    respuesta = StreamingHttpResponse(eventos.flujo(filtro, ultimo),
+                                      content_type="text/event-stream")
+    respuesta["Cache-Control"] = "no-cache"
+    # nginx no debe acumular el flujo
+    respuesta["X-Accel-Buffering"] = "no"
+    return respuesta
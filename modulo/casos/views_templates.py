@@ -1,8 +1,24 @@
+import uuid
+from datetime import datetime
+
 from django.shortcuts import render
 from django.views.decorators.csrf import csrf_exempt
-import requests
 
-API_BASE_URL = "http://localhost:8000/api/caso"
+from . import servicios
+from .servicios import ErrorServicio
+
+
+def _cliente_del_formulario(request):
+    """
+    Cliente a partir de los campos ocultos del formulario.
+    """
+    return {
+        "cod": request.POST.get("codcliente"),
+        "nom": request.POST.get("nomcliente"),
+        "ape": request.POST.get("apellcliente"),
+        "doc": request.POST.get("doccliente", "")
+    }
+
 
 @csrf_exempt
 def caso_template(request):
@@ -21,9 +37,7 @@ def caso_template(request):
 
     # Cargar especializaciones (siempre disponibles)
     try:
-        res = requests.get(f"{API_BASE_URL}/especializaciones/")
-        if res.ok:
-            contexto["especializaciones"] = res.json()
+        contexto["especializaciones"] = servicios.listar_especializaciones()
     except Exception as e:
         contexto["error"] = f"Error al cargar especializaciones: {str(e)}"
 
@@ -42,86 +56,39 @@ def caso_template(request):
                 return render(request, "cliente.html", contexto)
             
             try:
-                res = requests.get(
-                    f"{API_BASE_URL}/buscar_cliente/",
-                    params={"nombre": nombre, "apellido": apellido}
-                )
-                
-                if res.ok:
-                    data = res.json()
-                    contexto["cliente"] = data["cliente"]
-                    contexto["casos_cliente"] = data["casos_cliente"]
-                    contexto["caso_activo"] = data.get("caso_activo")
-                    contexto["especializaciones"] = data.get("especializaciones", contexto["especializaciones"])
-                else:
-                    error_data = res.json()
-                    contexto["error"] = error_data.get("error", "Cliente no encontrado")
-            
-            except requests.exceptions.RequestException as e:
-                contexto["error"] = f"Error de conexión: {str(e)}"
+                data = servicios.buscar_cliente(nombre, apellido)
+                contexto["cliente"] = data["cliente"]
+                contexto["casos_cliente"] = data["casos_cliente"]
+                contexto["caso_activo"] = data.get("caso_activo")
+                contexto["especializaciones"] = data.get("especializaciones", contexto["especializaciones"])
+
+            except ErrorServicio as e:
+                contexto["error"] = e.mensaje
             except Exception as e:
                 contexto["error"] = f"Error inesperado: {str(e)}"
 
         # ==================================================
-        # ACCIÓN: CREAR CASO (GENERAR CONSECUTIVO)
+        # ACCIÓN: CREAR CASO (FORMULARIO DEL CASO NUEVO)
         # ==================================================
+        # No consulta la base de datos: el número se asigna al guardar, con
+        # servicios.abrir_caso. La clave evita abrir dos casos si el
+        # formulario se envía dos veces.
         elif accion == "crear_caso":
             codcliente = request.POST.get("codcliente")
-            nomcliente = request.POST.get("nomcliente")
-            apellcliente = request.POST.get("apellcliente")
-            
+
             if not codcliente:
                 contexto["error"] = "Debe seleccionar un cliente primero"
                 return render(request, "cliente.html", contexto)
-            
-            try:
-                # Obtener documento del cliente
-                res_buscar = requests.get(
-                    f"{API_BASE_URL}/buscar_cliente/",
-                    params={"nombre": nomcliente, "apellido": apellcliente}
-                )
-                
-                doc_cliente = ""
-                if res_buscar.ok:
-                    doc_cliente = res_buscar.json()["cliente"]["doc"]
-                
-                res = requests.post(
-                    f"{API_BASE_URL}/crear_caso/",
-                    json={
-                        "codcliente": codcliente,
-                        "nomcliente": nomcliente,
-                        "apellcliente": apellcliente,
-                        "ndocumento": doc_cliente
-                    }
-                )
-                
-                if res.ok:
-                    data = res.json()
-                    # Reconstruir contexto del cliente
-                    contexto["cliente"] = data["cliente"]
-                    contexto["caso_nuevo"] = {
-                        "nocaso": data["nocaso"],
-                        "inicio": data["fecha_inicio"],
-                        "esp": None,
-                        "valor": None
-                    }
-                    contexto["mensaje"] = f"Nuevo caso #{data['nocaso']} creado. Complete los datos y guarde."
-                    
-                    # Recargar casos del cliente
-                    res_cliente = requests.get(
-                        f"{API_BASE_URL}/buscar_cliente/",
-                        params={"nombre": nomcliente, "apellido": apellcliente}
-                    )
-                    if res_cliente.ok:
-                        cliente_data = res_cliente.json()
-                        contexto["casos_cliente"] = cliente_data["casos_cliente"]
-                        contexto["especializaciones"] = cliente_data.get("especializaciones", contexto["especializaciones"])
-                else:
-                    error_data = res.json()
-                    contexto["error"] = error_data.get("error", "Error al crear caso")
-            
-            except Exception as e:
-                contexto["error"] = f"Error al crear caso: {str(e)}"
+
+            contexto["cliente"] = _cliente_del_formulario(request)
+            contexto["caso_nuevo"] = {
+                "nocaso": None,
+                "inicio": datetime.now().strftime("%Y-%m-%d"),
+                "esp": None,
+                "valor": None,
+                "clave": uuid.uuid4().hex
+            }
+            contexto["mensaje"] = "Nuevo caso. Complete los datos y guarde; el número se asigna al guardar."
 
         # ==================================================
         # ACCIÓN: LIMPIAR / BUSCAR OTRO CLIENTE
@@ -134,21 +101,16 @@ def caso_template(request):
         # ACCIÓN: GUARDAR CASO
         # ==================================================
         elif accion == "guardar_caso":
-            nocaso = request.POST.get("nocaso")
             codcliente = request.POST.get("codcliente")
             especializacion = request.POST.get("especializacion")
             valor = request.POST.get("valor")
             fecha_inicio = request.POST.get("fechaInicio")
             
             # Validaciones
-            if not all([nocaso, codcliente, especializacion, valor, fecha_inicio]):
+            if not all([codcliente, especializacion, valor, fecha_inicio]):
                 contexto["error"] = "Todos los campos son obligatorios"
                 # Reconstruir contexto
-                contexto["cliente"] = {
-                    "cod": codcliente,
-                    "nom": request.POST.get("nomcliente"),
-                    "ape": request.POST.get("apellcliente")
-                }
+                contexto["cliente"] = _cliente_del_formulario(request)
                 return render(request, "cliente.html", contexto)
             
             try:
@@ -161,50 +123,22 @@ def caso_template(request):
                 return render(request, "cliente.html", contexto)
             
             try:
-                res = requests.post(
-                    f"{API_BASE_URL}/guardar_caso/",
-                    json={
-                        "nocaso": int(nocaso),
-                        "codcliente": codcliente,
-                        "especializacion": especializacion,
-                        "valor": valor_float,
-                        "fechaInicio": fecha_inicio
-                    }
+                # Número, caso y casos del cliente actualizados en una transacción
+                data = servicios.abrir_caso(
+                    codcliente, especializacion, valor_float, fecha_inicio,
+                    request.POST.get("clave") or None
                 )
-                
-                if res.ok:
-                    contexto["mensaje"] = f"✓ Caso #{nocaso} guardado exitosamente"
-                    
-                    # Recargar datos del cliente
-                    nomcliente = request.POST.get("nomcliente")
-                    apellcliente = request.POST.get("apellcliente")
-                    
-                    res_cliente = requests.get(
-                        f"{API_BASE_URL}/buscar_cliente/",
-                        params={"nombre": nomcliente, "apellido": apellcliente}
-                    )
-                    
-                    if res_cliente.ok:
-                        cliente_data = res_cliente.json()
-                        contexto["cliente"] = cliente_data["cliente"]
-                        contexto["casos_cliente"] = cliente_data["casos_cliente"]
-                        contexto["caso_activo"] = cliente_data.get("caso_activo")
-                        contexto["especializaciones"] = cliente_data.get("especializaciones", contexto["especializaciones"])
-                else:
-                    error_data = res.json()
-                    contexto["error"] = error_data.get("error", "Error al guardar caso")
-                    contexto["cliente"] = {
-                        "cod": codcliente,
-                        "nom": request.POST.get("nomcliente"),
-                        "ape": request.POST.get("apellcliente")
-                    }
-            
+                contexto["mensaje"] = f"✓ Caso #{data['nocaso']} guardado exitosamente"
+                contexto["cliente"] = data["cliente"]
+                contexto["casos_cliente"] = data["casos_cliente"]
+                contexto["caso_activo"] = data.get("caso_activo")
+                contexto["especializaciones"] = data.get("especializaciones", contexto["especializaciones"])
+
+            except ErrorServicio as e:
+                contexto["error"] = e.mensaje
+                contexto["cliente"] = _cliente_del_formulario(request)
             except Exception as e:
                 contexto["error"] = f"Error al guardar: {str(e)}"
-                contexto["cliente"] = {
-                    "cod": codcliente,
-                    "nom": request.POST.get("nomcliente"),
-                    "ape": request.POST.get("apellcliente")
-                }
+                contexto["cliente"] = _cliente_del_formulario(request)
 
-    return render(request, "cliente.html", contexto)
\ No newline at end of file
+    return render(request, "cliente.html", contexto)
\ No newline at end of file
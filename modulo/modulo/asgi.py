@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'modulo.settings')
 
 application = get_asgi_application()
+
+from casos.catalogos import calentar_al_arrancar  # noqa: E402
+
+calentar_al_arrancar()
@@ -10,12 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
-import oracledb
 
-oracledb.init_oracle_client(
-    lib_dir=r"C:\oraclexe\app\oracle\product\11.2.0\server\BIN"
-)
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'casos.medicion.MedicionSQLMiddleware',  # solo con CASOS_MEDIR_SQL
+    'casos.replicas.ReplicaMiddleware',      # solo con CASOS_REPLICA
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # ← AGREGADO (debe ir aquí arriba)
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -86,16 +86,93 @@ WSGI_APPLICATION = 'modulo.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.oracle',
-        'NAME': 'XE',           # SID de tu base de datos
-        'USER': 'TALLER_NUEVO', # tu usuario que tiene los datos
-        'PASSWORD': 'demo123',  # la contraseña de ese usuario
-        'HOST': 'localhost',
-        'PORT': '1521',
+# Motor: CASOS_BD=oracle (por defecto), sqlite o postgresql. En SQLite y
+# PostgreSQL el esquema se crea con `python manage.py crear_esquema`
+# (casos/sql/estandar/).
+CASOS_BD = os.environ.get('CASOS_BD', 'oracle')
+
+if CASOS_BD == 'oracle':
+    # Modo de python-oracledb (ORACLE_MODO). thick carga el cliente de Oracle
+    # de ORACLE_CLIENT_LIB (vacío: el del PATH/LD_LIBRARY_PATH) al abrir la
+    # primera conexión, no al importar settings (casos/backends/oracle/).
+    # thin no necesita cliente, pero exige Oracle Database 12.1 o superior.
+    CASOS_ORACLE_MODO = os.environ.get('ORACLE_MODO', 'thick')
+    CASOS_ORACLE_LIB = os.environ.get(
+        'ORACLE_CLIENT_LIB', r"C:\oraclexe\app\oracle\product\11.2.0\server\BIN"
+    ) or None
+    if CASOS_ORACLE_MODO not in ('thin', 'thick'):
+        raise ImproperlyConfigured("ORACLE_MODO debe ser thin o thick")
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'casos.backends.oracle',   # django.db.backends.oracle + métricas del pool
+            'NAME': 'XE',           # SID de tu base de datos
+            'USER': 'TALLER_NUEVO', # tu usuario que tiene los datos
+            'PASSWORD': 'demo123',  # la contraseña de ese usuario
+            'HOST': 'localhost',
+            'PORT': '1521',
+        }
     }
-}
+
+    # Sentencias preparadas por conexión; debe alcanzar para las consultas
+    # registradas en casos/consultas.py (manage.py consultas las lista).
+    DATABASES['default']['OPTIONS'] = {
+        'stmtcachesize': int(os.environ.get('ORACLE_STMT_CACHE', 50)),
+    }
+
+    # Pool de conexiones de python-oracledb (opcional): ORACLE_POOL=1.
+    # Estado del pool en /api/caso/interno/pool/ (solo INTERNAL_IPS).
+    if os.environ.get('ORACLE_POOL') == '1':
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min': int(os.environ.get('ORACLE_POOL_MIN', 2)),
+            'max': int(os.environ.get('ORACLE_POOL_MAX', 10)),
+            'increment': int(os.environ.get('ORACLE_POOL_INCREMENT', 1)),
+        }
+
+elif CASOS_BD == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('CASOS_SQLITE', BASE_DIR / 'casos.sqlite3'),
+            'OPTIONS': {'timeout': 30},  # espera el bloqueo de escritura
+        }
+    }
+
+elif CASOS_BD == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('PGDATABASE', 'casos'),
+            'USER': os.environ.get('PGUSER', 'casos'),
+            'PASSWORD': os.environ.get('PGPASSWORD', ''),
+            'HOST': os.environ.get('PGHOST', 'localhost'),
+            'PORT': os.environ.get('PGPORT', '5432'),
+        }
+    }
+
+else:
+    raise ImproperlyConfigured("CASOS_BD debe ser oracle, sqlite o postgresql")
+
+# Réplica de lectura (opcional): CASOS_REPLICA=1 y REPLICA_HOST, REPLICA_PORT,
+# REPLICA_NAME (o el archivo en SQLite), REPLICA_USER, REPLICA_PASSWORD para
+# lo que cambie respecto del primario. Las peticiones GET leen de ella; tras
+# una escritura el cliente lee del primario durante CASOS_PRIMARIO_SEGUNDOS
+# (casos/replicas.py).
+CASOS_REPLICA = None
+if os.environ.get('CASOS_REPLICA') == '1':
+    CASOS_REPLICA = 'replica'
+    DATABASES[CASOS_REPLICA] = {
+        **DATABASES['default'],
+        **{clave: os.environ[f'REPLICA_{clave}']
+           for clave in ('HOST', 'PORT', 'NAME', 'USER', 'PASSWORD')
+           if f'REPLICA_{clave}' in os.environ},
+        'TEST': {'MIRROR': 'default'},
+    }
+CASOS_PRIMARIO_SEGUNDOS = int(os.environ.get('CASOS_PRIMARIO_SEGUNDOS', 5))
+
+DATABASE_ROUTERS = ['casos.replicas.RouterReplica']
+
+INTERNAL_IPS = ['127.0.0.1']
 
 
 
@@ -145,4 +222,63 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # CORS Configuration - Para permitir peticiones desde React
 # ============================================================
 CORS_ALLOW_ALL_ORIGINS = True  # Solo para desarrollo
-CORS_ALLOW_CREDENTIALS = True
\ No newline at end of file
+CORS_ALLOW_CREDENTIALS = True
+
+# JSON de la API con orjson si está instalado (si no, el JSONRenderer de DRF)
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'casos.renderers.JSONRapidoRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# ============================================================
+# Caché de catálogos (especializaciones, ciudades, abogados, entidades)
+# ============================================================
+CASOS_CATALOGOS_TTL = 300        # segundos antes de recargar desde la BD
+CASOS_CATALOGOS_MAX_AGE = 60     # Cache-Control max-age para navegadores/proxies
+CASOS_CATALOGOS_CALENTAR = False # cargar los catálogos al arrancar el worker
+
+# ============================================================
+# Consecutivos
+# ============================================================
+CASOS_CONSECUTIVO_BLOQUE = 20    # números de caso que reserva cada proceso por viaje a la BD
+
+# Filas por lote en /api/caso/importar/ (una transacción y un executemany por lote)
+CASOS_IMPORTAR_LOTE = 1000
+
+# Casos por petición en /api/caso/casos/ (consultas IN de hasta 1000)
+CASOS_MULTI_MAX = 5000
+
+# Filas por viaje a la BD en /api/caso/exportar/ (arraysize/prefetchrows en Oracle)
+CASOS_EXPORTAR_ARRAYSIZE = 1000
+
+# Conexiones del pool asyncio de las vistas /api/caso/async/ (Oracle en modo thin)
+CASOS_ASYNC_POOL_MAX = 10
+
+# ============================================================
+# Eventos SSE de /api/caso/eventos/ (servidor ASGI)
+# ============================================================
+CASOS_EVENTOS = True             # False: no se guardan eventos y el SSE responde 503
+CASOS_EVENTOS_PING = 15          # segundos entre comentarios keep-alive
+CASOS_EVENTOS_COLA = 100         # eventos pendientes por conexión antes de "reiniciar"
+CASOS_EVENTOS_HISTORIA = 200     # eventos perdidos que se reenvían al reconectar con Last-Event-ID
+CASOS_EVENTOS_SONDEO = 1         # segundos entre lecturas de CASO_EVENTO por worker
+CASOS_EVENTOS_ESPERA = 10        # segundos que se espera un ID faltante (transacción abierta)
+
+# ============================================================
+# Medición de SQL por petición (cabecera Server-Timing y log "casos.sql")
+# ============================================================
+CASOS_MEDIR_SQL = os.environ.get('CASOS_MEDIR_SQL') == '1'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'consola': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'casos.sql': {'handlers': ['consola'], 'level': 'INFO', 'propagate': False},
+        'casos.oracle': {'handlers': ['consola'], 'level': 'INFO', 'propagate': False},
+    },
+}
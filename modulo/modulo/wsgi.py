@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'modulo.settings')
 
 application = get_wsgi_application()
+
+from casos.catalogos import calentar_al_arrancar  # noqa: E402
+
+calentar_al_arrancar()